@@ -1,16 +1,174 @@
 """AI综合评级系统"""
+import math
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import compress
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+)
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from src.analysis.technical.indicators import TechnicalIndicators
 from src.analysis.fundamental.financial_metrics import FinancialMetrics
 from src.analysis.capital.money_flow import MoneyFlowAnalyzer
 from src.analysis.ai.deepseek_client import DeepSeekClient
 from src.core.config_manager import ConfigManager
+from src.core.constants import MARKET_PREFIX
 from src.core.logger import get_logger
+from src.utils._njit import njit
+from src.utils._pandas_compat import RENAME_NO_COPY
 
 logger = get_logger(__name__)
 
+# 进程内共享的无状态分析器与DeepSeek客户端（按类缓存），多个评级器复用同一HTTP连接池
+_SHARED_COMPONENTS: Dict[type, Any] = {}
+_SHARED_COMPONENTS_LOCK = threading.Lock()
+
+
+def _get_shared(component_cls: type) -> Any:
+    """
+    获取组件的进程内共享实例，首次调用时创建
+
+    Args:
+        component_cls: 组件类（无参构造）
+
+    Returns:
+        组件实例
+    """
+    instance = _SHARED_COMPONENTS.get(component_cls)
+    if instance is None:
+        with _SHARED_COMPONENTS_LOCK:
+            instance = _SHARED_COMPONENTS.get(component_cls)
+            if instance is None:
+                instance = component_cls()
+                _SHARED_COMPONENTS[component_cls] = instance
+    return instance
+
+
+# 进程池工作进程内共享的评级器实例，由 _pool_init 在每个进程启动时创建一次
+_RATER = None
+
+
+def _pool_init() -> None:
+    """进程池初始化：在工作进程内创建评级器，避免每个任务重复读取配置"""
+    global _RATER
+    _RATER = StockRater()
+
+
+def _pool_analyze(
+    stock_code: str,
+    kline_df: pd.DataFrame,
+    financial_df: pd.DataFrame,
+    money_flow_df: pd.DataFrame,
+    include_ai_insights: bool
+) -> Dict[str, Any]:
+    """进程池任务：使用工作进程内的评级器分析单只股票"""
+    return _RATER.analyze_stock(
+        stock_code,
+        kline_df,
+        financial_df,
+        money_flow_df,
+        include_ai_insights=include_ai_insights
+    )
+
+
+@njit(cache=True)
+def _score_technical_kernel(values: tuple, thresholds: tuple) -> tuple:
+    """
+    技术面评分内核（安装numba时JIT编译），每个指标的所需值均非NaN时才参与评分
+
+    Args:
+        values: 最新指标值，顺序同 StockRater.TECH_FEATURE_COLUMNS，缺失为NaN
+        thresholds: (RSI健康下限, RSI健康上限, RSI超卖, RSI超买, KDJ超买,
+                     放量倍数, 正常量倍数, ATR低波动, ATR中波动)
+
+    Returns:
+        (总分, 参与评分的指标数)
+    """
+    (close, ma5, ma20, macd, macd_signal, rsi, k, d,
+     boll_upper, boll_lower, boll_middle, volume, vol_ma5, atr) = values
+    (rsi_healthy_low, rsi_healthy_high, rsi_oversold, rsi_overbought, kdj_overbought,
+     volume_surge_ratio, volume_normal_ratio, atr_low, atr_medium) = thresholds
+
+    score = 0.0
+    found = 0
+
+    # 1. MA趋势分析
+    if not (math.isnan(ma5) or math.isnan(ma20)):
+        found += 1
+        if ma5 > ma20 and close > ma5:
+            score += 100.0
+        elif ma5 > ma20 or close > ma20:
+            score += 50.0
+
+    # 2. MACD分析
+    if not (math.isnan(macd) or math.isnan(macd_signal)):
+        found += 1
+        if macd > macd_signal and macd > 0:
+            score += 100.0
+        elif macd > macd_signal:
+            score += 70.0
+
+    # 3. RSI分析
+    if not math.isnan(rsi):
+        found += 1
+        if rsi_healthy_low <= rsi <= rsi_healthy_high:  # 健康区间
+            score += 100.0
+        elif rsi_oversold <= rsi < rsi_healthy_low or rsi_healthy_high < rsi <= rsi_overbought:
+            score += 50.0
+
+    # 4. KDJ分析
+    if not (math.isnan(k) or math.isnan(d)):
+        found += 1
+        if k > d and k < kdj_overbought:
+            score += 100.0
+        elif k > d:
+            score += 50.0
+
+    # 5. 布林带分析
+    if not (math.isnan(boll_upper) or math.isnan(boll_lower) or math.isnan(boll_middle)):
+        found += 1
+        if boll_lower < close < boll_middle:
+            score += 100.0
+        elif close < boll_upper:
+            score += 50.0
+
+    # 6. 成交量分析
+    if not (math.isnan(volume) or math.isnan(vol_ma5)):
+        found += 1
+        if volume > vol_ma5 * volume_surge_ratio:  # 放量
+            score += 80.0
+        elif volume > vol_ma5 * volume_normal_ratio:
+            score += 50.0
+
+    # 7. ATR波动率分析
+    if not math.isnan(atr):
+        found += 1
+        atr_ratio = atr / close if close > 0 else 0.0
+        if atr_ratio < atr_low:  # 低波动
+            score += 70.0
+        elif atr_ratio < atr_medium:
+            score += 50.0
+
+    return score, found
+
+
+@dataclass(slots=True)
+class AnalysisBundle:
+    """单只股票各维度分析结果，供结果组装与AI洞察使用"""
+    current_price: float
+    technical_score: float
+    fundamental_score: float
+    capital_score: float
+    capital_signal: str
+    sentiment_score: float
+    overall_score: float
+    rating: str
+    confidence: float
+
 
 class StockRater:
     """AI综合评级系统，整合技术面、基本面、资金面分析"""
@@ -52,6 +210,36 @@ class StockRater:
     # Price change thresholds
     PRICE_CHANGE_HIGH = 8.0
 
+    # Growth-board (STAR/GEM) lookup keyed by the 3-digit code prefix: one dict probe per stock
+    _GROWTH_BOARD_BY_PREFIX = {
+        prefix: board for board in ('STAR', 'GEM') for prefix in MARKET_PREFIX[board]
+    }
+
+    # 评级原因/风险提示模板（不可变元组，按条件掩码挑选，末尾统一追加通用风险）
+    _BUY_REASONS = (
+        '技术面呈现强势上涨趋势',
+        '基本面良好，财务指标健康',
+        '主力资金持续流入，市场情绪积极',
+        '资金流向信号显示买入机会',
+    )
+    _SELL_REASONS = (
+        '技术面走弱，下跌趋势明显',
+        '基本面欠佳，财务风险较高',
+        '主力资金流出，市场情绪悲观',
+        '资金流向信号显示卖出风险',
+    )
+    _HOLD_REASONS = (
+        '综合指标显示震荡整理，建议观望',
+        '技术面处于平衡状态',
+        '基本面稳定，但缺乏亮点',
+    )
+    _DEFAULT_REASON = '综合分析建议当前操作'
+    _GENERAL_RISK = '政策和宏观环境变化风险'
+    _BUY_RISKS = ('市场整体波动可能影响个股表现', _GENERAL_RISK)
+    _BUY_RISKS_DIVERGENT = ('市场整体波动可能影响个股表现', '部分指标存在分歧，需密切关注', _GENERAL_RISK)
+    _SELL_RISKS = ('继续持有可能面临进一步下跌风险', '建议及时止损，避免损失扩大', _GENERAL_RISK)
+    _HOLD_RISKS = ('横盘整理期间可能出现方向选择', '需关注市场和个股基本面变化', _GENERAL_RISK)
+
     # Confidence calculation constants
     CONSISTENCY_DIVISOR = 60
     SCORE_EXTREME_THRESHOLD = 50
@@ -65,20 +253,41 @@ class StockRater:
     SCORE_GOOD = 60
     SCORE_FAIR = 40
 
+    # Technical indicator LRU cache capacity (entries keyed on K-line fingerprint)
+    INDICATOR_CACHE_SIZE = 512
+
+    # AI insights LRU cache capacity (entries keyed on stock code + bucketed scores)
+    AI_INSIGHTS_CACHE_SIZE = 1024
+
     # Minimum data requirements
     MIN_KLINE_ROWS = 2
     MIN_FINANCIAL_ROWS = 1
     MIN_MONEY_FLOW_ROWS = 1
 
+    # NaN validation window on K-line close (MA20 is the longest window read by scoring)
+    KLINE_NAN_CHECK_WINDOW = 20
+
+    # 单只股票分析时并行执行技术面/基本面/资金面的线程数
+    ANALYSIS_WORKERS = 3
+
+    # 等待DeepSeek洞察结果的最长时间（秒），超时回退到本地默认洞察
+    AI_INSIGHTS_TIMEOUT = 30
+
+    # Last-row features used by batch technical scoring (column order of features[N, k])
+    TECH_FEATURE_COLUMNS = (
+        'close', 'MA5', 'MA20', 'MACD', 'MACD_signal', 'RSI', 'K', 'D',
+        'BOLL_UPPER', 'BOLL_LOWER', 'BOLL_MIDDLE', 'volume', 'VOL_MA5', 'ATR'
+    )
+
     def __init__(self):
         """初始化股票评级器"""
         logger.info("Initializing StockRater...")
 
-        # 初始化各个分析器
-        self.technical_indicators = TechnicalIndicators()
-        self.financial_metrics = FinancialMetrics()
-        self.money_flow_analyzer = MoneyFlowAnalyzer()
-        self.deepseek_client = DeepSeekClient()
+        # 获取各个分析器（进程内共享实例）
+        self.technical_indicators = _get_shared(TechnicalIndicators)
+        self.financial_metrics = _get_shared(FinancialMetrics)
+        self.money_flow_analyzer = _get_shared(MoneyFlowAnalyzer)
+        self.deepseek_client = _get_shared(DeepSeekClient)
 
         # 从配置读取权重
         config = ConfigManager()
@@ -88,8 +297,84 @@ class StockRater:
             'capital': config.get('ai.rating_weights.capital', 0.25),
             'sentiment': config.get('ai.rating_weights.sentiment', 0.15)
         }
+        # 信心度低于该值时不调用DeepSeek（AI洞察对低信心评级价值有限）
+        self.ai_min_confidence = config.get('ai.min_confidence', 0.0)
+
+        # 权重的标量副本（单只评分）与向量形式（批量评分），避免每次调用查字典
+        self._wt = self.weights['technical']
+        self._wf = self.weights['fundamental']
+        self._wc = self.weights['capital']
+        self._ws = self.weights['sentiment']
+        self._weights_vec = np.array([self._wt, self._wf, self._wc, self._ws], dtype=np.float64)
+
+        # 评级查找表：阈值升序排列，bisect_right/np.searchsorted 的结果即为标签下标
+        self._rating_thresholds = (self.RATING_HOLD_THRESHOLD, self.RATING_BUY_THRESHOLD)
+        self._rating_labels = ('sell', 'hold', 'buy')
+        self._rating_index = {label: i for i, label in enumerate(self._rating_labels)}
+        self._score_rating_thresholds = (self.SCORE_FAIR, self.SCORE_GOOD, self.SCORE_EXCELLENT)
+        self._score_rating_labels = ('差', '一般', '良好', '优秀')
+
+        # 目标价/止损价乘数表（按评级下标索引），每行为 (目标基数, 目标斜率, 止损基数, 止损斜率)：
+        # 目标价 = 当前价 * (目标基数 + 目标斜率 * 分数)，止损价同理
+        self._price_multipliers = (
+            (  # sell
+                1 - self.SELL_LOSS_MIN - self.RATING_HOLD_THRESHOLD / 100 * self.SELL_LOSS_MAX,
+                self.SELL_LOSS_MAX / 100,
+                1 - self.STOP_LOSS_SELL,
+                0.0
+            ),
+            (  # hold
+                1 + self.HOLD_TARGET_GAIN,
+                0.0,
+                1 - self.STOP_LOSS_HOLD,
+                0.0
+            ),
+            (  # buy
+                1 + self.BUY_TARGET_GAIN_MIN - self.RATING_BUY_THRESHOLD / 100 * self.BUY_TARGET_GAIN_MAX,
+                self.BUY_TARGET_GAIN_MAX / 100,
+                1 - self.STOP_LOSS_BUY_MIN - self.STOP_LOSS_BUY_MAX,
+                self.STOP_LOSS_BUY_MAX / 100
+            )
+        )
+
+        # 技术指标LRU缓存：按K线指纹复用 calculate_all 的结果
+        self._indicator_cache: OrderedDict = OrderedDict()
+        self._indicator_cache_lock = threading.Lock()
+
+        # 技术面评分内核所需阈值（顺序见 _score_technical_kernel）
+        self._tech_thresholds = (
+            float(self.RSI_HEALTHY_LOW), float(self.RSI_HEALTHY_HIGH),
+            float(self.RSI_OVERSOLD), float(self.RSI_OVERBOUGHT),
+            float(self.KDJ_OVERBOUGHT),
+            float(self.VOLUME_SURGE_RATIO), float(self.VOLUME_NORMAL_RATIO),
+            float(self.ATR_LOW_VOLATILITY), float(self.ATR_MEDIUM_VOLATILITY)
+        )
+
+        # AI洞察LRU缓存：相同股票在相同分数区间内复用DeepSeek结果，省去网络往返
+        self._ai_insights_cache: OrderedDict = OrderedDict()
+        self._ai_insights_cache_lock = threading.Lock()
+
+        # 三个维度分析共用的线程池，首次使用时再创建
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        logger.info("StockRater initialized with weights: {}", self.weights)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        获取维度分析线程池（惰性创建，线程安全）
 
-        logger.info(f"StockRater initialized with weights: {self.weights}")
+        Returns:
+            ThreadPoolExecutor实例
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.ANALYSIS_WORKERS,
+                        thread_name_prefix='stock-rater'
+                    )
+        return self._executor
 
     def _standardize_dataframe_columns(self, df: pd.DataFrame, df_type: str) -> pd.DataFrame:
         """
@@ -100,10 +385,9 @@ class StockRater:
             df_type: Type of DataFrame ('kline', 'financial', 'money_flow')
 
         Returns:
-            DataFrame with standardized column names
+            DataFrame with standardized column names. The input is never mutated;
+            when nothing needs renaming it is returned as-is.
         """
-        df_copy = df.copy()
-
         if df_type == 'kline':
             column_map = {
                 '日期': 'date',
@@ -130,14 +414,14 @@ class StockRater:
                 '成交量': 'volume'
             }
         else:
-            return df_copy
+            return df
 
         # Only rename columns that exist in the mapping
-        existing_columns = {k: v for k, v in column_map.items() if k in df_copy.columns}
+        existing_columns = {k: v for k, v in column_map.items() if k in df.columns}
         if existing_columns:
-            df_copy = df_copy.rename(columns=existing_columns)
+            return df.rename(columns=existing_columns, **RENAME_NO_COPY)
 
-        return df_copy
+        return df
 
     def _validate_inputs(
         self,
@@ -159,24 +443,28 @@ class StockRater:
             ValueError: If validation fails with clear error messages
         """
         # Check stock code format
-        if not stock_code or not isinstance(stock_code, str):
+        if type(stock_code) is not str or not stock_code:
             raise ValueError("Stock code must be a non-empty string")
 
+        kline_rows = len(kline_df)
+        financial_rows = len(financial_df)
+        money_flow_rows = len(money_flow_df)
+
         # Check DataFrames are not empty
-        if kline_df.empty:
+        if kline_rows == 0:
             raise ValueError("K-line DataFrame cannot be empty")
-        if financial_df.empty:
+        if financial_rows == 0:
             raise ValueError("Financial DataFrame cannot be empty")
-        if money_flow_df.empty:
+        if money_flow_rows == 0:
             raise ValueError("Money flow DataFrame cannot be empty")
 
         # Check minimum data length
-        if len(kline_df) < self.MIN_KLINE_ROWS:
-            raise ValueError(f"K-line data must have at least {self.MIN_KLINE_ROWS} rows, got {len(kline_df)}")
-        if len(financial_df) < self.MIN_FINANCIAL_ROWS:
-            raise ValueError(f"Financial data must have at least {self.MIN_FINANCIAL_ROWS} rows, got {len(financial_df)}")
-        if len(money_flow_df) < self.MIN_MONEY_FLOW_ROWS:
-            raise ValueError(f"Money flow data must have at least {self.MIN_MONEY_FLOW_ROWS} rows, got {len(money_flow_df)}")
+        if kline_rows < self.MIN_KLINE_ROWS:
+            raise ValueError(f"K-line data must have at least {self.MIN_KLINE_ROWS} rows, got {kline_rows}")
+        if financial_rows < self.MIN_FINANCIAL_ROWS:
+            raise ValueError(f"Financial data must have at least {self.MIN_FINANCIAL_ROWS} rows, got {financial_rows}")
+        if money_flow_rows < self.MIN_MONEY_FLOW_ROWS:
+            raise ValueError(f"Money flow data must have at least {self.MIN_MONEY_FLOW_ROWS} rows, got {money_flow_rows}")
 
         # Check required columns exist in kline_df (after standardization, should have 'close')
         required_kline_cols = ['close']
@@ -184,8 +472,10 @@ class StockRater:
         if missing_cols:
             raise ValueError(f"K-line DataFrame missing required columns: {missing_cols}")
 
-        # Check for NaN in critical fields
-        if kline_df['close'].isnull().any():
+        # Check for NaN in critical fields, limited to the window scoring actually reads
+        # (indicators already tolerate NaN earlier in the series)
+        nan_window = max(self.MIN_KLINE_ROWS, self.KLINE_NAN_CHECK_WINDOW)
+        if pd.isna(kline_df['close'].to_numpy()[-nan_window:]).any():
             raise ValueError("K-line 'close' column contains NaN values")
 
     def analyze_stock(
@@ -193,7 +483,8 @@ class StockRater:
         stock_code: str,
         kline_df: pd.DataFrame,
         financial_df: pd.DataFrame,
-        money_flow_df: pd.DataFrame
+        money_flow_df: pd.DataFrame,
+        include_ai_insights: bool = True
     ) -> Dict[str, Any]:
         """
         综合股票分析，生成AI评级
@@ -203,6 +494,7 @@ class StockRater:
             kline_df: K线数据
             financial_df: 财务数据
             money_flow_df: 资金流向数据
+            include_ai_insights: 是否调用DeepSeek生成洞察，False或信心度低于 ai_min_confidence 时使用本地默认洞察
 
         Returns:
             综合评级结果字典
@@ -210,7 +502,7 @@ class StockRater:
         Raises:
             ValueError: 当输入数据为空时
         """
-        logger.info(f"Analyzing stock {stock_code}...")
+        logger.info("Analyzing stock {}...", stock_code)
 
         # Standardize column names
         kline_df = self._standardize_dataframe_columns(kline_df, 'kline')
@@ -220,21 +512,30 @@ class StockRater:
         # Validate inputs
         self._validate_inputs(stock_code, kline_df, financial_df, money_flow_df)
 
-        # 1. 技术面分析
-        technical_score = self._analyze_technical(kline_df)
-        logger.debug(f"Technical score: {technical_score}")
+        # 一次性取出收盘价尾部视图（最多5根，供趋势兜底），后续评分不再索引DataFrame；
+        # tolist 直接得到Python原生数值，无需逐个 float() 转换
+        close_tail = kline_df['close'].to_numpy()[-5:]
+        prev_close, last_close = close_tail[-2:].tolist()
 
-        # 2. 基本面分析
-        fundamental_score = self._analyze_fundamental(financial_df)
-        logger.debug(f"Fundamental score: {fundamental_score}")
+        # 1-3. 技术面/基本面/资金面分析相互独立（各自使用不同的分析器），并行执行；
+        # 计算主要在 NumPy/pandas 中进行，会释放GIL
+        executor = self._get_executor()
+        technical_future = executor.submit(self._analyze_technical, stock_code, kline_df, close_tail)
+        fundamental_future = executor.submit(self._analyze_fundamental, financial_df)
+        capital_future = executor.submit(self._analyze_capital, money_flow_df)
 
-        # 3. 资金面分析
-        capital_score, capital_signal = self._analyze_capital(money_flow_df)
-        logger.debug(f"Capital score: {capital_score}, signal: {capital_signal}")
+        technical_score = technical_future.result()
+        logger.debug("Technical score: {}", technical_score)
+
+        fundamental_score = fundamental_future.result()
+        logger.debug("Fundamental score: {}", fundamental_score)
+
+        capital_score, capital_signal = capital_future.result()
+        logger.debug("Capital score: {}, signal: {}", capital_score, capital_signal)
 
         # 4. 情绪面分析（基于资金流向和AI分析）
         sentiment_score = self._analyze_sentiment(capital_signal, capital_score)
-        logger.debug(f"Sentiment score: {sentiment_score}")
+        logger.debug("Sentiment score: {}", sentiment_score)
 
         # 5. 计算加权综合分数
         overall_score = self._calculate_weighted_score(
@@ -243,11 +544,11 @@ class StockRater:
             capital_score,
             sentiment_score
         )
-        logger.info(f"Overall score: {overall_score}")
+        logger.info("Overall score: {}", overall_score)
 
         # 6. 确定评级
         rating = self._determine_rating(overall_score)
-        logger.info(f"Rating: {rating}")
+        logger.info("Rating: {}", rating)
 
         # 7. 计算信心度
         confidence = self._calculate_confidence(
@@ -257,47 +558,243 @@ class StockRater:
             sentiment_score,
             overall_score
         )
-        logger.info(f"Confidence: {confidence}")
+        logger.info("Confidence: {}", confidence)
+
+        # 8. AI洞察只依赖上述分数，先行提交，与后续本地结果组装重叠执行
+        analysis_data = AnalysisBundle(
+            last_close,
+            technical_score,
+            fundamental_score,
+            capital_score,
+            capital_signal,
+            sentiment_score,
+            overall_score,
+            rating,
+            confidence
+        )
+        insights_future = None
+        if include_ai_insights and confidence >= self.ai_min_confidence:
+            insights_future = self._submit_ai_insights(stock_code, analysis_data)
+
+        result = self._build_result(stock_code, prev_close, analysis_data, insights_future)
+
+        logger.info("Stock analysis completed for {}", stock_code)
+        return result
+
+    @classmethod
+    def analyze_batch(
+        cls,
+        tickers_data: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]],
+        max_workers: Optional[int] = None,
+        include_ai_insights: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        使用多进程并行分析多只股票（绕过GIL，适用于全市场筛选）
+
+        每个工作进程只初始化一次评级器。默认不调用DeepSeek，
+        仅运行本地评分流程，使进程池尽快返回。
+
+        Args:
+            tickers_data: {股票代码: (K线数据, 财务数据, 资金流向数据)}
+            max_workers: 最大进程数，None表示使用CPU核数
+            include_ai_insights: 是否为每只股票调用DeepSeek生成洞察
+
+        Returns:
+            {股票代码: 综合评级结果字典}，分析失败的股票不包含在结果中
+        """
+        logger.info("Analyzing {} stocks in process pool...", len(tickers_data))
+        results = {}
+        if not tickers_data:
+            return results
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_pool_init) as executor:
+            futures = {
+                executor.submit(
+                    _pool_analyze,
+                    str(code),
+                    kline_df,
+                    financial_df,
+                    money_flow_df,
+                    include_ai_insights
+                ): code
+                for code, (kline_df, financial_df, money_flow_df) in tickers_data.items()
+            }
+
+            for future in as_completed(futures):
+                code = futures[future]
+                try:
+                    results[code] = future.result()
+                except Exception as e:
+                    logger.error("Error analyzing {}: {}", code, e)
+
+        logger.info("Process pool analysis completed: {}/{} stocks", len(results), len(tickers_data))
+        return results
+
+    def analyze_stocks_batch(
+        self,
+        stocks_data: Dict[str, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]],
+        include_ai_insights: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        批量分析多只股票，数值评分部分按列向量化计算
+
+        每只股票的K线最后一行特征被打包为 features[N, k] 矩阵（SoA布局），
+        技术面评分、加权综合分、评级和信心度在N只股票上一次性计算。
+
+        Args:
+            stocks_data: {股票代码: (K线数据, 财务数据, 资金流向数据)}
+            include_ai_insights: 是否调用DeepSeek生成洞察，False或信心度低于 ai_min_confidence 时使用本地默认洞察
+
+        Returns:
+            {股票代码: 综合评级结果字典}，结构与 analyze_stock 相同
+
+        Raises:
+            ValueError: 当任一股票输入数据无效时
+        """
+        logger.info("Batch analyzing {} stocks...", len(stocks_data))
+        if not stocks_data:
+            return {}
+
+        # 批量入口统一转为内置str（如NumPy字符串），单只校验只接受str
+        codes = [str(code) for code in stocks_data]
+        inputs = list(stocks_data.values())
+        n = len(codes)
+        n_features = len(self.TECH_FEATURE_COLUMNS)
+
+        features = np.empty((n, n_features), dtype=np.float64)
+        fundamental_scores = np.empty(n, dtype=np.float64)
+        capital_scores = np.empty(n, dtype=np.float64)
+        capital_signals = []
+        last_closes = np.empty(n, dtype=np.float64)
+        prev_closes = np.empty(n, dtype=np.float64)
+        close_tails = []
+
+        for i, code in enumerate(codes):
+            kline_df, financial_df, money_flow_df = inputs[i]
+            kline_df = self._standardize_dataframe_columns(kline_df, 'kline')
+            financial_df = self._standardize_dataframe_columns(financial_df, 'financial')
+            money_flow_df = self._standardize_dataframe_columns(money_flow_df, 'money_flow')
+            self._validate_inputs(code, kline_df, financial_df, money_flow_df)
+            close_tail = kline_df['close'].to_numpy()[-5:]
+            last_closes[i] = close_tail[-1]
+            prev_closes[i] = close_tail[-2]
+            close_tails.append(close_tail)
+
+            features[i] = self._latest_features(self._calculate_indicators(code, kline_df))
+            features[i, 0] = last_closes[i]
+
+            fundamental_scores[i] = self._analyze_fundamental(financial_df)
+            capital_score, capital_signal = self._analyze_capital(money_flow_df)
+            capital_scores[i] = capital_score
+            capital_signals.append(capital_signal)
+
+        # 向量化评分
+        technical_scores, indicators_found = self._score_technical_batch(features)
+        fallback = np.flatnonzero(indicators_found == 0)
+        if fallback.size:
+            logger.warning(
+                "No technical indicators found for {}, using simple price trend analysis",
+                [codes[i] for i in fallback]
+            )
+            technical_scores[fallback] = self._simple_trend_score_batch([close_tails[i] for i in fallback])
+
+        sentiment_scores = self.sentiment_batch(capital_signals, capital_scores)
+
+        scores_matrix = np.column_stack([technical_scores, fundamental_scores, capital_scores, sentiment_scores])
+        overall_scores = self.weighted_scores_batch(scores_matrix)
+        rating_ids = np.searchsorted(self._rating_thresholds, overall_scores, side='right')
+        ratings = np.asarray(self._rating_labels, dtype=object)[rating_ids]
+        confidences = self._calculate_confidence_batch(
+            technical_scores,
+            fundamental_scores,
+            capital_scores,
+            sentiment_scores,
+            overall_scores
+        )
 
-        # 8. 获取当前价格
-        current_price = float(kline_df['close'].iloc[-1])
+        # 逐只组装结果（各列一次性 tolist 转为Python原生float）
+        columns = zip(
+            codes,
+            last_closes.tolist(),
+            prev_closes.tolist(),
+            technical_scores.tolist(),
+            fundamental_scores.tolist(),
+            capital_scores.tolist(),
+            capital_signals,
+            sentiment_scores.tolist(),
+            overall_scores.tolist(),
+            ratings,
+            confidences.tolist()
+        )
+        pending = [
+            (code, prev_close, AnalysisBundle(last_close, *scores))
+            for code, last_close, prev_close, *scores in columns
+        ]
+
+        # 先提交全部AI洞察请求，网络往返在本地组装结果期间并发进行
+        min_confidence = self.ai_min_confidence
+        futures = [
+            self._submit_ai_insights(code, data)
+            if include_ai_insights and data.confidence >= min_confidence else None
+            for code, _, data in pending
+        ]
+
+        results = {}
+        for (code, prev_close, analysis_data), insights_future in zip(pending, futures):
+            results[code] = self._build_result(code, prev_close, analysis_data, insights_future)
+
+        logger.info("Batch analysis completed for {} stocks", n)
+        return results
+
+    def _build_result(
+        self,
+        stock_code: str,
+        prev_close: float,
+        analysis_data: AnalysisBundle,
+        insights_future: Optional[Future] = None
+    ) -> Dict[str, Any]:
+        """
+        根据各维度分数组装最终评级结果
 
-        # 9. 计算目标价和止损价
-        target_price = self._calculate_target_price(current_price, overall_score, rating)
-        stop_loss = self._calculate_stop_loss(current_price, overall_score, rating)
+        Args:
+            stock_code: 股票代码
+            prev_close: 前一交易日收盘价
+            analysis_data: 各维度分析结果
+            insights_future: 已提交的AI洞察任务，None时使用本地默认洞察
 
-        # 10. 生成原因和风险
-        reasons = self._generate_reasons(
+        Returns:
+            综合评级结果字典
+        """
+        current_price = analysis_data.current_price
+        technical_score = analysis_data.technical_score
+        fundamental_score = analysis_data.fundamental_score
+        capital_score = analysis_data.capital_score
+        overall_score = analysis_data.overall_score
+        rating = analysis_data.rating
+
+        # 9-10. 按评级生成目标价、止损价、原因和风险
+        target_price, stop_loss, reasons, risks = self._finalize_by_rating(
             rating,
+            overall_score,
+            current_price,
             technical_score,
             fundamental_score,
             capital_score,
-            capital_signal
+            analysis_data.capital_signal
         )
-        risks = self._generate_risks(rating, overall_score)
 
         # 11. 评估A股特有风险
-        a_share_risks = self._assess_a_share_risks(stock_code, kline_df, rating)
+        a_share_risks = self._assess_a_share_risks(stock_code, current_price, prev_close, rating)
 
-        # 12. 使用AI生成综合洞察
-        ai_insights = self._generate_ai_insights(
-            stock_code,
-            {
-                'technical_score': technical_score,
-                'fundamental_score': fundamental_score,
-                'capital_score': capital_score,
-                'sentiment_score': sentiment_score,
-                'overall_score': overall_score,
-                'rating': rating,
-                'confidence': confidence,
-                'capital_signal': capital_signal,
-                'current_price': current_price
-            }
-        )
+        # 12. 收取AI综合洞察
+        if insights_future is None:
+            ai_insights = self._generate_default_insights(analysis_data)
+        else:
+            ai_insights = self._collect_ai_insights(stock_code, insights_future, analysis_data)
 
-        result = {
+        return {
             'rating': rating,
-            'confidence': confidence,
+            'confidence': analysis_data.confidence,
             'target_price': round(target_price, 2),
             'stop_loss': round(stop_loss, 2),
             'reasons': reasons,
@@ -312,121 +809,252 @@ class StockRater:
             }
         }
 
-        logger.info(f"Stock analysis completed for {stock_code}")
-        return result
-
-    def _analyze_technical(self, kline_df: pd.DataFrame) -> float:
+    def _analyze_technical(self, stock_code: str, kline_df: pd.DataFrame, close_tail: np.ndarray) -> float:
         """
         分析技术面
 
         Args:
+            stock_code: 股票代码
             kline_df: K线数据
+            close_tail: 最近最多5个交易日收盘价（NumPy视图，末尾为最新收盘价）
 
         Returns:
             技术面分数（0-100）
         """
         # 计算所有技术指标
+        df_with_indicators = self._calculate_indicators(stock_code, kline_df)
+
+        # 按固定列顺序取最新一行特征（缺失列为NaN），交给可JIT编译的评分内核
+        features = self._latest_features(df_with_indicators)
+        features[0] = close_tail[-1]
+        total_score, indicators_found = _score_technical_kernel(tuple(features.tolist()), self._tech_thresholds)
+
+        # 如果没有找到任何指标，给出一个基于价格趋势的简单分数
+        if indicators_found == 0:
+            logger.warning("No technical indicators found, using simple price trend analysis")
+            return self._simple_trend_score(close_tail)
+
+        # 计算平均分数
+        return min(total_score / indicators_found, 100.0)
+
+    def _latest_features(self, df_with_indicators: pd.DataFrame) -> np.ndarray:
+        """
+        提取最新一行的技术特征
+
+        一次 get_indexer 得到全部特征列的位置（缺失为-1），代替逐列的成员检查。
+
+        Args:
+            df_with_indicators: 含技术指标的K线数据
+
+        Returns:
+            按 TECH_FEATURE_COLUMNS 顺序排列的浮点数组，缺失列为NaN
+        """
+        positions = df_with_indicators.columns.get_indexer(self.TECH_FEATURE_COLUMNS)
+        present = positions >= 0
+        features = np.full(len(positions), np.nan)
+        features[present] = df_with_indicators.iloc[-1].to_numpy()[positions[present]].astype(np.float64)
+        return features
+
+    def _calculate_indicators(self, stock_code: str, kline_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        计算所有技术指标并标准化列名，按K线指纹缓存结果
+
+        同一会话内重复分析相同K线（如批量扫描后再逐只查看）时直接复用指标结果。
+        返回的DataFrame被缓存共享，调用方不应修改。
+
+        Args:
+            stock_code: 股票代码
+            kline_df: K线数据（已标准化）
+
+        Returns:
+            添加所有指标的DataFrame
+        """
+        fingerprint = self._kline_fingerprint(stock_code, kline_df)
+        with self._indicator_cache_lock:
+            cached = self._indicator_cache.get(fingerprint)
+            if cached is not None:
+                self._indicator_cache.move_to_end(fingerprint)
+                return cached
+
         df_with_indicators = self.technical_indicators.calculate_all(kline_df)
 
         # Ensure columns are standardized (TechnicalIndicators should do this, but double-check)
         df_with_indicators = self._standardize_dataframe_columns(df_with_indicators, 'kline')
 
-        score = 0.0
-        indicators_found = 0
-        total_indicators = 7  # 7个主要指标
+        with self._indicator_cache_lock:
+            self._indicator_cache[fingerprint] = df_with_indicators
+            if len(self._indicator_cache) > self.INDICATOR_CACHE_SIZE:
+                self._indicator_cache.popitem(last=False)
+        return df_with_indicators
+
+    def _kline_fingerprint(self, stock_code: str, kline_df: pd.DataFrame) -> tuple:
+        """
+        构建K线指纹：股票代码、行数、最后日期、首尾收盘价
+
+        Args:
+            stock_code: 股票代码
+            kline_df: K线数据（已标准化）
+
+        Returns:
+            指纹元组
+        """
+        close = kline_df['close']
+        last_date = kline_df['date'].iat[-1] if 'date' in kline_df.columns else None
+        return (stock_code, len(kline_df), last_date, close.iat[0], close.iat[-1])
+
+    def _simple_trend_score(self, recent_close: np.ndarray) -> float:
+        """
+        基于最近收盘价趋势的简单技术分数（无指标时的兜底）
+
+        Args:
+            recent_close: 最近5个交易日收盘价
+
+        Returns:
+            技术面分数（0-100）
+        """
+        if len(recent_close) >= 5:
+            trend = recent_close[-1] / recent_close[0] - 1
+            if trend > self.BUY_TARGET_GAIN_MIN:
+                return 75.0
+            elif trend > 0:
+                return 60.0
+            elif trend > -self.BUY_TARGET_GAIN_MIN:
+                return 45.0
+            else:
+                return 30.0
+        return 50.0
+
+    def _simple_trend_score_batch(self, close_tails: List[np.ndarray]) -> np.ndarray:
+        """
+        批量计算简单趋势分数（与 _simple_trend_score 规则一致）
+
+        Args:
+            close_tails: 各股票最近最多5个交易日收盘价
+
+        Returns:
+            技术面分数数组（0-100），不足5个交易日的为50
+        """
+        scores = np.full(len(close_tails), 50.0)
+        full = [i for i, tail in enumerate(close_tails) if len(tail) >= 5]
+        if full:
+            tails = np.stack([close_tails[i] for i in full])
+            trend = tails[:, -1] / tails[:, 0] - 1
+            gain = self.BUY_TARGET_GAIN_MIN
+            scores[full] = np.select([trend > gain, trend > 0, trend > -gain], [75.0, 60.0, 45.0], default=30.0)
+        return scores
+
+    def score_technical_batch(self, latest: pd.DataFrame) -> pd.Series:
+        """
+        批量计算技术面分数（每行一只股票的最新指标值）
+
+        典型用法：latest = pd.concat([calc(kline).iloc[[-1]] for kline in klines])。
+        缺失或为NaN的指标不参与评分；没有任何指标的行返回50分（无K线历史可做趋势兜底）。
+
+        Args:
+            latest: 每行一只股票的最新指标值，列名同 TECH_FEATURE_COLUMNS
+
+        Returns:
+            技术面分数Series（0-100），索引与 latest 相同
+        """
+        latest = self._standardize_dataframe_columns(latest, 'kline')
+        n = len(latest)
+        features = np.full((n, len(self.TECH_FEATURE_COLUMNS)), np.nan, dtype=np.float64)
+        for j, col in enumerate(self.TECH_FEATURE_COLUMNS):
+            if col in latest.columns:
+                features[:, j] = latest[col].to_numpy(dtype=np.float64)
+
+        scores, _ = self._score_technical_batch(features)
+        return pd.Series(scores, index=latest.index, name='technical_score')
+
+    def _score_technical_batch(
+        self,
+        features: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按列向量化计算N只股票的技术面分数，规则与 _score_technical_kernel 一致
+
+        Args:
+            features: 最后一行特征矩阵 [N, k]，列顺序见 TECH_FEATURE_COLUMNS，缺失为NaN
+
+        Returns:
+            (技术面分数[N], 找到的指标数[N])；指标数为0的行分数无意义，需调用方兜底
+        """
+        col = {name: j for j, name in enumerate(self.TECH_FEATURE_COLUMNS)}
+        f = {name: features[:, j] for name, j in col.items()}
+        p = {name: ~np.isnan(features[:, j]) for name, j in col.items()}
+        close = f['close']
+
+        n = features.shape[0]
+        score = np.zeros(n, dtype=np.float64)
+        found = np.zeros(n, dtype=np.int64)
+
+        def add(has: np.ndarray, conditions: list, values: list) -> None:
+            nonlocal score, found
+            found += has
+            score += np.where(has, np.select(conditions, values, default=0.0), 0.0)
 
         # 1. MA趋势分析
-        if 'MA5' in df_with_indicators.columns and 'MA20' in df_with_indicators.columns:
-            indicators_found += 1
-            ma5 = df_with_indicators['MA5'].iloc[-1]
-            ma20 = df_with_indicators['MA20'].iloc[-1]
-            close = df_with_indicators['close'].iloc[-1]
-            if ma5 > ma20 and close > ma5:
-                score += 100.0
-            elif ma5 > ma20 or close > ma20:
-                score += 50.0
+        ma5, ma20 = f['MA5'], f['MA20']
+        add(
+            p['MA5'] & p['MA20'],
+            [(ma5 > ma20) & (close > ma5), (ma5 > ma20) | (close > ma20)],
+            [100.0, 50.0]
+        )
 
         # 2. MACD分析
-        if 'MACD' in df_with_indicators.columns and 'MACD_signal' in df_with_indicators.columns:
-            indicators_found += 1
-            macd = df_with_indicators['MACD'].iloc[-1]
-            macd_signal = df_with_indicators['MACD_signal'].iloc[-1]
-            if macd > macd_signal and macd > 0:
-                score += 100.0
-            elif macd > macd_signal:
-                score += 70.0
+        macd, macd_signal = f['MACD'], f['MACD_signal']
+        add(
+            p['MACD'] & p['MACD_signal'],
+            [(macd > macd_signal) & (macd > 0), macd > macd_signal],
+            [100.0, 70.0]
+        )
 
         # 3. RSI分析
-        if 'RSI' in df_with_indicators.columns:
-            indicators_found += 1
-            rsi = df_with_indicators['RSI'].iloc[-1]
-            if self.RSI_HEALTHY_LOW <= rsi <= self.RSI_HEALTHY_HIGH:  # 健康区间
-                score += 100.0
-            elif self.RSI_OVERSOLD <= rsi < self.RSI_HEALTHY_LOW or self.RSI_HEALTHY_HIGH < rsi <= self.RSI_OVERBOUGHT:
-                score += 50.0
+        rsi = f['RSI']
+        add(
+            p['RSI'],
+            [
+                (rsi >= self.RSI_HEALTHY_LOW) & (rsi <= self.RSI_HEALTHY_HIGH),
+                ((rsi >= self.RSI_OVERSOLD) & (rsi < self.RSI_HEALTHY_LOW)) |
+                ((rsi > self.RSI_HEALTHY_HIGH) & (rsi <= self.RSI_OVERBOUGHT))
+            ],
+            [100.0, 50.0]
+        )
 
         # 4. KDJ分析
-        if 'K' in df_with_indicators.columns and 'D' in df_with_indicators.columns:
-            indicators_found += 1
-            k = df_with_indicators['K'].iloc[-1]
-            d = df_with_indicators['D'].iloc[-1]
-            if k > d and k < self.KDJ_OVERBOUGHT:
-                score += 100.0
-            elif k > d:
-                score += 50.0
+        k, d = f['K'], f['D']
+        add(
+            p['K'] & p['D'],
+            [(k > d) & (k < self.KDJ_OVERBOUGHT), k > d],
+            [100.0, 50.0]
+        )
 
         # 5. 布林带分析
-        if 'BOLL_UPPER' in df_with_indicators.columns and 'BOLL_LOWER' in df_with_indicators.columns:
-            indicators_found += 1
-            close = df_with_indicators['close'].iloc[-1]
-            boll_upper = df_with_indicators['BOLL_UPPER'].iloc[-1]
-            boll_lower = df_with_indicators['BOLL_LOWER'].iloc[-1]
-            boll_middle = df_with_indicators['BOLL_MIDDLE'].iloc[-1]
-            if boll_lower < close < boll_middle:
-                score += 100.0
-            elif close < boll_upper:
-                score += 50.0
+        boll_upper, boll_lower, boll_middle = f['BOLL_UPPER'], f['BOLL_LOWER'], f['BOLL_MIDDLE']
+        add(
+            p['BOLL_UPPER'] & p['BOLL_LOWER'] & p['BOLL_MIDDLE'],
+            [(boll_lower < close) & (close < boll_middle), close < boll_upper],
+            [100.0, 50.0]
+        )
 
         # 6. 成交量分析
-        if 'VOL_MA5' in df_with_indicators.columns:
-            indicators_found += 1
-            volume = df_with_indicators['volume'].iloc[-1]
-            vol_ma5 = df_with_indicators['VOL_MA5'].iloc[-1]
-            if volume > vol_ma5 * self.VOLUME_SURGE_RATIO:  # 放量
-                score += 80.0
-            elif volume > vol_ma5 * self.VOLUME_NORMAL_RATIO:
-                score += 50.0
+        volume, vol_ma5 = f['volume'], f['VOL_MA5']
+        add(
+            p['VOL_MA5'] & p['volume'],
+            [volume > vol_ma5 * self.VOLUME_SURGE_RATIO, volume > vol_ma5 * self.VOLUME_NORMAL_RATIO],
+            [80.0, 50.0]
+        )
 
         # 7. ATR波动率分析
-        if 'ATR' in df_with_indicators.columns:
-            indicators_found += 1
-            atr = df_with_indicators['ATR'].iloc[-1]
-            close = df_with_indicators['close'].iloc[-1]
-            atr_ratio = atr / close if close > 0 else 0
-            if atr_ratio < self.ATR_LOW_VOLATILITY:  # 低波动
-                score += 70.0
-            elif atr_ratio < self.ATR_MEDIUM_VOLATILITY:
-                score += 50.0
-
-        # 如果没有找到任何指标，给出一个基于价格趋势的简单分数
-        if indicators_found == 0:
-            logger.warning("No technical indicators found, using simple price trend analysis")
-            if len(df_with_indicators) >= 5:
-                recent_close = df_with_indicators['close'].iloc[-5:]
-                trend = recent_close.iloc[-1] / recent_close.iloc[0] - 1
-                if trend > self.BUY_TARGET_GAIN_MIN:
-                    return 75.0
-                elif trend > 0:
-                    return 60.0
-                elif trend > -self.BUY_TARGET_GAIN_MIN:
-                    return 45.0
-                else:
-                    return 30.0
-            return 50.0
+        atr_ratio = np.divide(f['ATR'], close, out=np.zeros(n, dtype=np.float64), where=close > 0)
+        add(
+            p['ATR'],
+            [atr_ratio < self.ATR_LOW_VOLATILITY, atr_ratio < self.ATR_MEDIUM_VOLATILITY],
+            [70.0, 50.0]
+        )
 
-        # 计算平均分数
-        final_score = score / indicators_found if indicators_found > 0 else 50.0
-        return min(final_score, 100.0)
+        final_score = np.divide(score, found, out=np.full(n, 50.0), where=found > 0)
+        return np.minimum(final_score, 100.0), found
 
     def _analyze_fundamental(self, financial_df: pd.DataFrame) -> float:
         """
@@ -450,8 +1078,9 @@ class StockRater:
         Returns:
             (资金面分数, 资金信号)
         """
-        signal = self.money_flow_analyzer.get_money_flow_signal(money_flow_df)
+        # 摘要已包含信号，无需再单独调用 get_money_flow_signal 重复整套分析
         summary = self.money_flow_analyzer.generate_summary(money_flow_df)
+        signal = summary['signal']
 
         # 根据信号和主力强度计算分数
         main_force = summary['main_force']
@@ -497,6 +1126,25 @@ class StockRater:
         else:
             return capital_score
 
+    def sentiment_batch(self, capital_signals, capital_scores) -> np.ndarray:
+        """
+        批量分析情绪面（与 _analyze_sentiment 规则一致）
+
+        Args:
+            capital_signals: 资金信号序列
+            capital_scores: 资金分数序列
+
+        Returns:
+            情绪面分数数组（0-100）
+        """
+        signals = np.asarray(capital_signals, dtype=object)
+        scores = np.asarray(capital_scores, dtype=np.float64)
+        return np.where(
+            signals == '买入',
+            np.minimum(scores * 1.1, 100.0),
+            np.where(signals == '卖出', np.maximum(scores * 0.9, 0.0), scores)
+        )
+
     def _calculate_weighted_score(
         self,
         technical_score: float,
@@ -516,13 +1164,28 @@ class StockRater:
         Returns:
             加权综合分数（0-100）
         """
-        overall = (
-            technical_score * self.weights['technical'] +
-            fundamental_score * self.weights['fundamental'] +
-            capital_score * self.weights['capital'] +
-            sentiment_score * self.weights['sentiment']
+        return round(
+            technical_score * self._wt +
+            fundamental_score * self._wf +
+            capital_score * self._wc +
+            sentiment_score * self._ws,
+            2
         )
-        return round(overall, 2)
+
+    def weighted_scores_batch(self, scores_matrix: np.ndarray) -> np.ndarray:
+        """
+        批量计算加权综合分数
+
+        Args:
+            scores_matrix: 形状为 (N, 4) 的分数矩阵，列依次为技术面、基本面、资金面、情绪面
+
+        Returns:
+            长度为N的加权综合分数数组（保留两位小数）
+        """
+        scores_matrix = np.asarray(scores_matrix, dtype=np.float64)
+        if scores_matrix.ndim != 2 or scores_matrix.shape[1] != 4:
+            raise ValueError(f"分数矩阵必须为 (N, 4)，实际为 {scores_matrix.shape}")
+        return np.round(scores_matrix @ self._weights_vec, 2)
 
     def _determine_rating(self, overall_score: float) -> str:
         """
@@ -534,12 +1197,7 @@ class StockRater:
         Returns:
             评级：'buy', 'hold', 'sell'
         """
-        if overall_score >= self.RATING_BUY_THRESHOLD:
-            return 'buy'
-        elif overall_score >= self.RATING_HOLD_THRESHOLD:
-            return 'hold'
-        else:
-            return 'sell'
+        return self._rating_labels[bisect_right(self._rating_thresholds, overall_score)]
 
     def _calculate_confidence(
         self,
@@ -562,9 +1220,14 @@ class StockRater:
         Returns:
             信心度（1-10）
         """
-        # 计算各维度的一致性
-        scores = [technical_score, fundamental_score, capital_score, sentiment_score]
-        std_dev = np.std(scores)
+        # 计算各维度的一致性（4个分数的总体标准差，闭式计算避免NumPy小数组开销）
+        mean = 0.25 * (technical_score + fundamental_score + capital_score + sentiment_score)
+        std_dev = math.sqrt(0.25 * (
+            (technical_score - mean) ** 2 +
+            (fundamental_score - mean) ** 2 +
+            (capital_score - mean) ** 2 +
+            (sentiment_score - mean) ** 2
+        ))
 
         # 标准差越小，一致性越高，信心度越高
         consistency_factor = max(0, 1 - std_dev / self.CONSISTENCY_DIVISOR)
@@ -602,177 +1265,188 @@ class StockRater:
         # 限制在1-10范围内
         return max(1.0, min(10.0, round(confidence, 1)))
 
-    def _calculate_target_price(self, current_price: float, overall_score: float, rating: str) -> float:
+    def _calculate_confidence_batch(
+        self,
+        technical_scores: np.ndarray,
+        fundamental_scores: np.ndarray,
+        capital_scores: np.ndarray,
+        sentiment_scores: np.ndarray,
+        overall_scores: np.ndarray
+    ) -> np.ndarray:
         """
-        计算目标价
+        向量化计算N只股票的信心度，逻辑与 _calculate_confidence 一致
 
         Args:
-            current_price: 当前价格
-            overall_score: 综合分数
-            rating: 评级
+            technical_scores: 技术面分数[N]
+            fundamental_scores: 基本面分数[N]
+            capital_scores: 资金面分数[N]
+            sentiment_scores: 情绪面分数[N]
+            overall_scores: 综合分数[N]
 
         Returns:
-            目标价
+            信心度[N]（1-10）
         """
-        if rating == 'buy':
-            # 根据分数计算涨幅（5%-25%）
-            gain_ratio = self.BUY_TARGET_GAIN_MIN + (overall_score - self.RATING_BUY_THRESHOLD) / 100 * self.BUY_TARGET_GAIN_MAX
-            return current_price * (1 + gain_ratio)
-        elif rating == 'sell':
-            # 根据分数计算跌幅（5%-20%）
-            loss_ratio = self.SELL_LOSS_MIN + (self.RATING_HOLD_THRESHOLD - overall_score) / 100 * self.SELL_LOSS_MAX
-            return current_price * (1 - loss_ratio)
-        else:  # hold
-            # 持有时目标价接近当前价，略有上涨
-            return current_price * (1 + self.HOLD_TARGET_GAIN)
-
-    def _calculate_stop_loss(self, current_price: float, overall_score: float, rating: str) -> float:
-        """
-        计算止损价
+        # 与单只路径相同的闭式总体标准差，无需拼接 [N, 4] 矩阵
+        mean = 0.25 * (technical_scores + fundamental_scores + capital_scores + sentiment_scores)
+        std_dev = np.sqrt(0.25 * (
+            (technical_scores - mean) ** 2 +
+            (fundamental_scores - mean) ** 2 +
+            (capital_scores - mean) ** 2 +
+            (sentiment_scores - mean) ** 2
+        ))
+
+        consistency_factor = np.maximum(0, 1 - std_dev / self.CONSISTENCY_DIVISOR)
+        extremity_factor = np.abs(overall_scores - self.SCORE_EXTREME_THRESHOLD) / self.SCORE_EXTREME_THRESHOLD
+
+        is_buy = overall_scores >= self.RATING_BUY_THRESHOLD
+        base_confidence = np.select(
+            [
+                is_buy,
+                overall_scores >= self.SCORE_EXTREME_THRESHOLD,
+                overall_scores >= self.SCORE_LOW_THRESHOLD
+            ],
+            [
+                7.5 + (overall_scores - self.RATING_BUY_THRESHOLD) / 12,
+                5.0 + (overall_scores - self.SCORE_EXTREME_THRESHOLD) / 10,
+                3.0 + (overall_scores - self.SCORE_LOW_THRESHOLD) / 10
+            ],
+            default=1.0 + overall_scores / 15
+        )
 
-        Args:
-            current_price: 当前价格
-            overall_score: 综合分数
-            rating: 评级
+        confidence = np.where(
+            is_buy,
+            base_confidence * (0.7 + 0.3 * consistency_factor) * (0.8 + 0.2 * extremity_factor),
+            base_confidence * (0.6 + 0.4 * consistency_factor) * (0.7 + 0.3 * extremity_factor)
+        )
+        confidence = np.select(
+            [
+                overall_scores >= self.SCORE_HIGH_THRESHOLD,
+                overall_scores <= self.SCORE_LOW_THRESHOLD
+            ],
+            [
+                np.minimum(confidence * self.CONFIDENCE_HIGH_MULTIPLIER, 10.0),
+                np.minimum(confidence * self.CONFIDENCE_LOW_MULTIPLIER, 10.0)
+            ],
+            default=confidence
+        )
 
-        Returns:
-            止损价
-        """
-        if rating == 'buy':
-            # 买入止损为-5%到-10%
-            stop_loss_ratio = self.STOP_LOSS_BUY_MIN + (100 - overall_score) / 100 * self.STOP_LOSS_BUY_MAX
-            return current_price * (1 - stop_loss_ratio)
-        elif rating == 'sell':
-            # 卖出时止损即为当前价（建议立即卖出）
-            return current_price * (1 - self.STOP_LOSS_SELL)
-        else:  # hold
-            # 持有止损为-7%
-            return current_price * (1 - self.STOP_LOSS_HOLD)
+        return np.clip(np.round(confidence, 1), 1.0, 10.0)
 
-    def _generate_reasons(
+    def _finalize_by_rating(
         self,
         rating: str,
+        overall_score: float,
+        current_price: float,
         technical_score: float,
         fundamental_score: float,
         capital_score: float,
         capital_signal: str
-    ) -> List[str]:
+    ) -> Tuple[float, float, List[str], List[str]]:
         """
-        生成评级原因
+        按评级一次性生成目标价、止损价、评级原因和风险提示
+
+        评级只查表、分支一次，各项结果在同一分支内完成。
 
         Args:
             rating: 评级
+            overall_score: 综合分数
+            current_price: 当前价格
             technical_score: 技术面分数
             fundamental_score: 基本面分数
             capital_score: 资金面分数
             capital_signal: 资金信号
 
         Returns:
-            原因列表
+            (目标价, 止损价, 原因列表, 风险列表)
         """
-        reasons = []
-
-        if rating == 'buy':
-            if technical_score >= self.RATING_BUY_THRESHOLD:
-                reasons.append('技术面呈现强势上涨趋势')
-            if fundamental_score >= self.RATING_BUY_THRESHOLD:
-                reasons.append('基本面良好，财务指标健康')
-            if capital_score >= self.RATING_BUY_THRESHOLD:
-                reasons.append('主力资金持续流入，市场情绪积极')
-            if capital_signal == '买入':
-                reasons.append('资金流向信号显示买入机会')
-        elif rating == 'sell':
-            if technical_score < self.RATING_HOLD_THRESHOLD:
-                reasons.append('技术面走弱，下跌趋势明显')
-            if fundamental_score < self.RATING_HOLD_THRESHOLD:
-                reasons.append('基本面欠佳，财务风险较高')
-            if capital_score < self.RATING_HOLD_THRESHOLD:
-                reasons.append('主力资金流出，市场情绪悲观')
-            if capital_signal == '卖出':
-                reasons.append('资金流向信号显示卖出风险')
-        else:  # hold
-            reasons.append('综合指标显示震荡整理，建议观望')
-            if self.SCORE_EXTREME_THRESHOLD <= technical_score < self.RATING_BUY_THRESHOLD:
-                reasons.append('技术面处于平衡状态')
-            if self.SCORE_EXTREME_THRESHOLD <= fundamental_score < self.RATING_BUY_THRESHOLD:
-                reasons.append('基本面稳定，但缺乏亮点')
-
-        if not reasons:
-            reasons.append('综合分析建议当前操作')
-
-        return reasons
-
-    def _generate_risks(self, rating: str, overall_score: float) -> List[str]:
-        """
-        生成风险提示
-
-        Args:
-            rating: 评级
-            overall_score: 综合分数
-
-        Returns:
-            风险列表
-        """
-        risks = []
-
-        if rating == 'buy':
-            risks.append('市场整体波动可能影响个股表现')
+        r = self._rating_index[rating]
+
+        # 目标价 buy: 涨幅5%-25%；sell: 跌幅5%-20%；hold: 略有上涨
+        # 止损价 buy: 止损-5%到-10%；sell: 止损即为当前价附近；hold: 止损-7%
+        target_base, target_slope, stop_base, stop_slope = self._price_multipliers[r]
+        target_price = current_price * (target_base + target_slope * overall_score)
+        stop_loss = current_price * (stop_base + stop_slope * overall_score)
+
+        if r == 2:  # buy
+            reasons = list(compress(self._BUY_REASONS, (
+                technical_score >= self.RATING_BUY_THRESHOLD,
+                fundamental_score >= self.RATING_BUY_THRESHOLD,
+                capital_score >= self.RATING_BUY_THRESHOLD,
+                capital_signal == '买入'
+            )))
             if overall_score < self.SCORE_HIGH_THRESHOLD:
-                risks.append('部分指标存在分歧，需密切关注')
-        elif rating == 'sell':
-            risks.append('继续持有可能面临进一步下跌风险')
-            risks.append('建议及时止损，避免损失扩大')
+                risks = list(self._BUY_RISKS_DIVERGENT)
+            else:
+                risks = list(self._BUY_RISKS)
+        elif r == 0:  # sell
+            reasons = list(compress(self._SELL_REASONS, (
+                technical_score < self.RATING_HOLD_THRESHOLD,
+                fundamental_score < self.RATING_HOLD_THRESHOLD,
+                capital_score < self.RATING_HOLD_THRESHOLD,
+                capital_signal == '卖出'
+            )))
+            risks = list(self._SELL_RISKS)
         else:  # hold
-            risks.append('横盘整理期间可能出现方向选择')
-            risks.append('需关注市场和个股基本面变化')
+            reasons = list(compress(self._HOLD_REASONS, (
+                True,
+                self.SCORE_EXTREME_THRESHOLD <= technical_score < self.RATING_BUY_THRESHOLD,
+                self.SCORE_EXTREME_THRESHOLD <= fundamental_score < self.RATING_BUY_THRESHOLD
+            )))
+            risks = list(self._HOLD_RISKS)
 
-        # 通用风险
-        risks.append('政策和宏观环境变化风险')
+        if not reasons:
+            reasons.append(self._DEFAULT_REASON)
 
-        return risks
+        return target_price, stop_loss, reasons, risks
 
-    def _assess_a_share_risks(self, stock_code: str, kline_df: pd.DataFrame, rating: str) -> List[str]:
+    def _assess_a_share_risks(
+        self,
+        stock_code: str,
+        last_close: float,
+        prev_close: float,
+        rating: str
+    ) -> List[str]:
         """
         评估A股特有风险
 
         Args:
             stock_code: 股票代码
-            kline_df: K线数据
+            last_close: 最新收盘价
+            prev_close: 前一交易日收盘价
             rating: 评级
 
         Returns:
             A股特有风险列表
         """
         risks = []
+        append = risks.append
 
         # 1. T+1流动性风险
-        risks.append('T+1交易制度限制，当日买入次日才能卖出')
+        append('T+1交易制度限制，当日买入次日才能卖出')
 
         # 2. 涨跌停风险
-        current_price = float(kline_df['close'].iloc[-1])
-        prev_price = float(kline_df['close'].iloc[-2]) if len(kline_df) >= 2 else current_price
-        change_pct = abs((current_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
+        change_pct = abs(last_close - prev_close) * 100.0 / prev_close if prev_close > 0 else 0.0
 
         if change_pct > self.PRICE_CHANGE_HIGH:
-            risks.append('涨跌幅较大，需警惕涨跌停板限制')
+            append('涨跌幅较大，需警惕涨跌停板限制')
 
-        # 3. ST股票风险
-        if stock_code.startswith('ST') or 'ST' in stock_code:
-            risks.append('ST股票退市风险较高，投资需谨慎')
+        # 3. ST股票风险（ST_PATTERNS 中各形式均包含 'ST'，一次子串查找即可覆盖）
+        if 'ST' in stock_code:
+            append('ST股票退市风险较高，投资需谨慎')
 
         # 4. 科创板/创业板风险
-        if stock_code.startswith('688') or stock_code.startswith('300'):
-            risks.append('科创板/创业板涨跌幅限制为20%，波动较大')
+        if stock_code[:3] in self._GROWTH_BOARD_BY_PREFIX:
+            append('科创板/创业板涨跌幅限制为20%，波动较大')
 
         # 5. 买入卖出时机风险
         if rating == 'buy':
-            risks.append('建议分批建仓，降低单次买入风险')
+            append('建议分批建仓，降低单次买入风险')
         elif rating == 'sell':
-            risks.append('T+1限制下，需提前规划卖出时机')
+            append('T+1限制下，需提前规划卖出时机')
 
         return risks
 
-    def _generate_ai_insights(self, stock_code: str, analysis_data: Dict[str, Any]) -> str:
+    def _generate_ai_insights(self, stock_code: str, analysis_data: AnalysisBundle) -> str:
         """
         使用AI生成综合洞察
 
@@ -783,39 +1457,136 @@ class StockRater:
         Returns:
             AI生成的综合分析文本
         """
+        bucket_key = self._insights_bucket_key(stock_code, analysis_data)
+        cached = self._get_cached_insights(bucket_key)
+        if cached is not None:
+            logger.debug("AI insights cache hit for {}", stock_code)
+            return cached
+
         try:
-            logger.info(f"Generating AI insights for {stock_code}...")
+            logger.info("Generating AI insights for {}...", stock_code)
 
             # 构建分析数据
             ai_data = {
                 'technical': {
-                    'score': analysis_data['technical_score'],
-                    'rating': self._score_to_rating(analysis_data['technical_score'])
+                    'score': analysis_data.technical_score,
+                    'rating': self._score_to_rating(analysis_data.technical_score)
                 },
                 'fundamental': {
-                    'score': analysis_data['fundamental_score'],
-                    'rating': self._score_to_rating(analysis_data['fundamental_score'])
+                    'score': analysis_data.fundamental_score,
+                    'rating': self._score_to_rating(analysis_data.fundamental_score)
                 },
                 'capital': {
-                    'score': analysis_data['capital_score'],
-                    'signal': analysis_data['capital_signal']
+                    'score': analysis_data.capital_score,
+                    'signal': analysis_data.capital_signal
                 },
                 'overall': {
-                    'score': analysis_data['overall_score'],
-                    'rating': analysis_data['rating'],
-                    'confidence': analysis_data['confidence']
+                    'score': analysis_data.overall_score,
+                    'rating': analysis_data.rating,
+                    'confidence': analysis_data.confidence
                 }
             }
 
             insights = self.deepseek_client.analyze_stock(stock_code, ai_data)
+            self._put_cached_insights(bucket_key, insights)
             return insights
 
         except Exception as e:
-            logger.error(f"Failed to generate AI insights: {e}")
+            logger.error("Failed to generate AI insights: {}", e)
             # 返回默认分析
             return self._generate_default_insights(analysis_data)
 
-    def _generate_default_insights(self, analysis_data: Dict[str, Any]) -> str:
+    def _submit_ai_insights(self, stock_code: str, analysis_data: AnalysisBundle) -> Future:
+        """
+        异步提交AI洞察生成任务
+
+        Args:
+            stock_code: 股票代码
+            analysis_data: 分析数据
+
+        Returns:
+            AI洞察任务的Future
+        """
+        return self._get_executor().submit(self._generate_ai_insights, stock_code, analysis_data)
+
+    def _collect_ai_insights(
+        self,
+        stock_code: str,
+        insights_future: Future,
+        analysis_data: AnalysisBundle
+    ) -> str:
+        """
+        等待AI洞察结果，超时或失败时回退到本地默认洞察
+
+        Args:
+            stock_code: 股票代码
+            insights_future: _submit_ai_insights 返回的Future
+            analysis_data: 分析数据
+
+        Returns:
+            综合分析文本
+        """
+        try:
+            return insights_future.result(timeout=self.AI_INSIGHTS_TIMEOUT)
+        except FutureTimeoutError:
+            insights_future.cancel()
+            logger.warning("AI insights for {} timed out after {}s", stock_code, self.AI_INSIGHTS_TIMEOUT)
+        except Exception as e:
+            logger.error("Failed to generate AI insights: {}", e)
+        return self._generate_default_insights(analysis_data)
+
+    def _insights_bucket_key(self, stock_code: str, analysis_data: AnalysisBundle) -> tuple:
+        """
+        构建AI洞察缓存键：评级、综合分取整、各维度分数按10分分桶
+
+        Args:
+            stock_code: 股票代码（提示词包含股票代码，不同股票不共享结果）
+            analysis_data: 分析数据
+
+        Returns:
+            缓存键
+        """
+        return (
+            stock_code,
+            analysis_data.rating,
+            int(analysis_data.overall_score),
+            int(analysis_data.technical_score / 10),
+            int(analysis_data.fundamental_score / 10),
+            int(analysis_data.capital_score / 10),
+            analysis_data.capital_signal
+        )
+
+    def _get_cached_insights(self, bucket_key: tuple) -> Optional[str]:
+        """
+        从LRU缓存读取AI洞察，命中时将其移到最近使用位置
+
+        Args:
+            bucket_key: 缓存键
+
+        Returns:
+            缓存的洞察文本，未命中返回None
+        """
+        with self._ai_insights_cache_lock:
+            insights = self._ai_insights_cache.get(bucket_key)
+            if insights is not None:
+                self._ai_insights_cache.move_to_end(bucket_key)
+            return insights
+
+    def _put_cached_insights(self, bucket_key: tuple, insights: str) -> None:
+        """
+        写入LRU缓存，超出容量时淘汰最久未使用的条目
+
+        Args:
+            bucket_key: 缓存键
+            insights: 洞察文本
+        """
+        with self._ai_insights_cache_lock:
+            self._ai_insights_cache[bucket_key] = insights
+            self._ai_insights_cache.move_to_end(bucket_key)
+            if len(self._ai_insights_cache) > self.AI_INSIGHTS_CACHE_SIZE:
+                self._ai_insights_cache.popitem(last=False)
+
+    def _generate_default_insights(self, analysis_data: AnalysisBundle) -> str:
         """
         生成默认分析洞察（AI不可用时）
 
@@ -825,9 +1596,9 @@ class StockRater:
         Returns:
             默认分析文本
         """
-        rating = analysis_data['rating']
-        overall_score = analysis_data['overall_score']
-        confidence = analysis_data['confidence']
+        rating = analysis_data.rating
+        overall_score = analysis_data.overall_score
+        confidence = analysis_data.confidence
 
         if rating == 'buy':
             return (
@@ -858,11 +1629,4 @@ class StockRater:
         Returns:
             评级文本
         """
-        if score >= self.SCORE_EXCELLENT:
-            return '优秀'
-        elif score >= self.SCORE_GOOD:
-            return '良好'
-        elif score >= self.SCORE_FAIR:
-            return '一般'
-        else:
-            return '差'
+        return self._score_rating_labels[bisect_right(self._score_rating_thresholds, score)]
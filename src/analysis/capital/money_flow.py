@@ -1,15 +1,128 @@
 """Money flow analyzer module."""
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from src.utils._njit import NUMBA_AVAILABLE, njit
 
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True, nogil=True)
+def _money_flow_stats_kernel(flow: np.ndarray, window: int) -> tuple:
+    """
+    一次遍历主力净流入序列，计算主力资金与资金流向趋势所需的全部统计量
+
+    NaN既不计入流入也不计入流出；连续天数遇到0或NaN即中断。
+
+    Args:
+        flow: 主力净流入（float64数组）
+        window: 连续天数与窗口净流入的统计窗口
+
+    Returns:
+        (总流入, 总流出, 净流入, 流入天数, 流出天数, 连续流入天数, 连续流出天数, 窗口净流入)
+    """
+    total_inflow = 0.0
+    total_outflow = 0.0
+    inflow_days = 0
+    outflow_days = 0
+    for value in flow:
+        if value > 0:
+            total_inflow += value
+            inflow_days += 1
+        elif value < 0:
+            total_outflow -= value
+            outflow_days += 1
+
+    n = flow.shape[0]
+    start = max(0, n - window)
+    window_net = 0.0
+    for i in range(start, n):
+        if not math.isnan(flow[i]):
+            window_net += flow[i]
+
+    continuous_inflow_days = 0
+    continuous_outflow_days = 0
+    for i in range(n - 1, start - 1, -1):
+        value = flow[i]
+        if value > 0:
+            if continuous_outflow_days > 0:
+                break
+            continuous_inflow_days += 1
+        elif value < 0:
+            if continuous_inflow_days > 0:
+                break
+            continuous_outflow_days += 1
+        else:
+            break
+
+    return (
+        total_inflow, total_outflow, total_inflow - total_outflow,
+        inflow_days, outflow_days,
+        continuous_inflow_days, continuous_outflow_days, window_net
+    )
+
+
+def _money_flow_stats_numpy(flow: np.ndarray, window: int) -> tuple:
+    """
+    _money_flow_stats_kernel 的NumPy向量化实现（未安装numba时使用）
+
+    Args:
+        flow: 主力净流入（float64数组）
+        window: 连续天数与窗口净流入的统计窗口
+
+    Returns:
+        与 _money_flow_stats_kernel 相同的统计量元组
+    """
+    # 流入/流出掩码各计算一次，求和与计数共用；NaN不计入任何一方
+    inflow_mask = flow > 0
+    outflow_mask = flow < 0
+    total_inflow = float(flow[inflow_mask].sum())
+    total_outflow = float(-flow[outflow_mask].sum())
+
+    # 窗口内从最近一天往前数，连续同向的天数即首个不满足处的下标
+    start = max(flow.shape[0] - window, 0)
+    recent = flow[start:]
+    recent_inflow = inflow_mask[start:][::-1]
+    recent_outflow = outflow_mask[start:][::-1]
+    continuous_inflow_days = recent_inflow.size if recent_inflow.all() else int(recent_inflow.argmin())
+    continuous_outflow_days = recent_outflow.size if recent_outflow.all() else int(recent_outflow.argmin())
+
+    return (
+        total_inflow, total_outflow, total_inflow - total_outflow,
+        int(np.count_nonzero(inflow_mask)), int(np.count_nonzero(outflow_mask)),
+        continuous_inflow_days, continuous_outflow_days, float(np.nansum(recent))
+    )
+
+
+def _money_flow_stats(flow: np.ndarray, window: int) -> tuple:
+    """
+    计算主力资金统计量：安装numba时用JIT内核单次遍历，否则用NumPy向量化实现
+
+    Args:
+        flow: 主力净流入（float64数组）
+        window: 连续天数与窗口净流入的统计窗口
+
+    Returns:
+        (总流入, 总流出, 净流入, 流入天数, 流出天数, 连续流入天数, 连续流出天数, 窗口净流入)
+    """
+    if NUMBA_AVAILABLE:
+        return _money_flow_stats_kernel(flow, window)
+    return _money_flow_stats_numpy(flow, window)
+
+
 class MoneyFlowAnalyzer:
     """资金流向分析器"""
 
+    # 资金流向趋势默认分析窗口（天数）
+    TREND_WINDOW = 5
+
+    # 各项分析所需的列
+    MAIN_FORCE_COLUMNS = frozenset(('主力净流入',))
+    VOLUME_TREND_COLUMNS = frozenset(('成交量', '主力净流入'))
+
     def __init__(self):
         """初始化资金流向分析器"""
         logger.info("MoneyFlowAnalyzer initialized")
@@ -24,28 +137,54 @@ class MoneyFlowAnalyzer:
         Returns:
             主力资金分析结果，包含流入/流出趋势、力度等
         """
-        logger.info("Analyzing main force capital flow")
+        logger.debug("Analyzing main force capital flow")
+
+        stats = _money_flow_stats(self._main_force_flow(df), 0)
+        return self._main_force_result(*stats[:5])
+
+    def _main_force_flow(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        校验数据并取出连续存储的主力净流入序列（float64）
+
+        Args:
+            df: 资金流向数据框
 
+        Returns:
+            主力净流入数组
+        """
         # 验证数据
         if df.empty:
             logger.error("DataFrame is empty")
             raise ValueError("数据框不能为空")
 
-        required_columns = ['主力净流入']
-        if not all(col in df.columns for col in required_columns):
-            logger.error(f"Missing required columns. Required: {required_columns}")
-            raise ValueError(f"缺少必要的列: {required_columns}")
-
-        # 计算主力资金流入流出
-        main_force_flow = df['主力净流入']
-        total_inflow = main_force_flow[main_force_flow > 0].sum()
-        total_outflow = abs(main_force_flow[main_force_flow < 0].sum())
-        net_inflow = main_force_flow.sum()
+        if not self.MAIN_FORCE_COLUMNS.issubset(df.columns):
+            missing_columns = sorted(self.MAIN_FORCE_COLUMNS.difference(df.columns))
+            logger.error("Missing required columns: %s", missing_columns)
+            raise ValueError(f"缺少必要的列: {missing_columns}")
+
+        return np.ascontiguousarray(df['主力净流入'].to_numpy(dtype=np.float64))
+
+    def _main_force_result(
+        self,
+        total_inflow: float,
+        total_outflow: float,
+        net_inflow: float,
+        inflow_days: int,
+        outflow_days: int
+    ) -> Dict[str, Any]:
+        """
+        根据主力资金统计量判断趋势与力度
 
-        # 统计流入流出天数
-        inflow_days = (main_force_flow > 0).sum()
-        outflow_days = (main_force_flow < 0).sum()
+        Args:
+            total_inflow: 总流入
+            total_outflow: 总流出
+            net_inflow: 净流入
+            inflow_days: 流入天数
+            outflow_days: 流出天数
 
+        Returns:
+            主力资金分析结果
+        """
         # 判断趋势
         if net_inflow > 0:
             trend = '流入'
@@ -76,7 +215,10 @@ class MoneyFlowAnalyzer:
             'strength': strength
         }
 
-        logger.info(f"Main force analysis result: trend={trend}, strength={strength}, net_inflow={net_inflow:.2f}")
+        logger.debug(
+            "Main force analysis result: trend=%s, strength=%s, net_inflow=%.2f",
+            trend, strength, net_inflow
+        )
         return result
 
     def analyze_volume_trend(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -89,22 +231,27 @@ class MoneyFlowAnalyzer:
         Returns:
             成交量趋势分析结果，包含放量/缩量、量价配合等
         """
-        logger.info("Analyzing volume trend")
+        logger.debug("Analyzing volume trend")
 
         # 验证数据
         if df.empty:
             logger.error("DataFrame is empty")
             raise ValueError("数据框不能为空")
 
-        required_columns = ['成交量', '主力净流入']
-        if not all(col in df.columns for col in required_columns):
-            logger.error(f"Missing required columns. Required: {required_columns}")
-            raise ValueError(f"缺少必要的列: {required_columns}")
-
-        # 计算成交量指标
-        volume = df['成交量']
-        avg_volume = volume.mean()
-        current_volume = volume.iloc[-1]
+        if not self.VOLUME_TREND_COLUMNS.issubset(df.columns):
+            missing_columns = sorted(self.VOLUME_TREND_COLUMNS.difference(df.columns))
+            logger.error("Missing required columns: %s", missing_columns)
+            raise ValueError(f"缺少必要的列: {missing_columns}")
+
+        # 计算成交量指标：全部与最近5天的有效成交量之和、天数各求一次（NaN不计入）
+        volume = df['成交量'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(volume)
+        clean_volume = np.where(valid, volume, 0.0)
+        valid_days = np.count_nonzero(valid)
+        recent_days = np.count_nonzero(valid[-5:])
+        avg_volume = clean_volume.sum() / valid_days if valid_days else np.nan
+        avg_volume_recent = clean_volume[-5:].sum() / recent_days if recent_days else np.nan
+        current_volume = volume[-1]
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
 
         # 判断成交量趋势
@@ -115,13 +262,8 @@ class MoneyFlowAnalyzer:
         else:
             trend = '平稳'
 
-        # 判断量价配合（成交量与主力资金流向的关系）
-        main_force_flow = df['主力净流入'].iloc[-5:]  # 最近5天
-        volume_recent = volume.iloc[-5:]
-
-        # 计算最近5天的平均成交量比率和主力资金净流入
-        avg_volume_recent = volume_recent.mean()
-        net_inflow_recent = main_force_flow.sum()
+        # 判断量价配合（成交量与主力资金流向的关系）：最近5天主力资金净流入
+        net_inflow_recent = np.nansum(df['主力净流入'].to_numpy(dtype=np.float64)[-5:])
 
         # 量价配合判断：放量 + 资金流入 = 良好；缩量 + 资金流出 = 良好；其他 = 背离
         if (avg_volume_recent > avg_volume and net_inflow_recent > 0) or \
@@ -140,10 +282,13 @@ class MoneyFlowAnalyzer:
             'price_volume_match': price_volume_match
         }
 
-        logger.info(f"Volume trend analysis result: trend={trend}, volume_ratio={volume_ratio:.2f}, match={price_volume_match}")
+        logger.debug(
+            "Volume trend analysis result: trend=%s, volume_ratio=%.2f, match=%s",
+            trend, volume_ratio, price_volume_match
+        )
         return result
 
-    def analyze_money_flow_trend(self, df: pd.DataFrame, window: int = 5) -> Dict[str, Any]:
+    def analyze_money_flow_trend(self, df: pd.DataFrame, window: int = TREND_WINDOW) -> Dict[str, Any]:
         """
         分析资金流向趋势
 
@@ -154,41 +299,33 @@ class MoneyFlowAnalyzer:
         Returns:
             资金流向趋势分析结果
         """
-        logger.info(f"Analyzing money flow trend with window={window} days")
-
-        # 验证数据
-        if df.empty:
-            logger.error("DataFrame is empty")
-            raise ValueError("数据框不能为空")
-
-        required_columns = ['主力净流入']
-        if not all(col in df.columns for col in required_columns):
-            logger.error(f"Missing required columns. Required: {required_columns}")
-            raise ValueError(f"缺少必要的列: {required_columns}")
-
-        # 获取最近window天的数据
-        recent_data = df.tail(window)
-        main_force_flow = recent_data['主力净流入']
-
-        # 计算连续流入/流出天数
-        continuous_inflow_days = 0
-        continuous_outflow_days = 0
-
-        for value in reversed(main_force_flow.values):
-            if value > 0:
-                continuous_inflow_days += 1
-                if continuous_outflow_days > 0:
-                    break
-            elif value < 0:
-                continuous_outflow_days += 1
-                if continuous_inflow_days > 0:
-                    break
-            else:
-                break
+        logger.debug("Analyzing money flow trend with window=%d days", window)
+
+        # 只把最近window天的视图交给内核，避免遍历整段历史
+        flow = self._main_force_flow(df)
+        recent_flow = flow[max(flow.shape[0] - window, 0):]
+        stats = _money_flow_stats(recent_flow, window)
+        return self._money_flow_trend_result(window, *stats[5:])
+
+    def _money_flow_trend_result(
+        self,
+        window: int,
+        continuous_inflow_days: int,
+        continuous_outflow_days: int,
+        net_inflow_sum: float
+    ) -> Dict[str, Any]:
+        """
+        根据连续流入/流出天数判断资金流向趋势
 
-        # 计算窗口期内净流入总和
-        net_inflow_sum = main_force_flow.sum()
+        Args:
+            window: 分析窗口期（天数）
+            continuous_inflow_days: 连续流入天数
+            continuous_outflow_days: 连续流出天数
+            net_inflow_sum: 窗口期内净流入总和
 
+        Returns:
+            资金流向趋势分析结果
+        """
         # 判断趋势
         if continuous_inflow_days >= 3:
             trend = '持续流入'
@@ -205,9 +342,39 @@ class MoneyFlowAnalyzer:
             'trend': trend
         }
 
-        logger.info(f"Money flow trend analysis result: trend={trend}, continuous_inflow={continuous_inflow_days}, continuous_outflow={continuous_outflow_days}")
+        logger.debug(
+            "Money flow trend analysis result: trend=%s, continuous_inflow=%d, continuous_outflow=%d",
+            trend, continuous_inflow_days, continuous_outflow_days
+        )
         return result
 
+    @classmethod
+    def batch_continuous_streaks(cls, flows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量计算多只股票的连续流入/流出天数，与 analyze_money_flow_trend 的逐只结果一致
+
+        Args:
+            flows: S×W 主力净流入矩阵，每行为一只股票最近W天（按时间先后排列）
+
+        Returns:
+            (连续流入天数, 连续流出天数)，各为长度S的数组
+        """
+        flows = np.asarray(flows, dtype=np.float64)
+        stocks, window = flows.shape
+        if window == 0:
+            zeros = np.zeros(stocks, dtype=np.int64)
+            return zeros, zeros.copy()
+
+        # 从最新一天倒序，找到第一个与最新一天方向不同的位置（0与NaN都会中断）
+        signs = np.sign(flows[:, ::-1])
+        latest = signs[:, 0]
+        breaks = signs != latest[:, None]
+        streaks = np.where(breaks.any(axis=1), breaks.argmax(axis=1), window)
+
+        continuous_inflow_days = np.where(latest > 0, streaks, 0)
+        continuous_outflow_days = np.where(latest < 0, streaks, 0)
+        return continuous_inflow_days, continuous_outflow_days
+
     def get_money_flow_signal(self, df: pd.DataFrame) -> str:
         """
         获取资金流向信号
@@ -218,13 +385,44 @@ class MoneyFlowAnalyzer:
         Returns:
             信号：'买入'、'卖出'或'持有'
         """
-        logger.info("Generating money flow signal")
+        logger.debug("Generating money flow signal")
+        return self._derive_signal(*self._compute_all(df))
+
+    def _compute_all(self, df: pd.DataFrame) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """
+        一次性执行主力资金、成交量和资金流向趋势分析
+
+        Args:
+            df: 资金流向数据框
+
+        Returns:
+            (主力资金分析, 成交量趋势分析, 资金流向趋势分析)
+        """
+        logger.debug("Analyzing main force capital flow")
+        stats = _money_flow_stats(self._main_force_flow(df), self.TREND_WINDOW)
+        return (
+            self._main_force_result(*stats[:5]),
+            self.analyze_volume_trend(df),
+            self._money_flow_trend_result(self.TREND_WINDOW, *stats[5:])
+        )
+
+    def _derive_signal(
+        self,
+        main_force: Dict[str, Any],
+        volume_trend: Dict[str, Any],
+        money_flow_trend: Dict[str, Any]
+    ) -> str:
+        """
+        根据已完成的各项分析结果生成资金流向信号
 
-        # 分析主力资金、成交量和资金流向趋势
-        main_force = self.analyze_main_force(df)
-        volume_trend = self.analyze_volume_trend(df)
-        money_flow_trend = self.analyze_money_flow_trend(df)
+        Args:
+            main_force: 主力资金分析结果
+            volume_trend: 成交量趋势分析结果
+            money_flow_trend: 资金流向趋势分析结果
 
+        Returns:
+            信号：'买入'、'卖出'或'持有'
+        """
         # 信号生成逻辑
         # 买入信号：主力持续流入 + 成交量放大 + 趋势向上
         buy_conditions = [
@@ -255,7 +453,7 @@ class MoneyFlowAnalyzer:
         else:
             signal = '持有'
 
-        logger.info(f"Money flow signal generated: {signal} (buy_score={buy_score}, sell_score={sell_score})")
+        logger.debug("Money flow signal generated: %s (buy_score=%d, sell_score=%d)", signal, buy_score, sell_score)
         return signal
 
     def generate_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -268,13 +466,11 @@ class MoneyFlowAnalyzer:
         Returns:
             完整的分析摘要
         """
-        logger.info("Generating money flow analysis summary")
+        logger.debug("Generating money flow analysis summary")
 
-        # 执行各项分析
-        main_force = self.analyze_main_force(df)
-        volume_trend = self.analyze_volume_trend(df)
-        money_flow_trend = self.analyze_money_flow_trend(df)
-        signal = self.get_money_flow_signal(df)
+        # 执行各项分析（只计算一次，信号复用同一组结果）
+        main_force, volume_trend, money_flow_trend = self._compute_all(df)
+        signal = self._derive_signal(main_force, volume_trend, money_flow_trend)
 
         # 生成建议
         if signal == '买入':
@@ -304,5 +500,44 @@ class MoneyFlowAnalyzer:
             'recommendation': recommendation
         }
 
-        logger.info(f"Summary generated successfully. Signal: {signal}")
+        logger.debug("Summary generated successfully. Signal: %s", signal)
         return summary
+
+
+def batch_generate_summary(
+    dfs: Dict[str, pd.DataFrame],
+    max_workers: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    并行生成多只股票的资金流向分析摘要
+
+    使用线程池：统计内核在numba下释放GIL，线程间直接共享DataFrame，无需序列化。
+
+    Args:
+        dfs: {股票代码: 资金流向数据框}
+        max_workers: 最大线程数，None表示使用默认值
+
+    Returns:
+        {股票代码: 分析摘要}，分析失败的股票不包含在结果中
+    """
+    logger.info("Generating money flow summaries for %d stocks", len(dfs))
+    analyzer = MoneyFlowAnalyzer()
+    results = {}
+    if not dfs:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='money-flow') as executor:
+        futures = {
+            executor.submit(analyzer.generate_summary, df): code
+            for code, df in dfs.items()
+        }
+
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                results[code] = future.result()
+            except Exception as e:
+                logger.error("Error generating money flow summary for %s: %s", code, e)
+
+    logger.info("Money flow summaries generated: %d/%d stocks", len(results), len(dfs))
+    return results
@@ -1,8 +1,9 @@
 """财务指标分析模块"""
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from src.core.logger import get_logger
+from src.utils._pandas_compat import ensure_column_major
 
 logger = get_logger(__name__)
 
@@ -10,6 +11,22 @@ logger = get_logger(__name__)
 class FinancialMetrics:
     """财务指标分析类"""
 
+    # 评级对应分数
+    RATING_SCORES = {
+        '优秀': 90.0,
+        '良好': 75.0,
+        '一般': 55.0,
+        '差': 30.0
+    }
+
+    # 综合评分权重：盈利能力、成长性、财务健康、估值
+    DIMENSION_WEIGHTS = np.array([0.30, 0.30, 0.25, 0.15])
+
+    # 批量评级：评级从低到高，及分数/平均增长率的分档阈值（达到阈值即进入上一档）
+    RATING_LABELS = np.array(['差', '一般', '良好', '优秀'])
+    SCORE_RATING_BINS = np.array([40.0, 60.0, 75.0])
+    GROWTH_RATING_BINS = np.array([5.0, 15.0, 30.0])
+
     def __init__(self):
         """初始化财务指标分析器"""
         logger.debug("Initializing FinancialMetrics")
@@ -32,23 +49,22 @@ class FinancialMetrics:
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
 
-        logger.info("Analyzing profitability...")
+        df = ensure_column_major(df, required_columns)
+
+        logger.debug("Analyzing profitability...")
 
         # 计算ROE指标
-        roe_values = df['净资产收益率'].dropna()
-        roe_avg = float(roe_values.mean()) if len(roe_values) > 0 else 0
-        roe_latest = float(roe_values.iloc[-1]) if len(roe_values) > 0 else 0
+        roe_avg, roe_latest = self._avg_and_latest(df['净资产收益率'])
 
         # 计算毛利率
-        gross_margin_values = df['毛利率'].dropna()
-        gross_margin_avg = float(gross_margin_values.mean()) if len(gross_margin_values) > 0 else 0
-        gross_margin_latest = float(gross_margin_values.iloc[-1]) if len(gross_margin_values) > 0 else 0
-
-        # 计算净利率
-        net_profit = df['净利润'].dropna()
-        revenue = df['营业收入'].dropna()
-        if len(net_profit) > 0 and len(revenue) > 0 and revenue.iloc[-1] != 0:
-            net_margin_latest = float((net_profit.iloc[-1] / revenue.iloc[-1]) * 100)
+        gross_margin_avg, gross_margin_latest = self._avg_and_latest(df['毛利率'])
+
+        # 计算净利率（取净利润与营业收入同时有效的最近一期）
+        net_profit = df['净利润'].to_numpy(dtype=np.float64)
+        revenue = df['营业收入'].to_numpy(dtype=np.float64)
+        common = np.flatnonzero(np.isfinite(net_profit) & np.isfinite(revenue))
+        if common.size and revenue[common[-1]] != 0:
+            net_margin_latest = float(net_profit[common[-1]] / revenue[common[-1]] * 100)
         else:
             net_margin_latest = 0
 
@@ -64,7 +80,7 @@ class FinancialMetrics:
             'rating': rating
         }
 
-        logger.info(f"Profitability analysis result: {result}")
+        logger.debug("Profitability analysis result: {}", result)
         return result
 
     def analyze_growth(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -85,21 +101,15 @@ class FinancialMetrics:
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
 
-        logger.info("Analyzing growth...")
+        df = ensure_column_major(df, required_columns)
+
+        logger.debug("Analyzing growth...")
 
         # 计算营收增长率
-        revenue = df['营业收入'].dropna()
-        if len(revenue) >= 2:
-            revenue_growth = float(((revenue.iloc[-1] - revenue.iloc[0]) / revenue.iloc[0]) * 100)
-        else:
-            revenue_growth = 0
+        revenue_growth = self._period_growth(df['营业收入'])
 
         # 计算利润增长率
-        profit = df['净利润'].dropna()
-        if len(profit) >= 2:
-            profit_growth = float(((profit.iloc[-1] - profit.iloc[0]) / profit.iloc[0]) * 100)
-        else:
-            profit_growth = 0
+        profit_growth = self._period_growth(df['净利润'])
 
         # 平均增长率
         avg_growth = (revenue_growth + profit_growth) / 2
@@ -114,7 +124,7 @@ class FinancialMetrics:
             'rating': rating
         }
 
-        logger.info(f"Growth analysis result: {result}")
+        logger.debug("Growth analysis result: {}", result)
         return result
 
     def analyze_financial_health(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -135,17 +145,15 @@ class FinancialMetrics:
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
 
-        logger.info("Analyzing financial health...")
+        df = ensure_column_major(df, required_columns)
+
+        logger.debug("Analyzing financial health...")
 
         # 计算负债率
-        debt_ratio = df['资产负债率'].dropna()
-        debt_ratio_avg = float(debt_ratio.mean()) if len(debt_ratio) > 0 else 0
-        debt_ratio_latest = float(debt_ratio.iloc[-1]) if len(debt_ratio) > 0 else 0
+        debt_ratio_avg, debt_ratio_latest = self._avg_and_latest(df['资产负债率'])
 
         # 计算流动比率
-        current_ratio = df['流动比率'].dropna()
-        current_ratio_avg = float(current_ratio.mean()) if len(current_ratio) > 0 else 0
-        current_ratio_latest = float(current_ratio.iloc[-1]) if len(current_ratio) > 0 else 0
+        current_ratio_avg, current_ratio_latest = self._avg_and_latest(df['流动比率'])
 
         # 评级
         rating = self._rate_financial_health(debt_ratio_latest, current_ratio_latest)
@@ -158,7 +166,7 @@ class FinancialMetrics:
             'rating': rating
         }
 
-        logger.info(f"Financial health analysis result: {result}")
+        logger.debug("Financial health analysis result: {}", result)
         return result
 
     def analyze_valuation(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -179,17 +187,15 @@ class FinancialMetrics:
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
 
-        logger.info("Analyzing valuation...")
+        df = ensure_column_major(df, required_columns)
+
+        logger.debug("Analyzing valuation...")
 
         # 计算PE
-        pe = df['市盈率'].dropna()
-        pe_avg = float(pe.mean()) if len(pe) > 0 else 0
-        pe_latest = float(pe.iloc[-1]) if len(pe) > 0 else 0
+        pe_avg, pe_latest = self._avg_and_latest(df['市盈率'])
 
         # 计算PB
-        pb = df['市净率'].dropna()
-        pb_avg = float(pb.mean()) if len(pb) > 0 else 0
-        pb_latest = float(pb.iloc[-1]) if len(pb) > 0 else 0
+        pb_avg, pb_latest = self._avg_and_latest(df['市净率'])
 
         # 评级
         rating = self._rate_valuation(pe_latest, pb_latest)
@@ -202,7 +208,7 @@ class FinancialMetrics:
             'rating': rating
         }
 
-        logger.info(f"Valuation analysis result: {result}")
+        logger.debug("Valuation analysis result: {}", result)
         return result
 
     def get_overall_score(self, df: pd.DataFrame) -> float:
@@ -215,7 +221,7 @@ class FinancialMetrics:
         Returns:
             综合评分（0-100分）
         """
-        logger.info("Calculating overall score...")
+        logger.debug("Calculating overall score...")
 
         try:
             # 获取各维度分析结果
@@ -224,26 +230,10 @@ class FinancialMetrics:
             health = self.analyze_financial_health(df)
             valuation = self.analyze_valuation(df)
 
-            # 计算各维度得分（0-100）
-            profitability_score = self._rating_to_score(profitability['rating'])
-            growth_score = self._rating_to_score(growth['rating'])
-            health_score = self._rating_to_score(health['rating'])
-            valuation_score = self._rating_to_score(valuation['rating'])
-
-            # 加权平均（盈利能力30%，成长性30%，财务健康25%，估值15%）
-            overall = (
-                profitability_score * 0.30 +
-                growth_score * 0.30 +
-                health_score * 0.25 +
-                valuation_score * 0.15
-            )
-
-            score = round(overall, 2)
-            logger.info(f"Overall score: {score}")
-            return score
+            return self._weighted_score(profitability, growth, health, valuation)
 
         except Exception as e:
-            logger.error(f"Failed to calculate overall score: {e}")
+            logger.error("Failed to calculate overall score: {}", e)
             raise
 
     def generate_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -256,24 +246,148 @@ class FinancialMetrics:
         Returns:
             完整的分析摘要字典
         """
-        logger.info("Generating analysis summary...")
+        logger.debug("Generating analysis summary...")
 
         try:
+            profitability = self.analyze_profitability(df)
+            growth = self.analyze_growth(df)
+            health = self.analyze_financial_health(df)
+            valuation = self.analyze_valuation(df)
+
+            # 综合评分直接复用上面的分析结果，避免重复分析
             summary = {
-                'profitability': self.analyze_profitability(df),
-                'growth': self.analyze_growth(df),
-                'financial_health': self.analyze_financial_health(df),
-                'valuation': self.analyze_valuation(df),
-                'overall_score': self.get_overall_score(df)
+                'profitability': profitability,
+                'growth': growth,
+                'financial_health': health,
+                'valuation': valuation,
+                'overall_score': self._weighted_score(profitability, growth, health, valuation)
             }
 
-            logger.info("Analysis summary generated successfully")
+            logger.debug("Analysis summary generated successfully")
             return summary
 
         except Exception as e:
-            logger.error(f"Failed to generate summary: {e}")
+            logger.error("Failed to generate summary: {}", e)
             raise
 
+    def _weighted_score(self, *results: Dict[str, Any]) -> float:
+        """
+        按各维度评级加权计算综合评分
+
+        Args:
+            results: 盈利能力、成长性、财务健康、估值分析结果（按此顺序）
+
+        Returns:
+            综合评分（0-100分）
+        """
+        # 加权平均（盈利能力30%，成长性30%，财务健康25%，估值15%）
+        get_score = self.RATING_SCORES.get
+        scores = np.array([get_score(result['rating'], 50.0) for result in results])
+
+        score = round(float(scores @ self.DIMENSION_WEIGHTS), 2)
+        logger.debug("Overall score: {}", score)
+        return score
+
+    def overall_score_batch(self, dimension_scores: np.ndarray) -> np.ndarray:
+        """
+        批量计算多只股票的综合评分
+
+        Args:
+            dimension_scores: N×4 各维度得分矩阵，列顺序为盈利能力、成长性、财务健康、估值
+
+        Returns:
+            N只股票的综合评分（0-100分）
+        """
+        overall = np.asarray(dimension_scores, dtype=np.float64) @ self.DIMENSION_WEIGHTS
+        return np.round(overall, 2)
+
+    def _valid_values(self, series: pd.Series) -> np.ndarray:
+        """
+        取出序列中的有效值（非NaN）
+
+        Args:
+            series: 财务指标序列
+
+        Returns:
+            有效值数组；数据无缺失时直接返回原数组，不做额外分配
+        """
+        values = series.to_numpy(dtype=np.float64)
+        nan_mask = np.isnan(values)
+        if not nan_mask.any():
+            return values
+        return values[~nan_mask]
+
+    def _avg_and_latest(self, series: pd.Series) -> Tuple[float, float]:
+        """
+        计算序列有效值（非NaN）的均值与最近一期值
+
+        Args:
+            series: 财务指标序列
+
+        Returns:
+            (均值, 最近一期值)，无有效值时均为0
+        """
+        values = self._valid_values(series)
+        if not values.size:
+            return 0, 0
+        return float(values.mean()), float(values[-1])
+
+    def _period_growth(self, series: pd.Series) -> float:
+        """
+        计算序列首个与最近一个有效值之间的增长率
+
+        Args:
+            series: 财务指标序列
+
+        Returns:
+            增长率（%），有效值不足两期时为0
+        """
+        values = self._valid_values(series)
+        if values.size < 2:
+            return 0
+        first, last = values[0], values[-1]
+        return float(((last - first) / first) * 100)
+
+    def score_to_rating_batch(self, scores: np.ndarray) -> np.ndarray:
+        """
+        批量将分数转换为评级，与 _score_to_rating 逐个转换的结果一致
+
+        Args:
+            scores: 分数数组（0-100）
+
+        Returns:
+            评级数组
+        """
+        return self._classify_batch(scores, self.SCORE_RATING_BINS)
+
+    def rate_growth_batch(self, avg_growth: np.ndarray) -> np.ndarray:
+        """
+        批量评估成长性等级，与 _rate_growth 逐个评估的结果一致
+
+        Args:
+            avg_growth: 平均增长率数组
+
+        Returns:
+            评级数组
+        """
+        return self._classify_batch(avg_growth, self.GROWTH_RATING_BINS)
+
+    def _classify_batch(self, values: np.ndarray, bins: np.ndarray) -> np.ndarray:
+        """
+        按分档阈值一次性查表得到评级
+
+        Args:
+            values: 待评级数值数组
+            bins: 升序分档阈值
+
+        Returns:
+            评级数组；NaN与逐个评级一致，归为最低档
+        """
+        values = np.asarray(values, dtype=np.float64)
+        index = np.searchsorted(bins, values, side='right')
+        index[np.isnan(values)] = 0
+        return self.RATING_LABELS[index]
+
     def _rate_profitability(self, roe: float, gross_margin: float, net_margin: float) -> str:
         """
         评估盈利能力等级
@@ -427,21 +541,3 @@ class FinancialMetrics:
             return '一般'
         else:
             return '差'
-
-    def _rating_to_score(self, rating: str) -> float:
-        """
-        将评级转换为分数
-
-        Args:
-            rating: 评级字符串
-
-        Returns:
-            分数（0-100）
-        """
-        rating_map = {
-            '优秀': 90,
-            '良好': 75,
-            '一般': 55,
-            '差': 30
-        }
-        return rating_map.get(rating, 50)
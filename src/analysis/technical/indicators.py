@@ -1,18 +1,119 @@
 """技术指标计算模块"""
+import math
+from collections import deque
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Any
-from ta.trend import MACD, SMAIndicator
-from ta.momentum import RSIIndicator, StochasticOscillator
-from ta.volatility import BollingerBands, AverageTrueRange
 from src.core.logger import get_logger
 from src.core.constants import DEFAULT_INDICATORS
+from src.utils._njit import NUMBA_AVAILABLE, njit
+from src.utils._pandas_compat import RENAME_NO_COPY, ensure_column_major
 
 logger = get_logger(__name__)
 
 
+@njit(cache=True, nogil=True)
+def _rolling_mean_std_kernel(values: np.ndarray, window: int) -> tuple:
+    """
+    一次扫描计算滚动均值与总体标准差（ddof=0），每步O(1)
+
+    滑动窗口的均值与二阶中心矩按Welford方式增量更新；窗口内含NaN时输出NaN，
+    窗口重新无缺失后从头计算一次再继续增量更新。
+
+    Args:
+        values: 序列（float64数组）
+        window: 窗口长度
+
+    Returns:
+        (滚动均值, 滚动标准差)，不足一个完整窗口处为NaN
+    """
+    size = values.shape[0]
+    means = np.full(size, np.nan)
+    stds = np.full(size, np.nan)
+
+    nan_count = 0
+    stale = True
+    mean = 0.0
+    m2 = 0.0
+    for i in range(size):
+        if math.isnan(values[i]):
+            nan_count += 1
+        if i >= window and math.isnan(values[i - window]):
+            nan_count -= 1
+        if i < window - 1:
+            continue
+        if nan_count > 0:
+            stale = True
+            continue
+
+        if stale:
+            mean = 0.0
+            for j in range(i - window + 1, i + 1):
+                mean += values[j]
+            mean /= window
+            m2 = 0.0
+            for j in range(i - window + 1, i + 1):
+                m2 += (values[j] - mean) ** 2
+            stale = False
+        else:
+            new, old = values[i], values[i - window]
+            new_mean = mean + (new - old) / window
+            m2 += (new - old) * (new - new_mean + old - mean)
+            mean = new_mean
+
+        means[i] = mean
+        stds[i] = math.sqrt(max(m2 / window, 0.0))
+
+    return means, stds
+
+
+def _rolling_means(values: np.ndarray, periods: List[int]) -> Dict[int, np.ndarray]:
+    """
+    基于同一个前缀和一次性计算多个周期的滚动均值
+
+    Args:
+        values: 序列（float64数组）
+        periods: 周期列表
+
+    Returns:
+        {周期: 滚动均值}，窗口不完整或含NaN处为NaN
+    """
+    size = values.shape[0]
+    nan_mask = np.isnan(values)
+
+    # 前缀和：NaN按0累加，另用NaN个数的前缀和判断窗口内是否有缺失
+    sums = np.zeros(size + 1)
+    np.cumsum(np.where(nan_mask, 0.0, values), out=sums[1:])
+    nan_counts = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(nan_mask, out=nan_counts[1:])
+
+    means = {}
+    for period in periods:
+        mean = np.full(size, np.nan)
+        if size >= period:
+            window_mean = (sums[period:] - sums[:-period]) / period
+            has_nan = (nan_counts[period:] - nan_counts[:-period]) > 0
+            mean[period - 1:] = np.where(has_nan, np.nan, window_mean)
+        means[period] = mean
+    return means
+
+
 class TechnicalIndicators:
     """技术指标计算器"""
 
+    # 列名映射
+    COLUMN_MAP = {
+        '收盘': 'close',
+        '开盘': 'open',
+        '最高': 'high',
+        '最低': 'low',
+        '成交量': 'volume',
+        '日期': 'date',
+    }
+
+    # 各指标读取的行情列
+    PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
     def __init__(self):
         self.config = DEFAULT_INDICATORS
 
@@ -26,20 +127,9 @@ class TechnicalIndicators:
         Returns:
             标准化后的DataFrame
         """
-        df = df.copy()
-
-        # 列名映射
-        column_map = {
-            '收盘': 'close',
-            '开盘': 'open',
-            '最高': 'high',
-            '最低': 'low',
-            '成交量': 'volume',
-            '日期': 'date',
-        }
-
-        df.rename(columns=column_map, inplace=True)
-        return df
+        # 浅拷贝式重命名：各指标方法只新增列、不改写已有列的数据，
+        # 因此无需深拷贝即可保证调用方的DataFrame不被修改
+        return df.rename(columns=self.COLUMN_MAP, **RENAME_NO_COPY)
 
     def calculate_ma(self, df: pd.DataFrame, periods: List[int] = None) -> pd.DataFrame:
         """
@@ -57,10 +147,10 @@ class TechnicalIndicators:
 
         df = self._standardize_columns(df)
 
+        means = _rolling_means(df['close'].to_numpy(dtype=np.float64), periods)
         for period in periods:
-            indicator = SMAIndicator(close=df['close'], window=period)
-            df[f'MA{period}'] = indicator.sma_indicator()
-            logger.debug(f"Calculated MA{period}")
+            df[f'MA{period}'] = means[period]
+            logger.debug("Calculated MA{}", period)
 
         return df
 
@@ -93,12 +183,17 @@ class TechnicalIndicators:
 
         df = self._standardize_columns(df)
 
-        indicator = MACD(close=df['close'], window_fast=fast, window_slow=slow, window_sign=signal)
-        df['MACD'] = indicator.macd()
-        df['MACD_signal'] = indicator.macd_signal()
-        df['MACD_hist'] = indicator.macd_diff()
+        close = df['close']
+        ema_fast = close.ewm(span=fast, min_periods=fast, adjust=False).mean()
+        ema_slow = close.ewm(span=slow, min_periods=slow, adjust=False).mean()
+        macd = ema_fast - ema_slow
+        macd_signal = macd.ewm(span=signal, min_periods=signal, adjust=False).mean()
+
+        df['MACD'] = macd
+        df['MACD_signal'] = macd_signal
+        df['MACD_hist'] = macd - macd_signal
 
-        logger.debug(f"Calculated MACD ({fast}/{slow}/{signal})")
+        logger.debug("Calculated MACD ({}/{}/{})", fast, slow, signal)
         return df
 
     def calculate_rsi(self, df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
@@ -113,10 +208,16 @@ class TechnicalIndicators:
             添加RSI指标的DataFrame
         """
         df = self._standardize_columns(df)
-        indicator = RSIIndicator(close=df['close'], window=period)
-        df['RSI'] = indicator.rsi()
 
-        logger.debug(f"Calculated RSI ({period})")
+        # Wilder平滑：alpha=1/period 的指数移动平均
+        diff = df['close'].diff()
+        gain = diff.where(diff > 0, 0.0)
+        loss = -diff.where(diff < 0, 0.0)
+        avg_gain = gain.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+        avg_loss = loss.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+        df['RSI'] = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+
+        logger.debug("Calculated RSI ({})", period)
         return df
 
     def calculate_kdj(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -136,18 +237,13 @@ class TechnicalIndicators:
         k = kdj_config['k']
         d = kdj_config['d']
 
-        indicator = StochasticOscillator(
-            high=df['high'],
-            low=df['low'],
-            close=df['close'],
-            window=n,
-            smooth_window=k
-        )
-        df['K'] = indicator.stoch()
-        df['D'] = indicator.stoch_signal()
+        lowest = df['low'].rolling(n, min_periods=n).min()
+        highest = df['high'].rolling(n, min_periods=n).max()
+        df['K'] = 100 * (df['close'] - lowest) / (highest - lowest)
+        df['D'] = df['K'].rolling(k, min_periods=k).mean()
         df['J'] = 3 * df['K'] - 2 * df['D']
 
-        logger.debug(f"Calculated KDJ (n={n})")
+        logger.debug("Calculated KDJ (n={})", n)
         return df
 
     def calculate_boll(self, df: pd.DataFrame, n: int = 20, std: int = 2) -> pd.DataFrame:
@@ -164,12 +260,20 @@ class TechnicalIndicators:
         """
         df = self._standardize_columns(df)
 
-        indicator = BollingerBands(close=df['close'], window=n, window_dev=std)
-        df['BOLL_UPPER'] = indicator.bollinger_hband()
-        df['BOLL_MIDDLE'] = indicator.bollinger_mavg()
-        df['BOLL_LOWER'] = indicator.bollinger_lband()
-
-        logger.debug(f"Calculated BOLL (n={n}, std={std})")
+        if NUMBA_AVAILABLE:
+            # 均值与标准差（总体标准差，ddof=0）在同一次扫描中求出
+            middle, deviation = _rolling_mean_std_kernel(df['close'].to_numpy(dtype=np.float64), n)
+        else:
+            # 未安装numba时逐行循环较慢，均值与标准差共用pandas的同一个滚动窗口对象
+            rolling = df['close'].rolling(n, min_periods=n)
+            middle = rolling.mean().to_numpy()
+            deviation = rolling.std(ddof=0).to_numpy()
+        band = std * deviation
+        df['BOLL_UPPER'] = middle + band
+        df['BOLL_MIDDLE'] = middle
+        df['BOLL_LOWER'] = middle - band
+
+        logger.debug("Calculated BOLL (n={}, std={})", n, std)
         return df
 
     def calculate_volume_ma(self, df: pd.DataFrame, periods: List[int] = None) -> pd.DataFrame:
@@ -188,11 +292,11 @@ class TechnicalIndicators:
 
         df = self._standardize_columns(df)
 
+        means = _rolling_means(df['volume'].to_numpy(dtype=np.float64), periods)
         for period in periods:
-            indicator = SMAIndicator(close=df['volume'], window=period)
-            df[f'VOL_MA{period}'] = indicator.sma_indicator()
+            df[f'VOL_MA{period}'] = means[period]
 
-        logger.debug(f"Calculated VOL_MA {periods}")
+        logger.debug("Calculated VOL_MA {}", periods)
         return df
 
     def calculate_atr(self, df: pd.DataFrame, period: int = None) -> pd.DataFrame:
@@ -210,10 +314,25 @@ class TechnicalIndicators:
             period = self.config['ATR']
 
         df = self._standardize_columns(df)
-        indicator = AverageTrueRange(high=df['high'], low=df['low'], close=df['close'], window=period)
-        df['ATR'] = indicator.average_true_range()
 
-        logger.debug(f"Calculated ATR ({period})")
+        # 真实波幅：max(最高-最低, |最高-昨收|, |最低-昨收|)，首日无昨收时取最高-最低
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        prev_close = df['close'].shift(1).to_numpy(dtype=np.float64)
+        true_range = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+        # Wilder平滑：以前period日真实波幅均值为起点，ATR_t = (ATR_{t-1}*(period-1) + TR_t) / period，
+        # 等价于 alpha=1/period 的指数移动平均；起点之前为0，数据不足period日时为NaN
+        if len(true_range) >= period:
+            seeded = true_range[period - 1:].copy()
+            seeded[0] = np.nanmean(true_range[:period])
+            atr = np.zeros(len(true_range))
+            atr[period - 1:] = pd.Series(seeded).ewm(alpha=1 / period, adjust=False).mean().to_numpy()
+        else:
+            atr = np.full(len(true_range), np.nan)
+        df['ATR'] = atr
+
+        logger.debug("Calculated ATR ({})", period)
         return df
 
     def calculate_all(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -226,8 +345,10 @@ class TechnicalIndicators:
         Returns:
             添加所有指标的DataFrame
         """
-        logger.info("Calculating all technical indicators...")
+        logger.debug("Calculating all technical indicators...")
 
+        # 入口处标准化一次并保证行情列连续存放；后续各步骤的重命名为无操作的浅拷贝
+        df = ensure_column_major(self._standardize_columns(df), self.PRICE_COLUMNS)
         df = self.calculate_ma(df)
         df = self.calculate_macd(df)
         df = self.calculate_rsi(df)
@@ -236,5 +357,240 @@ class TechnicalIndicators:
         df = self.calculate_volume_ma(df)
         df = self.calculate_atr(df)
 
-        logger.info("All technical indicators calculated")
+        logger.debug("All technical indicators calculated")
         return df
+
+    def create_stream(self) -> 'TechnicalIndicatorsStream':
+        """
+        创建与本计算器参数一致的增量指标计算器
+
+        Returns:
+            TechnicalIndicatorsStream实例
+        """
+        return TechnicalIndicatorsStream(self.config)
+
+
+class TechnicalIndicatorsStream:
+    """
+    技术指标增量计算器
+
+    逐根K线调用 update，每次更新的计算量与周期长度无关：均线与布林带维护滑动窗口的
+    累加和与平方和，MACD、RSI、ATR维护指数平滑状态。第t次更新的输出与
+    TechnicalIndicators 在前t根K线上计算结果的最后一行一致（KDJ除外，仍需批量计算）。
+    输入的价格与成交量不应包含NaN。
+    """
+
+    __slots__ = (
+        'ma_periods', 'vol_ma_periods', 'fast', 'slow', 'signal',
+        'rsi_period', 'boll_n', 'boll_std', 'atr_period',
+        'count', 'closes', 'volumes', 'sums', 'vol_sums', 'boll_mean', 'boll_m2',
+        'ema_fast', 'ema_slow', 'ema_signal', 'macd_count',
+        'avg_gain', 'avg_loss', 'prev_close', 'tr_sum', 'atr',
+    )
+
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        rsi_period: int = 14,
+        boll_n: int = 20,
+        boll_std: int = 2
+    ):
+        """
+        初始化增量指标计算器
+
+        Args:
+            config: 指标参数，默认使用 DEFAULT_INDICATORS
+            rsi_period: RSI周期
+            boll_n: 布林带周期
+            boll_std: 布林带标准差倍数
+        """
+        if config is None:
+            config = DEFAULT_INDICATORS
+
+        self.ma_periods = tuple(config['MA'])
+        self.vol_ma_periods = tuple(config['VOL_MA'])
+        self.fast = config['MACD']['fast']
+        self.slow = config['MACD']['slow']
+        self.signal = config['MACD']['signal']
+        self.rsi_period = rsi_period
+        self.boll_n = boll_n
+        self.boll_std = boll_std
+        self.atr_period = config['ATR']
+
+        # 滑动窗口：只保留最长周期所需的历史值
+        self.closes = deque(maxlen=max(self.ma_periods + (boll_n,)))
+        self.volumes = deque(maxlen=max(self.vol_ma_periods))
+        self.sums = dict.fromkeys(self.ma_periods, 0.0)
+        self.vol_sums = dict.fromkeys(self.vol_ma_periods, 0.0)
+        # 布林带窗口的均值与二阶中心矩（Welford增量更新，避免平方和相减的精度损失）
+        self.boll_mean = 0.0
+        self.boll_m2 = 0.0
+
+        self.count = 0
+        self.ema_fast = self.ema_slow = self.ema_signal = 0.0
+        self.macd_count = 0
+        self.avg_gain = self.avg_loss = 0.0
+        self.prev_close = math.nan
+        self.tr_sum = 0.0
+        self.atr = math.nan
+
+    def update(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """
+        加入一根新K线并返回最新的指标值
+
+        Args:
+            high: 最高价
+            low: 最低价
+            close: 收盘价
+            volume: 成交量
+
+        Returns:
+            指标字典，列名与 TechnicalIndicators 一致；数据不足时为NaN
+        """
+        self.count += 1
+        n = self.count
+        closes = self.closes
+        volumes = self.volumes
+
+        # 滑动窗口累加和：移出过期值，加入新值
+        for period in self.sums:
+            if n > period:
+                self.sums[period] -= closes[-period]
+            self.sums[period] += close
+        self._update_boll_state(close)
+        for period in self.vol_sums:
+            if n > period:
+                self.vol_sums[period] -= volumes[-period]
+            self.vol_sums[period] += volume
+        closes.append(close)
+        volumes.append(volume)
+
+        result = {}
+        for period in self.ma_periods:
+            result[f'MA{period}'] = self.sums[period] / period if n >= period else math.nan
+
+        self._update_macd(close, result)
+        self._update_rsi(close, result)
+
+        # 布林带（总体标准差，ddof=0）
+        if n >= self.boll_n:
+            middle = self.boll_mean
+            band = self.boll_std * math.sqrt(max(self.boll_m2 / self.boll_n, 0.0))
+            result['BOLL_UPPER'] = middle + band
+            result['BOLL_MIDDLE'] = middle
+            result['BOLL_LOWER'] = middle - band
+        else:
+            result['BOLL_UPPER'] = result['BOLL_MIDDLE'] = result['BOLL_LOWER'] = math.nan
+
+        for period in self.vol_ma_periods:
+            result[f'VOL_MA{period}'] = self.vol_sums[period] / period if n >= period else math.nan
+
+        self._update_atr(high, low, close, result)
+
+        self.prev_close = close
+        return result
+
+    def _update_boll_state(self, close: float) -> None:
+        """
+        更新布林带窗口的均值与二阶中心矩（需在新值加入滑动窗口前调用）
+
+        窗口未满时按Welford方式逐个加入；窗口已满后与 _rolling_mean_std_kernel 相同，
+        移出最旧值、加入新值的同时增量更新。
+
+        Args:
+            close: 收盘价
+        """
+        window = self.boll_n
+        if self.count <= window:
+            delta = close - self.boll_mean
+            self.boll_mean += delta / self.count
+            self.boll_m2 += delta * (close - self.boll_mean)
+        else:
+            old = self.closes[-window]
+            new_mean = self.boll_mean + (close - old) / window
+            self.boll_m2 += (close - old) * (close - new_mean + old - self.boll_mean)
+            self.boll_mean = new_mean
+
+    def _update_macd(self, close: float, result: Dict[str, float]) -> None:
+        """
+        更新MACD的指数平滑状态
+
+        Args:
+            close: 收盘价
+            result: 输出指标字典
+        """
+        if self.count == 1:
+            self.ema_fast = self.ema_slow = close
+        else:
+            alpha_fast = 2 / (self.fast + 1)
+            alpha_slow = 2 / (self.slow + 1)
+            self.ema_fast = (1 - alpha_fast) * self.ema_fast + alpha_fast * close
+            self.ema_slow = (1 - alpha_slow) * self.ema_slow + alpha_slow * close
+
+        if self.count < max(self.fast, self.slow):
+            result['MACD'] = result['MACD_signal'] = result['MACD_hist'] = math.nan
+            return
+
+        # 信号线从第一个有效MACD值开始平滑
+        macd = self.ema_fast - self.ema_slow
+        self.macd_count += 1
+        if self.macd_count == 1:
+            self.ema_signal = macd
+        else:
+            alpha_signal = 2 / (self.signal + 1)
+            self.ema_signal = (1 - alpha_signal) * self.ema_signal + alpha_signal * macd
+
+        result['MACD'] = macd
+        if self.macd_count >= self.signal:
+            result['MACD_signal'] = self.ema_signal
+            result['MACD_hist'] = macd - self.ema_signal
+        else:
+            result['MACD_signal'] = result['MACD_hist'] = math.nan
+
+    def _update_rsi(self, close: float, result: Dict[str, float]) -> None:
+        """
+        更新RSI的Wilder平滑状态
+
+        Args:
+            close: 收盘价
+            result: 输出指标字典
+        """
+        # 首日无涨跌，涨跌幅均记为0
+        diff = close - self.prev_close if self.count > 1 else 0.0
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        alpha = 1 / self.rsi_period
+        self.avg_gain = (1 - alpha) * self.avg_gain + alpha * gain
+        self.avg_loss = (1 - alpha) * self.avg_loss + alpha * loss
+
+        if self.count < self.rsi_period:
+            result['RSI'] = math.nan
+        elif self.avg_loss == 0:
+            result['RSI'] = 100.0
+        else:
+            result['RSI'] = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+    def _update_atr(self, high: float, low: float, close: float, result: Dict[str, float]) -> None:
+        """
+        更新ATR的Wilder平滑状态
+
+        Args:
+            high: 最高价
+            low: 最低价
+            close: 收盘价
+            result: 输出指标字典
+        """
+        true_range = high - low
+        if self.count > 1:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        period = self.atr_period
+        if self.count < period:
+            self.tr_sum += true_range
+        elif self.count == period:
+            # 以前period日真实波幅均值为起点
+            self.atr = (self.tr_sum + true_range) / period
+        else:
+            self.atr = (self.atr * (period - 1) + true_range) / period
+
+        result['ATR'] = self.atr
@@ -0,0 +1,229 @@
+"""信号驱动回测的撮合循环（安装numba时JIT编译）
+
+与 BacktestEngine 中 backtrader 策略包装器的规则一致：
+收盘后根据信号与止损/止盈/T+1/最大持仓天数做决策，市价单在下一根K线开盘成交，
+开盘价下资金（含费用）不足时买单作废；佣金与卖出印花税按 AShareCommissionInfo 的规则扣除。日线回测中订单总在下一根K线成交，
+因此决策时直接按下一根K线开盘价结算，不维护挂单状态。
+"""
+import numpy as np
+from src.utils._njit import njit, prange
+
+# 信号编码
+SIGNAL_HOLD = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+
+@njit(cache=True)
+def _fee(
+    size: int,
+    price: float,
+    commission_rate: float,
+    min_commission: float,
+    stamp_tax_rate: float
+) -> float:
+    """
+    单笔成交费用（与 AShareCommissionInfo._getcommission 的计算顺序相同）
+
+    Args:
+        size: 成交数量（正数=买入，负数=卖出）
+        price: 成交价格
+        commission_rate: 佣金率
+        min_commission: 最低佣金
+        stamp_tax_rate: 印花税率（仅卖出）
+
+    Returns:
+        佣金 + 卖出印花税
+    """
+    commission = max(abs(size) * price * commission_rate, min_commission)
+    if size < 0:
+        return commission + abs(size) * price * stamp_tax_rate
+    return commission
+
+
+@njit(cache=True)
+def simulate(
+    signal: np.ndarray,
+    day: np.ndarray,
+    open_price: np.ndarray,
+    close: np.ndarray,
+    initial_cash: float,
+    cash_ratio: float,
+    lot_size: int,
+    stop_loss: float,
+    take_profit: float,
+    max_holding_days: int,
+    commission_rate: float,
+    min_commission: float,
+    stamp_tax_rate: float
+) -> tuple:
+    """
+    逐bar模拟单只股票的信号交易
+
+    Args:
+        signal: 信号编码数组（int8，SIGNAL_BUY/SIGNAL_SELL/SIGNAL_HOLD）
+        day: 每个bar的日期序号（自然日，用于T+1与持仓天数）
+        open_price: 开盘价
+        close: 收盘价
+        initial_cash: 初始资金
+        cash_ratio: 买入时使用的资金比例
+        lot_size: 每手股数
+        stop_loss: 止损比例
+        take_profit: 止盈比例
+        max_holding_days: 最大持仓天数
+        commission_rate: 佣金率
+        min_commission: 最低佣金
+        stamp_tax_rate: 印花税率（仅卖出）
+
+    Returns:
+        (每日资产价值, 开仓bar, 平仓bar, 开仓价, 平仓价, 股数)，后五项只含已平仓交易
+    """
+    n = close.shape[0]
+    values = np.empty(n)
+    max_trades = n // 2 + 1
+    entry_bars = np.empty(max_trades, dtype=np.int64)
+    exit_bars = np.empty(max_trades, dtype=np.int64)
+    entry_fills = np.empty(max_trades)
+    exit_fills = np.empty(max_trades)
+    sizes = np.empty(max_trades, dtype=np.int64)
+    trade_count = 0
+
+    cash = initial_cash
+    position = 0
+    entry_bar = 0
+    entry_fill = 0.0
+    entry_price = 0.0
+    buy_day = 0
+
+    for i in range(n):
+        values[i] = cash + position * close[i]
+        price = close[i]
+
+        # 最后一根K线之后没有开盘价可成交，不再下单
+        if i + 1 == n:
+            break
+        next_open = open_price[i + 1]
+
+        # 1. 未持仓：检查买入信号，市价单直接按下一根K线开盘价成交
+        if position == 0:
+            if signal[i] == SIGNAL_BUY:
+                size = int(cash * cash_ratio / price / lot_size) * lot_size
+                if size < lot_size:
+                    continue
+                # 提交时按下单价预扣（backtrader的保证金检查），成交时按开盘价实扣
+                if cash - size * price - _fee(size, price, commission_rate, min_commission, stamp_tax_rate) < 0.0:
+                    continue
+                remaining = cash - size * next_open - _fee(
+                    size, next_open, commission_rate, min_commission, stamp_tax_rate
+                )
+                if remaining >= 0.0:
+                    cash = remaining
+                    position = size
+                    entry_bar = i + 1
+                    entry_fill = next_open
+                    buy_day = day[i]
+                    entry_price = price
+            continue
+
+        # 2. 持仓中：T+1之后检查信号卖出、止损、止盈、最大持仓天数
+        holding_days = day[i] - buy_day
+        if holding_days <= 0:
+            continue
+        if (signal[i] == SIGNAL_SELL
+                or price <= 0
+                or (entry_price - price) / entry_price >= stop_loss
+                or (price - entry_price) / entry_price >= take_profit
+                or holding_days > max_holding_days):
+            # 按backtrader的现金更新顺序（平仓市值 + 盈亏）相加，保证浮点结果与其一致
+            cash += position * entry_fill + position * (next_open - entry_fill)
+            # 再扣除卖出费用（佣金 + 印花税）
+            cash -= _fee(-position, next_open, commission_rate, min_commission, stamp_tax_rate)
+            entry_bars[trade_count] = entry_bar
+            exit_bars[trade_count] = i + 1
+            entry_fills[trade_count] = entry_fill
+            exit_fills[trade_count] = next_open
+            sizes[trade_count] = position
+            trade_count += 1
+            position = 0
+
+    return (
+        values,
+        entry_bars[:trade_count], exit_bars[:trade_count],
+        entry_fills[:trade_count], exit_fills[:trade_count],
+        sizes[:trade_count]
+    )
+
+
+@njit(cache=True, parallel=True)
+def simulate_batch(
+    signals: np.ndarray,
+    day: np.ndarray,
+    open_price: np.ndarray,
+    close: np.ndarray,
+    initial_cash: float,
+    cash_ratio: float,
+    lot_size: int,
+    stop_loss: np.ndarray,
+    take_profit: np.ndarray,
+    max_holding_days: np.ndarray,
+    commission_rate: float,
+    min_commission: float,
+    stamp_tax_rate: float
+) -> tuple:
+    """
+    对多组参数并行执行 simulate，只返回汇总指标
+
+    Args:
+        signals: 信号编码矩阵，形状 (参数组数, bar数)，每行对应一组参数
+        day: 每个bar的日期序号
+        open_price: 开盘价
+        close: 收盘价
+        initial_cash: 初始资金
+        cash_ratio: 买入时使用的资金比例
+        lot_size: 每手股数
+        stop_loss: 每组参数的止损比例
+        take_profit: 每组参数的止盈比例
+        max_holding_days: 每组参数的最大持仓天数
+        commission_rate: 佣金率
+        min_commission: 最低佣金
+        stamp_tax_rate: 印花税率（仅卖出）
+
+    Returns:
+        (最终资产, 最大回撤, 已平仓交易数, 盈利交易数（扣除费用后）)，均为长度等于参数组数的数组
+    """
+    k = signals.shape[0]
+    final_values = np.empty(k)
+    max_drawdowns = np.empty(k)
+    trade_counts = np.empty(k, dtype=np.int64)
+    win_counts = np.empty(k, dtype=np.int64)
+
+    for j in prange(k):
+        values, _, _, entry_fills, exit_fills, sizes = simulate(
+            signals[j], day, open_price, close,
+            initial_cash, cash_ratio, lot_size,
+            stop_loss[j], take_profit[j], max_holding_days[j],
+            commission_rate, min_commission, stamp_tax_rate
+        )
+
+        peak = values[0]
+        max_dd = 0.0
+        for v in values:
+            if v > peak:
+                peak = v
+            dd = (peak - v) / peak
+            if dd > max_dd:
+                max_dd = dd
+
+        wins = 0
+        for t in range(sizes.shape[0]):
+            fees = (_fee(sizes[t], entry_fills[t], commission_rate, min_commission, stamp_tax_rate)
+                    + _fee(-sizes[t], exit_fills[t], commission_rate, min_commission, stamp_tax_rate))
+            if sizes[t] * (exit_fills[t] - entry_fills[t]) - fees >= 0:
+                wins += 1
+
+        final_values[j] = values[-1]
+        max_drawdowns[j] = max_dd
+        trade_counts[j] = sizes.shape[0]
+        win_counts[j] = wins
+
+    return final_values, max_drawdowns, trade_counts, win_counts
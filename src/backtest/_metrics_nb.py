@@ -0,0 +1,53 @@
+"""回测指标的逐笔统计循环（安装numba时JIT编译）
+
+参数调优时每组参数都要统计一次连胜/连亏，单次遍历只用整数计数器，
+不分配中间数组。
+"""
+import numpy as np
+from src.utils._njit import njit
+
+
+@njit(cache=True)
+def max_consec_wins(pnl: np.ndarray) -> int:
+    """
+    最大连续盈利次数
+
+    Args:
+        pnl: 按平仓顺序排列的交易盈亏数组
+
+    Returns:
+        最大连续盈利（pnl > 0）次数
+    """
+    best = 0
+    run = 0
+    for value in pnl:
+        if value > 0:
+            run += 1
+            if run > best:
+                best = run
+        else:
+            run = 0
+    return best
+
+
+@njit(cache=True)
+def max_consec_losses(pnl: np.ndarray) -> int:
+    """
+    最大连续亏损次数
+
+    Args:
+        pnl: 按平仓顺序排列的交易盈亏数组
+
+    Returns:
+        最大连续亏损（pnl < 0）次数
+    """
+    best = 0
+    run = 0
+    for value in pnl:
+        if value < 0:
+            run += 1
+            if run > best:
+                best = run
+        else:
+            run = 0
+    return best
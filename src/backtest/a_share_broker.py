@@ -1,5 +1,7 @@
 """A股市场券商模拟 - 自定义Broker实现A股特色规则"""
 import backtrader as bt
+import numpy as np
+from typing import Optional
 from src.core.logger import get_logger
 from src.core.constants import (
     MAIN_BOARD_LIMIT,
@@ -7,6 +9,7 @@ from src.core.constants import (
     GEM_LIMIT,
     MIN_LOT,
     COMMISSION_RATE,
+    MIN_COMMISSION,
     STAMP_TAX_RATE,
     MARKET_PREFIX
 )
@@ -14,6 +17,59 @@ from src.core.constants import (
 logger = get_logger(__name__)
 
 
+class AShareCommissionInfo(bt.CommInfoBase):
+    """
+    A股费用规则
+
+    backtrader的BackBroker在成交时通过 CommissionInfo.getcommission 扣除费用，
+    因此A股的佣金与印花税需要以CommissionInfo的形式安装到Broker上。
+
+    Params:
+        commission: 佣金率（双向收取，最低 MIN_COMMISSION 元）
+        stamp_tax: 印花税率（仅卖出收取）
+    """
+
+    params = (
+        ('commission', COMMISSION_RATE),
+        ('stamp_tax', STAMP_TAX_RATE),
+        ('percabs', True),
+    )
+
+    def _getcommission(self, size, price, pseudoexec):
+        """
+        计算佣金和印花税
+
+        A股费用结构：
+        - 佣金: 买卖双向收取，最低5元
+        - 印花税: 仅卖出收取
+        - 过户费: 忽略（金额很小）
+
+        Args:
+            size: 交易数量（正数=买入，负数=卖出）
+            price: 交易价格
+            pseudoexec: 是否伪执行
+
+        Returns:
+            总费用（佣金 + 印花税）
+        """
+        # 基础佣金（双向）
+        commission = abs(size) * price * self.p.commission
+        commission = max(commission, MIN_COMMISSION)  # 最低5元
+
+        # 卖出时加上印花税
+        if size < 0:  # 卖出
+            stamp_tax = abs(size) * price * self.p.stamp_tax
+            total_commission = commission + stamp_tax
+            logger.debug(
+                "卖出费用: 佣金 {:.2f} 元 + 印花税 {:.2f} 元 = 总计 {:.2f} 元",
+                commission, stamp_tax, total_commission
+            )
+            return total_commission
+        else:  # 买入
+            logger.debug("买入佣金: {:.2f} 元", commission)
+            return commission
+
+
 class AShareBroker(bt.brokers.BrokerBack):
     """
     A股市场券商模拟
@@ -29,18 +85,44 @@ class AShareBroker(bt.brokers.BrokerBack):
         limit_ratio: 涨跌停限制比例
     """
 
-    def __init__(self, stock_code: str = None, **kwargs):
+    # 板块代码前缀（元组形式，可直接传给str.startswith）
+    _STAR_PREFIXES = tuple(MARKET_PREFIX['STAR'])
+    _GEM_PREFIXES = tuple(MARKET_PREFIX['GEM'])
+
+    def __init__(
+        self,
+        stock_code: str = None,
+        close_array: Optional[np.ndarray] = None,
+        commission_rate: float = COMMISSION_RATE,
+        stamp_tax_rate: float = STAMP_TAX_RATE,
+        **kwargs
+    ):
         """
         初始化A股Broker
 
         Args:
             stock_code: 股票代码，用于识别板块（主板/创业板/科创板）
+            close_array: 回测数据的收盘价序列（可选），提供时预先算好每个bar对应的涨跌停价
+            commission_rate: 佣金率
+            stamp_tax_rate: 印花税率（仅卖出）
             **kwargs: 传递给父类的参数
         """
         super().__init__(**kwargs)
         self.stock_code = stock_code
         self.limit_ratio = self._get_limit_ratio()
 
+        # 作为默认CommissionInfo安装，成交时由backtrader扣除佣金与印花税
+        self._a_share_comminfo = AShareCommissionInfo(commission=commission_rate, stamp_tax=stamp_tax_rate)
+        self.addcommissioninfo(self._a_share_comminfo)
+
+        # 第i个bar的收盘价决定第i+1个bar的涨跌停价
+        if close_array is not None:
+            close_array = np.asarray(close_array, dtype=np.float64)
+            self._limit_up = close_array * (1 + self.limit_ratio)
+            self._limit_down = close_array * (1 - self.limit_ratio)
+        else:
+            self._limit_up = self._limit_down = None
+
         logger.info(
             f"A股Broker初始化 - "
             f"股票代码: {stock_code or '未指定'}, "
@@ -59,12 +141,12 @@ class AShareBroker(bt.brokers.BrokerBack):
             return MAIN_BOARD_LIMIT  # 默认主板
 
         # 科创板 688xxx
-        if any(self.stock_code.startswith(p) for p in MARKET_PREFIX['STAR']):
+        if self.stock_code.startswith(self._STAR_PREFIXES):
             logger.debug(f"识别为科创板: {self.stock_code}")
             return STAR_MARKET_LIMIT  # 20%
 
         # 创业板 300xxx
-        if any(self.stock_code.startswith(p) for p in MARKET_PREFIX['GEM']):
+        if self.stock_code.startswith(self._GEM_PREFIXES):
             logger.debug(f"识别为创业板: {self.stock_code}")
             return GEM_LIMIT  # 20%
 
@@ -86,6 +168,23 @@ class AShareBroker(bt.brokers.BrokerBack):
         limit_down = prev_close * (1 - self.limit_ratio)
         return limit_up, limit_down
 
+    def _get_current_limit_price(self, data) -> tuple:
+        """
+        获取当前bar的涨跌停价格，有预计算数组时直接按bar序号查表
+
+        Args:
+            data: 数据源
+
+        Returns:
+            (涨停价, 跌停价)
+        """
+        if self._limit_up is not None:
+            prev_idx = len(data) - 2  # 前一日所在的bar序号
+            if 0 <= prev_idx < len(self._limit_up):
+                return self._limit_up[prev_idx], self._limit_down[prev_idx]
+
+        return self._get_limit_price(data.close[-1])  # 前一日收盘价
+
     def buy(self, owner, data, size, price=None, plimit=None,
             exectype=None, valid=None, tradeid=0, oco=None,
             trailamount=None, trailpercent=None, parent=None,
@@ -111,22 +210,19 @@ class AShareBroker(bt.brokers.BrokerBack):
         if size % MIN_LOT != 0:
             original_size = size
             size = (size // MIN_LOT) * MIN_LOT
-            logger.debug(f"买入数量调整: {original_size} → {size} 股")
+            logger.debug("买入数量调整: {} → {} 股", original_size, size)
 
         if size <= 0:
-            logger.warning(f"买入数量不足100股（调整后: {size}），订单拒绝")
+            logger.warning("买入数量不足100股（调整后: {}），订单拒绝", size)
             return None
 
         # 2. 检查涨停限制（仅限价单需要检查）
         if price is not None:
-            prev_close = data.close[-1]  # 前一日收盘价
-            limit_up, _ = self._get_limit_price(prev_close)
+            limit_up, _ = self._get_current_limit_price(data)
 
             # 价格接近涨停（留0.99容差避免浮点数误差）
             if price >= limit_up * 0.99:
-                logger.warning(
-                    f"买入价格 {price:.2f} 接近涨停价 {limit_up:.2f}，订单拒绝"
-                )
+                logger.warning("买入价格 {:.2f} 接近涨停价 {:.2f}，订单拒绝", price, limit_up)
                 return None
 
         # 3. 调用父类方法执行订单
@@ -147,7 +243,7 @@ class AShareBroker(bt.brokers.BrokerBack):
         添加A股限制：
         1. 跌停板不能卖出（价格接近跌停价时拒绝）
         2. 数量必须是100股整数倍（自动向下取整）
-        3. 印花税在_getcommission中计算
+        3. 印花税由AShareCommissionInfo在成交时扣除
 
         Args:
             owner: 订单所有者（策略）
@@ -163,22 +259,19 @@ class AShareBroker(bt.brokers.BrokerBack):
         if size % MIN_LOT != 0:
             original_size = size
             size = (size // MIN_LOT) * MIN_LOT
-            logger.debug(f"卖出数量调整: {original_size} → {size} 股")
+            logger.debug("卖出数量调整: {} → {} 股", original_size, size)
 
         if size <= 0:
-            logger.warning(f"卖出数量不足100股（调整后: {size}），订单拒绝")
+            logger.warning("卖出数量不足100股（调整后: {}），订单拒绝", size)
             return None
 
         # 2. 检查跌停限制（仅限价单需要检查）
         if price is not None:
-            prev_close = data.close[-1]  # 前一日收盘价
-            _, limit_down = self._get_limit_price(prev_close)
+            _, limit_down = self._get_current_limit_price(data)
 
             # 价格接近跌停（留1.01容差避免浮点数误差）
             if price <= limit_down * 1.01:
-                logger.warning(
-                    f"卖出价格 {price:.2f} 接近跌停价 {limit_down:.2f}，订单拒绝"
-                )
+                logger.warning("卖出价格 {:.2f} 接近跌停价 {:.2f}，订单拒绝", price, limit_down)
                 return None
 
         # 3. 调用父类方法执行订单
@@ -189,14 +282,37 @@ class AShareBroker(bt.brokers.BrokerBack):
             transmit, **kwargs
         )
 
-    def _getcommission(self, size, price, pseudoexec):
+    @staticmethod
+    def compute_fees(
+        sizes: np.ndarray,
+        prices: np.ndarray,
+        commission_rate: float = COMMISSION_RATE,
+        stamp_tax_rate: float = STAMP_TAX_RATE
+    ) -> np.ndarray:
         """
-        计算佣金和印花税（覆盖父类方法）
+        批量计算成交费用（与 AShareCommissionInfo 规则相同的向量化版本）
 
-        A股费用结构：
-        - 佣金: 买卖双向收取，0.03%，最低5元
-        - 印花税: 仅卖出收取，0.1%
-        - 过户费: 忽略（金额很小）
+        用于对一组成交（如 fast_mode 的交易数组）一次性计算费用，
+        避免逐笔调用 _getcommission。
+
+        Args:
+            sizes: 成交数量数组（正数=买入，负数=卖出）
+            prices: 成交价格数组
+            commission_rate: 佣金率
+            stamp_tax_rate: 印花税率（仅卖出）
+
+        Returns:
+            每笔成交的总费用数组（佣金 + 卖出印花税）
+        """
+        sizes = np.asarray(sizes, dtype=np.float64)
+        amount = np.abs(sizes) * np.asarray(prices, dtype=np.float64)
+        commission = np.maximum(amount * commission_rate, MIN_COMMISSION)  # 最低5元
+        stamp_tax = np.where(sizes < 0, amount * stamp_tax_rate, 0.0)
+        return commission + stamp_tax
+
+    def _getcommission(self, size, price, pseudoexec):
+        """
+        计算佣金和印花税（规则见 AShareCommissionInfo）
 
         Args:
             size: 交易数量（正数=买入，负数=卖出）
@@ -206,20 +322,4 @@ class AShareBroker(bt.brokers.BrokerBack):
         Returns:
             总费用（佣金 + 印花税）
         """
-        # 基础佣金（双向）
-        commission = abs(size) * price * COMMISSION_RATE
-        commission = max(commission, 5.0)  # 最低5元
-
-        # 卖出时加上印花税
-        if size < 0:  # 卖出
-            stamp_tax = abs(size) * price * STAMP_TAX_RATE
-            total_commission = commission + stamp_tax
-            logger.debug(
-                f"卖出费用: 佣金 {commission:.2f} 元 + "
-                f"印花税 {stamp_tax:.2f} 元 = "
-                f"总计 {total_commission:.2f} 元"
-            )
-            return total_commission
-        else:  # 买入
-            logger.debug(f"买入佣金: {commission:.2f} 元")
-            return commission
+        return self._a_share_comminfo._getcommission(size, price, pseudoexec)
@@ -1,16 +1,22 @@
 """回测引擎模块 - 基于backtrader的A股回测系统"""
 import backtrader as bt
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from itertools import product
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Type
+from typing import Dict, Any, Optional, List, Tuple, Type
 from src.core.logger import get_logger
 from src.core.constants import (
     DEFAULT_CAPITAL,
     COMMISSION_RATE,
+    MIN_COMMISSION,
     STAMP_TAX_RATE,
+    MIN_LOT,
     SignalType
 )
 from src.strategy.base_strategy import BaseStrategy
+from src.backtest.numpy_feed import NumpyPandasData
 
 logger = get_logger(__name__)
 
@@ -32,6 +38,15 @@ class BacktestEngine:
         cerebro: backtrader引擎实例
     """
 
+    # 买入时使用的资金比例（留5%作为手续费缓冲），backtrader与fast_mode共用
+    CASH_RATIO = 0.95
+
+    # 只影响撮合、不影响信号生成的风控参数（网格回测中按其余参数复用信号）
+    RISK_PARAMS = ('stop_loss', 'take_profit', 'max_holding_days')
+
+    # 标准化K线的LRU缓存容量（参数扫描时同一份数据重复回测）
+    FRAME_CACHE_SIZE = 8
+
     def __init__(
         self,
         initial_cash: float = DEFAULT_CAPITAL,
@@ -51,6 +66,9 @@ class BacktestEngine:
         self.stamp_tax = stamp_tax
         self.cerebro = None
 
+        # 标准化K线缓存：(id(原始数据), 开始日期, 结束日期) -> (原始数据, 标准化结果)
+        self._frame_cache: OrderedDict = OrderedDict()
+
         logger.info(
             f"回测引擎初始化完成 - "
             f"初始资金: {initial_cash:,.0f}, "
@@ -64,7 +82,8 @@ class BacktestEngine:
         data: pd.DataFrame,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        stock_code: Optional[str] = None
+        stock_code: Optional[str] = None,
+        fast_mode: bool = False
     ) -> Dict[str, Any]:
         """
         运行回测
@@ -75,6 +94,8 @@ class BacktestEngine:
             start_date: 开始日期（YYYY-MM-DD）
             end_date: 结束日期（YYYY-MM-DD）
             stock_code: 股票代码（用于识别板块和涨跌停限制）
+            fast_mode: 是否跳过backtrader，直接用编译后的撮合循环计算
+                （交易与资产曲线一致；夏普比率改用BacktestMetrics的计算结果）
 
         Returns:
             回测结果字典：
@@ -91,33 +112,43 @@ class BacktestEngine:
         logger.info("=" * 60)
         logger.info("开始回测")
         logger.info(f"策略: {strategy_class.__name__}")
-        logger.info(f"数据量: {len(data)} 条")
+        logger.info("数据量: {} 条", data.shape[0])
         if start_date:
             logger.info(f"开始日期: {start_date}")
         if end_date:
             logger.info(f"结束日期: {end_date}")
         logger.info("=" * 60)
 
+        if fast_mode:
+            return self._run_fast(strategy_class, data, start_date, end_date)
+
         # 1. 创建Cerebro引擎
         self.cerebro = bt.Cerebro()
 
-        # 2. 使用自定义A股Broker（包含涨跌停限制、交易单位、印花税等）
+        # 2. 准备数据（标准化后的K线同时用于数据源和信号生成）
+        df = self._prepare_frame(data, start_date, end_date)
+        bt_data = self._create_feed(df)
+
+        # 3. 使用自定义A股Broker（包含涨跌停限制、交易单位、佣金与印花税等），
+        #    涨跌停价按回测数据的收盘价预先算好
         from src.backtest.a_share_broker import AShareBroker
-        broker = AShareBroker(stock_code=stock_code)
+        broker = AShareBroker(
+            stock_code=stock_code,
+            close_array=bt_data.p.dataname['close'].to_numpy(dtype=float),
+            commission_rate=self.commission,
+            stamp_tax_rate=self.stamp_tax
+        )
         self.cerebro.broker = broker
 
-        # 3. 设置初始资金
+        # 4. 设置初始资金并添加数据
         self.cerebro.broker.setcash(self.initial_cash)
-
-        # 4. 准备并添加数据
-        bt_data = self._prepare_data(data, start_date, end_date)
         self.cerebro.adddata(bt_data)
 
         # 5. 预先生成所有交易信号（关键：策略转换方案1）
-        signals_df = self._generate_all_signals(strategy_class, data, start_date, end_date)
+        signals_df, strategy = self._generate_all_signals(strategy_class, df)
 
-        # 6. 添加策略（将BaseStrategy转换为backtrader策略）
-        bt_strategy = self._convert_strategy(strategy_class, signals_df)
+        # 6. 添加策略（将BaseStrategy转换为backtrader策略，复用生成信号的策略实例）
+        bt_strategy = self._convert_strategy(strategy_class, signals_df, strategy)
         self.cerebro.addstrategy(bt_strategy)
 
         # 7. 添加分析器
@@ -152,14 +183,100 @@ class BacktestEngine:
 
         return backtest_results
 
+    def run_backtest_grid(
+        self,
+        strategy_class: Type[BaseStrategy],
+        data: pd.DataFrame,
+        param_grid: Dict[str, List[Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        参数网格回测：对所有参数组合批量运行 fast_mode 撮合
+
+        每组参数各生成一次信号（只有风控参数不同的组合共用同一份信号），
+        再由 _bt_loop.simulate_batch 在参数维度上并行撮合。
+
+        Args:
+            strategy_class: 策略类（继承自BaseStrategy）
+            data: K线数据DataFrame（需包含OHLCV）
+            param_grid: {参数名: 候选值列表}，取所有值的笛卡尔积
+            start_date: 开始日期（YYYY-MM-DD）
+            end_date: 结束日期（YYYY-MM-DD）
+
+        Returns:
+            每组参数一行的DataFrame，包含参数列及
+            final_value、total_return、max_drawdown、total_trades、win_rate
+
+        Raises:
+            ValueError: 参数网格为空或某个参数没有候选值
+        """
+        from src.backtest._bt_loop import simulate_batch
+
+        if not param_grid or any(len(values) == 0 for values in param_grid.values()):
+            raise ValueError("参数网格不能为空，且每个参数至少需要一个候选值")
+
+        names = list(param_grid)
+        combos = [dict(zip(names, values)) for values in product(*param_grid.values())]
+        logger.info("开始网格回测 - 策略: {}, 参数组合: {}", strategy_class.__name__, len(combos))
+
+        df = self._prepare_frame(data, start_date, end_date)
+
+        signal_rows = np.empty((len(combos), df.shape[0]), dtype=np.int8)
+        stop_loss = np.empty(len(combos))
+        take_profit = np.empty(len(combos))
+        max_holding_days = np.empty(len(combos), dtype=np.int64)
+        signal_cache = {}
+        for i, combo in enumerate(combos):
+            signal_key = tuple((k, v) for k, v in combo.items() if k not in self.RISK_PARAMS)
+            if signal_key not in signal_cache:
+                signals_df, strategy = self._generate_all_signals(strategy_class, df, combo)
+                signal_cache[signal_key] = (self._encode_signals(signals_df, df.index), strategy)
+            signal_rows[i], strategy = signal_cache[signal_key]
+
+            params = {**strategy.params, **combo}
+            stop_loss[i] = params.get('stop_loss', 0.08)
+            take_profit[i] = params.get('take_profit', 0.15)
+            max_holding_days[i] = params.get('max_holding_days', 10)
+
+        day = df.index.normalize().values.astype('datetime64[D]').astype(np.int64)
+        final_values, max_drawdowns, trade_counts, win_counts = simulate_batch(
+            signal_rows,
+            day,
+            df['open'].to_numpy(dtype=np.float64),
+            df['close'].to_numpy(dtype=np.float64),
+            float(self.initial_cash),
+            self.CASH_RATIO,
+            MIN_LOT,
+            stop_loss,
+            take_profit,
+            max_holding_days,
+            float(self.commission),
+            MIN_COMMISSION,
+            float(self.stamp_tax)
+        )
+
+        results = pd.DataFrame(combos)
+        results['final_value'] = final_values
+        results['total_return'] = (final_values - self.initial_cash) / self.initial_cash
+        results['max_drawdown'] = max_drawdowns
+        results['total_trades'] = trade_counts
+        results['win_rate'] = np.divide(
+            win_counts, trade_counts,
+            out=np.zeros(len(combos)), where=trade_counts > 0
+        )
+
+        logger.info("网格回测完成 - 信号生成次数: {}", len(signal_cache))
+        return results
+
     def _prepare_data(
         self,
         df: pd.DataFrame,
         start_date: Optional[str],
         end_date: Optional[str]
-    ) -> bt.feeds.PandasData:
+    ) -> NumpyPandasData:
         """
-        准备backtrader数据源
+        准备backtrader数据源（列数据预先提取为列表，逐bar加载时不再访问DataFrame）
 
         Args:
             df: 原始K线数据
@@ -169,30 +286,19 @@ class BacktestEngine:
         Returns:
             backtrader数据源对象
         """
-        # 标准化列名
-        df = df.copy()
-        df = self._standardize_columns(df)
-
-        # 设置日期索引
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-        elif not isinstance(df.index, pd.DatetimeIndex):
-            raise ValueError("数据必须包含'date'列或DatetimeIndex")
-
-        # 过滤日期范围
-        if start_date:
-            df = df[df.index >= start_date]
-        if end_date:
-            df = df[df.index <= end_date]
+        return self._create_feed(self._prepare_frame(df, start_date, end_date))
 
-        if len(df) == 0:
-            raise ValueError("过滤后数据为空，请检查日期范围")
+    def _create_feed(self, df: pd.DataFrame) -> NumpyPandasData:
+        """
+        由标准化后的K线数据创建backtrader数据源
 
-        logger.info(f"数据准备完成 - 数据量: {len(df)}, 日期范围: {df.index[0]} 至 {df.index[-1]}")
+        Args:
+            df: _prepare_frame 返回的以日期为索引的K线数据
 
-        # 创建backtrader数据源
-        data = bt.feeds.PandasData(
+        Returns:
+            backtrader数据源对象
+        """
+        data = NumpyPandasData(
             dataname=df,
             datetime=None,  # 使用索引作为日期
             open='open',
@@ -205,6 +311,171 @@ class BacktestEngine:
 
         return data
 
+    def _prepare_frame(
+        self,
+        df: pd.DataFrame,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> pd.DataFrame:
+        """
+        标准化列名、设置日期索引并按日期范围过滤
+
+        同一个DataFrame对象和日期范围的结果会被缓存复用，
+        原地修改过的数据需要先调用 clear_frame_cache()。
+
+        Args:
+            df: 原始K线数据
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            以日期为索引的K线数据
+        """
+        key = (id(df), start_date, end_date)
+        cached = self._frame_cache.get(key)
+        if cached is not None and cached[0] is df:
+            self._frame_cache.move_to_end(key)
+            return cached[1]
+
+        source = df
+
+        # 标准化列名（rename返回新对象，后续修改不影响调用方数据，无需再copy）
+        df = self._standardize_columns(df)
+
+        # 设置日期索引（解析后的日期直接作为索引，不再先写回列再set_index）
+        if 'date' in df.columns:
+            dates = pd.DatetimeIndex(pd.to_datetime(df['date']), name='date')
+            df = df.drop(columns='date').set_axis(dates, axis=0)
+        elif not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("数据必须包含'date'列或DatetimeIndex")
+
+        # 过滤日期范围：按时间排序的数据用二分查找定位切片，避免构造布尔掩码
+        if df.index.is_monotonic_increasing:
+            lo = df.index.searchsorted(pd.Timestamp(start_date), side='left') if start_date else 0
+            hi = df.index.searchsorted(pd.Timestamp(end_date), side='right') if end_date else df.shape[0]
+            df = df.iloc[lo:hi]
+        else:
+            if start_date:
+                df = df[df.index >= start_date]
+            if end_date:
+                df = df[df.index <= end_date]
+
+        n_rows = df.shape[0]
+        if n_rows == 0:
+            raise ValueError("过滤后数据为空，请检查日期范围")
+
+        logger.info("数据准备完成 - 数据量: {}, 日期范围: {} 至 {}", n_rows, df.index[0], df.index[-1])
+
+        # 缓存中保留原始数据的引用，既防止id被复用，也用于命中时核对是同一对象
+        self._frame_cache[key] = (source, df)
+        if len(self._frame_cache) > self.FRAME_CACHE_SIZE:
+            self._frame_cache.popitem(last=False)
+        return df
+
+    def clear_frame_cache(self) -> None:
+        """清空标准化K线缓存"""
+        self._frame_cache.clear()
+
+    def _run_fast(
+        self,
+        strategy_class: Type[BaseStrategy],
+        data: pd.DataFrame,
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        不经过backtrader，直接用 _bt_loop.simulate 撮合预先生成的信号
+
+        Args:
+            strategy_class: 策略类
+            data: K线数据
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            回测结果字典，结构与 run_backtest 相同
+        """
+        from src.backtest._bt_loop import simulate
+        from src.backtest.a_share_broker import AShareBroker
+
+        df = self._prepare_frame(data, start_date, end_date)
+        signals_df, strategy = self._generate_all_signals(strategy_class, df)
+        signal_codes = self._encode_signals(signals_df, df.index)
+
+        dates = df.index.normalize()
+        day = dates.values.astype('datetime64[D]').astype(np.int64)
+
+        values, entry_bars, exit_bars, entry_fills, exit_fills, sizes = simulate(
+            signal_codes,
+            day,
+            df['open'].to_numpy(dtype=np.float64),
+            df['close'].to_numpy(dtype=np.float64),
+            float(self.initial_cash),
+            self.CASH_RATIO,
+            MIN_LOT,
+            float(strategy.get_param('stop_loss', 0.08)),
+            float(strategy.get_param('take_profit', 0.15)),
+            int(strategy.get_param('max_holding_days', 10)),
+            float(self.commission),
+            MIN_COMMISSION,
+            float(self.stamp_tax)
+        )
+
+        # 每笔交易的买入与卖出费用（撮合循环已从资金中扣除），净盈亏与TradeRecorder一样扣除费用
+        commissions = (
+            AShareBroker.compute_fees(sizes, entry_fills, self.commission, self.stamp_tax)
+            + AShareBroker.compute_fees(-sizes, exit_fills, self.commission, self.stamp_tax)
+        )
+        pnls = sizes * (exit_fills - entry_fills) - commissions
+        n_trades = len(pnls)
+        trades_df = pd.DataFrame({
+            'entry_date': dates[entry_bars].strftime('%Y-%m-%d'),
+            'exit_date': dates[exit_bars].strftime('%Y-%m-%d'),
+            'entry_price': entry_fills,
+            'exit_price': np.zeros(n_trades, dtype=np.int64),
+            'size': exit_bars - entry_bars,
+            'pnl': pnls,
+            'commission': commissions,
+            'status': ['closed'] * n_trades
+        })
+        trades_list = trades_df.to_dict('records')
+
+        portfolio_values = pd.Series(values, index=pd.DatetimeIndex(dates, name='date'))
+        peaks = np.maximum.accumulate(values)
+        max_drawdown = float(np.max((peaks - values) / peaks)) if len(values) else 0.0
+        total_trades = len(trades_list)
+        win_rate = int(np.count_nonzero(pnls >= 0)) / total_trades if total_trades else 0
+
+        initial_value = float(self.initial_cash)
+        final_value = float(values[-1])
+        logger.info(f"最终资金: {final_value:,.2f}")
+
+        return self._build_results(
+            initial_value, final_value, None, max_drawdown,
+            total_trades, win_rate, trades_list, portfolio_values, trades_df
+        )
+
+    def _encode_signals(self, signals_df: pd.DataFrame, index: pd.DatetimeIndex) -> np.ndarray:
+        """
+        按K线日期对齐信号并编码为int8（取值只有-1/0/1，撮合循环逐bar读取时内存占用最小）
+
+        Args:
+            signals_df: 包含signal列的DataFrame
+            index: K线日期索引
+
+        Returns:
+            与index等长的信号编码数组（_bt_loop.SIGNAL_*）
+        """
+        from src.backtest._bt_loop import SIGNAL_BUY, SIGNAL_HOLD, SIGNAL_SELL
+
+        signals = signals_df['signal']
+        signals = signals[~signals.index.duplicated(keep='last')].reindex(index)
+        return np.select(
+            [signals == SignalType.BUY.value, signals == SignalType.SELL.value],
+            [SIGNAL_BUY, SIGNAL_SELL],
+            default=SIGNAL_HOLD
+        ).astype(np.int8)
+
     def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         标准化列名（中文→英文）
@@ -228,10 +499,9 @@ class BacktestEngine:
     def _generate_all_signals(
         self,
         strategy_class: Type[BaseStrategy],
-        data: pd.DataFrame,
-        start_date: Optional[str],
-        end_date: Optional[str]
-    ) -> pd.DataFrame:
+        df: pd.DataFrame,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[pd.DataFrame, BaseStrategy]:
         """
         预先生成所有交易信号（方案1的核心）
 
@@ -242,50 +512,38 @@ class BacktestEngine:
 
         Args:
             strategy_class: 策略类
-            data: K线数据
-            start_date: 开始日期
-            end_date: 结束日期
+            df: _prepare_frame 返回的K线数据（与数据源共用，不再重复复制和解析日期）
+            params: 覆盖策略默认参数的字典（可选）
 
         Returns:
-            包含信号列的DataFrame
+            (包含信号列的DataFrame, 生成信号所用的策略实例)
         """
         logger.info("预先生成交易信号...")
 
-        # 标准化数据
-        df = data.copy()
-        df = self._standardize_columns(df)
-
-        # 设置日期索引
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-
-        # 过滤日期
-        if start_date:
-            df = df[df.index >= start_date]
-        if end_date:
-            df = df[df.index <= end_date]
-
         # 实例化策略并生成信号
         strategy = strategy_class()
+        if params:
+            strategy.params = {**strategy.params, **params}
         signals_df = strategy.generate_signals(df)
 
-        # 统计信号
-        buy_count = (signals_df['signal'] == SignalType.BUY.value).sum()
-        sell_count = (signals_df['signal'] == SignalType.SELL.value).sum()
-        hold_count = (signals_df['signal'] == SignalType.HOLD.value).sum()
+        # 统计信号（一次哈希计数，代替三次逐元素比较）
+        signal_counts = signals_df['signal'].value_counts()
+        buy_count = int(signal_counts.get(SignalType.BUY.value, 0))
+        sell_count = int(signal_counts.get(SignalType.SELL.value, 0))
+        hold_count = int(signal_counts.get(SignalType.HOLD.value, 0))
 
         logger.info(
-            f"信号生成完成 - "
-            f"买入: {buy_count}, 卖出: {sell_count}, 持有: {hold_count}"
+            "信号生成完成 - 买入: {}, 卖出: {}, 持有: {}",
+            buy_count, sell_count, hold_count
         )
 
-        return signals_df
+        return signals_df, strategy
 
     def _convert_strategy(
         self,
         strategy_class: Type[BaseStrategy],
-        signals_df: pd.DataFrame
+        signals_df: pd.DataFrame,
+        strategy: Optional[BaseStrategy] = None
     ) -> Type[bt.Strategy]:
         """
         将BaseStrategy转换为backtrader策略
@@ -299,28 +557,52 @@ class BacktestEngine:
         Args:
             strategy_class: BaseStrategy子类
             signals_df: 预先生成的信号DataFrame
+            strategy: 已创建的策略实例（可选），提供时不再重复实例化
 
         Returns:
             backtrader策略类
         """
-        # 保存外部变量的引用
-        signals = signals_df
+        # 预先把信号整理为 {日期: 信号} 字典，next() 中按日期直接查表，
+        # 避免每个bar构造Timestamp并在DataFrame索引上查找
+        if isinstance(signals_df.index, pd.DatetimeIndex):
+            signal_by_date = dict(zip(signals_df.index.date, signals_df['signal'].to_numpy()))
+        else:
+            signal_by_date = {}
         base_strategy_class = strategy_class
 
+        # 信号取值提前取出，避免每个bar访问Enum的value属性
+        buy_signal = SignalType.BUY.value
+        sell_signal = SignalType.SELL.value
+        hold_signal = SignalType.HOLD.value
+
+        # 仓位计算参数同样在闭包中固定
+        cash_ratio = self.CASH_RATIO
+
         class BTStrategy(bt.Strategy):
             """Backtrader策略包装器"""
 
             def __init__(self):
                 """初始化策略"""
-                # 实例化原始策略（用于访问参数和方法）
-                self.base_strategy = base_strategy_class()
+                # 原始策略实例（用于访问参数和方法）
+                self.base_strategy = strategy if strategy is not None else base_strategy_class()
+
+                # 风控阈值只读取一次，next() 中直接做数值比较
+                self.stop_loss = self.base_strategy.get_param('stop_loss', 0.08)
+                self.take_profit = self.base_strategy.get_param('take_profit', 0.15)
+                self.max_holding_days = self.base_strategy.get_param('max_holding_days', 10)
 
                 # 交易状态
                 self.order = None
                 self.buy_date = None
+                self.buy_ordinal = None
                 self.entry_price = None
 
-                # 记录每日资产价值
+                # bar计数（整数），T+1 检查直接比较bar序号
+                self._bar_count = 0
+                self.buy_bar = -1
+
+                # 记录每日资产价值（日期与价值分开存放，提取结果时再统一转换）
+                self.daily_dates = []
                 self.daily_values = []
 
                 logger.info(f"Backtrader策略包装器初始化: {base_strategy_class.__name__}")
@@ -334,13 +616,12 @@ class BacktestEngine:
                 2. 未持仓时，检查买入信号
                 3. 持仓时，检查卖出信号（T+1、止损止盈）
                 """
+                self._bar_count += 1
+
                 # 记录当日资产价值
                 current_date = self.data.datetime.date(0)
-                current_value = self.broker.getvalue()
-                self.daily_values.append({
-                    'date': pd.Timestamp(current_date),
-                    'value': current_value
-                })
+                self.daily_dates.append(current_date)
+                self.daily_values.append(self.broker.getvalue())
 
                 # 如果有未完成订单，等待
                 if self.order:
@@ -350,34 +631,24 @@ class BacktestEngine:
                 current_price = self.data.close[0]
 
                 # 查询当前日期的信号
-                try:
-                    # 将当前日期转换为pandas Timestamp进行查询
-                    current_timestamp = pd.Timestamp(current_date)
-
-                    if current_timestamp in signals.index:
-                        signal = signals.loc[current_timestamp, 'signal']
-                    else:
-                        signal = SignalType.HOLD.value
-
-                except Exception as e:
-                    logger.debug(f"查询信号失败 {current_date}: {e}")
-                    signal = SignalType.HOLD.value
+                signal = signal_by_date.get(current_date, hold_signal)
 
                 # 未持仓 - 检查买入信号
                 if not self.position:
-                    if signal == SignalType.BUY.value:
+                    if signal == buy_signal:
                         # 计算可买数量（使用95%资金，留5%作为手续费缓冲）
-                        available_cash = self.broker.getcash() * 0.95
-                        size = int(available_cash / current_price / 100) * 100  # A股按手交易
+                        available_cash = self.broker.getcash() * cash_ratio
+                        size = int(available_cash / current_price / MIN_LOT) * MIN_LOT  # A股按手交易
 
-                        if size >= 100:  # 至少1手
+                        if size >= MIN_LOT:  # 至少1手
                             self.order = self.buy(size=size)
                             self.buy_date = current_date
+                            self.buy_bar = self._bar_count
+                            self.buy_ordinal = current_date.toordinal()
                             self.entry_price = current_price
                             logger.info(
-                                f"买入信号 - {current_date} "
-                                f"价格: {current_price:.2f} "
-                                f"数量: {size}"
+                                "买入信号 - {} 价格: {:.2f} 数量: {}",
+                                current_date, current_price, size
                             )
 
                 # 持仓中 - 检查卖出条件
@@ -385,45 +656,39 @@ class BacktestEngine:
                     should_sell = False
                     sell_reason = ""
 
-                    # 1. 检查T+1规则
-                    if not self.base_strategy.can_sell_today(
-                        pd.Timestamp(self.buy_date),
-                        pd.Timestamp(current_date)
-                    ):
+                    # 1. 检查T+1规则（日线下买入后的下一个bar即可卖出）
+                    if self._bar_count - self.buy_bar < 1:
                         return  # T+1限制，不能卖出
 
+                    # 相对买入价的涨跌幅只计算一次，止损/止盈/日志共用
+                    profit_pct = (current_price - self.entry_price) / self.entry_price
+
                     # 2. 检查信号卖出
-                    if signal == SignalType.SELL.value:
+                    if signal == sell_signal:
                         should_sell = True
                         sell_reason = "信号卖出"
 
-                    # 3. 检查止损
-                    elif self.base_strategy.check_stop_loss(self.entry_price, current_price):
+                    # 3. 检查止损（价格为0或负数时视为触及止损）
+                    elif current_price <= 0 or -profit_pct >= self.stop_loss:
                         should_sell = True
                         sell_reason = "止损"
 
                     # 4. 检查止盈
-                    elif self.base_strategy.check_take_profit(self.entry_price, current_price):
+                    elif profit_pct >= self.take_profit:
                         should_sell = True
                         sell_reason = "止盈"
 
-                    # 5. 检查最大持仓天数
-                    elif self.base_strategy.check_max_holding_days(
-                        pd.Timestamp(self.buy_date),
-                        pd.Timestamp(current_date)
-                    ):
+                    # 5. 检查最大持仓天数（自然日，与BaseStrategy.check_max_holding_days一致）
+                    elif current_date.toordinal() - self.buy_ordinal > self.max_holding_days:
                         should_sell = True
                         sell_reason = "超过最大持仓天数"
 
                     # 执行卖出
                     if should_sell:
                         self.order = self.sell(size=self.position.size)
-                        profit_pct = (current_price - self.entry_price) / self.entry_price
                         logger.info(
-                            f"卖出 ({sell_reason}) - {current_date} "
-                            f"买入价: {self.entry_price:.2f} "
-                            f"卖出价: {current_price:.2f} "
-                            f"收益率: {profit_pct:.2%}"
+                            "卖出 ({}) - {} 买入价: {:.2f} 卖出价: {:.2f} 收益率: {:.2%}",
+                            sell_reason, current_date, self.entry_price, current_price, profit_pct
                         )
 
             def notify_order(self, order):
@@ -431,20 +696,20 @@ class BacktestEngine:
                 if order.status in [order.Completed]:
                     if order.isbuy():
                         logger.debug(
-                            f"订单执行: 买入 {order.executed.size} 股 "
-                            f"@ {order.executed.price:.2f}"
+                            "订单执行: 买入 {} 股 @ {:.2f}",
+                            order.executed.size, order.executed.price
                         )
                     elif order.issell():
                         logger.debug(
-                            f"订单执行: 卖出 {order.executed.size} 股 "
-                            f"@ {order.executed.price:.2f}"
+                            "订单执行: 卖出 {} 股 @ {:.2f}",
+                            order.executed.size, order.executed.price
                         )
 
                     # 重置订单
                     self.order = None
 
                 elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-                    logger.warning(f"订单未执行: {order.status}")
+                    logger.warning("订单未执行: {}", order.status)
                     self.order = None
 
         return BTStrategy
@@ -473,9 +738,6 @@ class BacktestEngine:
         trades_analysis = strategy.analyzers.trades.get_analysis()
         trade_recorder_analysis = strategy.analyzers.trade_recorder.get_analysis()
 
-        # 计算收益率
-        total_return = (final_value - initial_value) / initial_value
-
         # 提取夏普比率
         sharpe_ratio = sharpe_analysis.get('sharperatio', 0)
         if sharpe_ratio is None:
@@ -507,17 +769,56 @@ class BacktestEngine:
 
         # 获取详细交易记录
         trades_list = trade_recorder_analysis.get('trades', [])
+        trades_df = trade_recorder_analysis.get('trades_df')
 
         # 获取每日资产价值（从broker的value观察器）
         portfolio_values = self._extract_portfolio_values(strategy)
 
+        return self._build_results(
+            initial_value, final_value, sharpe_ratio, max_drawdown,
+            total_trades, win_rate, trades_list, portfolio_values, trades_df
+        )
+
+    def _build_results(
+        self,
+        initial_value: float,
+        final_value: float,
+        sharpe_ratio: Optional[float],
+        max_drawdown: float,
+        total_trades: int,
+        win_rate: float,
+        trades_list: List[Dict[str, Any]],
+        portfolio_values: pd.Series,
+        trades_df: Optional[pd.DataFrame] = None
+    ) -> Dict[str, Any]:
+        """
+        汇总回测结果并计算详细指标
+
+        Args:
+            initial_value: 初始资金
+            final_value: 最终资金
+            sharpe_ratio: 夏普比率，None表示使用BacktestMetrics的计算结果
+            max_drawdown: 最大回撤
+            total_trades: 已平仓交易次数
+            win_rate: 胜率
+            trades_list: 交易记录列表
+            portfolio_values: 每日资产价值
+            trades_df: 按列构建的交易记录DataFrame（可选），提供时指标计算直接使用，
+                不再由 trades_list 重新转换
+
+        Returns:
+            回测结果字典
+        """
+        # 计算收益率
+        total_return = (final_value - initial_value) / initial_value
+
         # 使用BacktestMetrics计算详细指标
         from src.backtest.metrics import BacktestMetrics
 
         if len(portfolio_values) > 0:
             metrics_calculator = BacktestMetrics(
                 portfolio_values=portfolio_values,
-                trades=trades_list,
+                trades=trades_df if trades_df is not None else trades_list,
                 initial_capital=initial_value
             )
 
@@ -527,6 +828,9 @@ class BacktestEngine:
             detailed_metrics = {}
             summary_text = ""
 
+        if sharpe_ratio is None:
+            sharpe_ratio = detailed_metrics.get('sharpe_ratio', 0)
+
         results = {
             'initial_value': initial_value,
             'final_value': final_value,
@@ -573,9 +877,10 @@ class BacktestEngine:
         try:
             # 从策略中获取记录的每日价值
             if hasattr(strategy, 'daily_values') and len(strategy.daily_values) > 0:
-                df = pd.DataFrame(strategy.daily_values)
-                series = pd.Series(df['value'].values, index=df['date'])
-                return series
+                return pd.Series(
+                    strategy.daily_values,
+                    index=pd.DatetimeIndex(pd.to_datetime(strategy.daily_dates), name='date')
+                )
             else:
                 logger.warning("策略中没有记录每日资产价值")
                 return pd.Series()
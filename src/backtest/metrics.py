@@ -2,8 +2,10 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from functools import cached_property
+from typing import Dict, List, Any, Optional, Tuple, Union
 from src.core.logger import get_logger
+from src.utils._njit import NUMBA_AVAILABLE
 
 logger = get_logger(__name__)
 
@@ -23,6 +25,10 @@ class BacktestMetrics:
         trades: 交易记录DataFrame
         initial_capital: 初始资金
         final_capital: 最终资金
+
+    Note:
+        资产价值数组、日收益率、累计最大值、回撤、年化收益率和最大回撤在首次使用时计算并缓存，
+        各指标共用，实例创建后不应再修改 portfolio_values。
     """
 
     def __init__(
@@ -56,15 +62,43 @@ class BacktestMetrics:
         计算所有指标
 
         Returns:
-            包含所有指标的字典
+            包含所有指标的字典（summary_metrics() 的标量指标加上月度收益率序列）
         """
         logger.info("开始计算所有指标...")
 
+        summary = self.summary_metrics()
         metrics = {
+            # 收益指标
+            'total_return': summary.pop('total_return'),
+            'annual_return': summary.pop('annual_return'),
+            'monthly_returns': self.calculate_monthly_returns(),
+
+            # 风险、交易与费用指标
+            **summary
+        }
+
+        logger.info("指标计算完成")
+        return metrics
+
+    def summary_metrics(self) -> Dict[str, Any]:
+        """
+        计算摘要指标（不含月度收益率等序列数据）
+
+        Returns:
+            包含收益、风险、交易和费用标量指标的字典
+        """
+        summary = dict(self._summary_metrics)
+        # 最大回撤字典返回副本，调用方修改结果不影响缓存
+        summary['max_drawdown'] = dict(summary['max_drawdown'])
+        return summary
+
+    @cached_property
+    def _summary_metrics(self) -> Dict[str, Any]:
+        """摘要指标（缓存，calculate_all_metrics 与 format_summary 共用）"""
+        return {
             # 收益指标
             'total_return': self.calculate_total_return(),
             'annual_return': self.calculate_annual_return(),
-            'monthly_returns': self.calculate_monthly_returns(),
 
             # 风险指标
             'max_drawdown': self.calculate_max_drawdown(),
@@ -86,8 +120,67 @@ class BacktestMetrics:
             'fee_percentage': self.calculate_fee_percentage(),
         }
 
-        logger.info("指标计算完成")
-        return metrics
+    @cached_property
+    def _daily_returns(self) -> pd.Series:
+        """日收益率序列（缓存）"""
+        return self.portfolio_values.pct_change().dropna()
+
+    @cached_property
+    def _values(self) -> np.ndarray:
+        """资产价值数组（缓存）"""
+        return self.portfolio_values.to_numpy(dtype=np.float64)
+
+    @cached_property
+    def _cummax(self) -> np.ndarray:
+        """资产价值累计最大值数组（缓存）"""
+        return np.maximum.accumulate(self._values)
+
+    @cached_property
+    def _drawdown(self) -> np.ndarray:
+        """每日回撤数组（缓存，负值）"""
+        return (self._values - self._cummax) / self._cummax
+
+    @cached_property
+    def _annual_return(self) -> float:
+        """年化收益率（缓存）"""
+        if len(self.portfolio_values) < 2:
+            return 0.0
+
+        days = (self.portfolio_values.index[-1] - self.portfolio_values.index[0]).days
+        if days == 0:
+            return 0.0
+
+        years = days / 365.0
+        total_return = self.calculate_total_return()
+
+        # 年化公式: (1 + total_return) ^ (1/years) - 1
+        return (1 + total_return) ** (1 / years) - 1
+
+    @cached_property
+    def _max_drawdown_dict(self) -> Dict[str, Any]:
+        """最大回撤信息（缓存）"""
+        if len(self.portfolio_values) < 2:
+            return {
+                'drawdown_pct': 0,
+                'drawdown_amount': 0,
+                'start_date': None,
+                'end_date': None
+            }
+
+        values = self._values
+        drawdown = self._drawdown
+
+        # 按位置找到最大回撤的谷值，峰值为谷值之前（含）第一次出现的最高点
+        end = int(drawdown.argmin())
+        start = int(values[:end + 1].argmax())
+        index = self.portfolio_values.index
+
+        return {
+            'drawdown_pct': abs(drawdown[end]),
+            'drawdown_amount': abs(values[end] - self._cummax[end]),
+            'start_date': index[start],
+            'end_date': index[end]
+        }
 
     def calculate_total_return(self) -> float:
         """
@@ -109,18 +202,7 @@ class BacktestMetrics:
         Returns:
             年化收益率（小数形式）
         """
-        if len(self.portfolio_values) < 2:
-            return 0.0
-
-        days = (self.portfolio_values.index[-1] - self.portfolio_values.index[0]).days
-        if days == 0:
-            return 0.0
-
-        years = days / 365.0
-        total_return = self.calculate_total_return()
-
-        # 年化公式: (1 + total_return) ^ (1/years) - 1
-        return (1 + total_return) ** (1 / years) - 1
+        return self._annual_return
 
     def calculate_monthly_returns(self) -> pd.Series:
         """
@@ -132,8 +214,16 @@ class BacktestMetrics:
         if len(self.portfolio_values) < 2:
             return pd.Series()
 
-        # 重采样为月度（取月末值）
-        monthly_values = self.portfolio_values.resample('ME').last()
+        # 按自然月分组取月末值；补齐无数据的月份（如整月停牌）为NaN，
+        # 使其前后两个月的收益率被剔除，而不是把跨月收益记在一个月上
+        idx = self.portfolio_values.index
+        monthly_values = self.portfolio_values.groupby(idx.to_period('M')).last()
+        monthly_values = monthly_values.reindex(
+            pd.period_range(monthly_values.index[0], monthly_values.index[-1], freq='M')
+        )
+
+        # 索引还原为月末日期
+        monthly_values.index = monthly_values.index.to_timestamp(how='end').normalize()
 
         # 计算月度收益率
         monthly_returns = monthly_values.pct_change().dropna()
@@ -151,34 +241,8 @@ class BacktestMetrics:
             - start_date: 回撤开始日期（峰值日期）
             - end_date: 回撤结束日期（谷值日期）
         """
-        if len(self.portfolio_values) < 2:
-            return {
-                'drawdown_pct': 0,
-                'drawdown_amount': 0,
-                'start_date': None,
-                'end_date': None
-            }
-
-        # 计算累计最大值
-        cummax = self.portfolio_values.cummax()
-
-        # 计算回撤
-        drawdown = (self.portfolio_values - cummax) / cummax
-
-        # 找到最大回撤
-        max_dd_idx = drawdown.idxmin()
-        max_dd_pct = drawdown.min()
-        max_dd_amount = (self.portfolio_values[max_dd_idx] - cummax[max_dd_idx])
-
-        # 找到回撤开始日期（峰值日期）
-        start_idx = cummax[:max_dd_idx].idxmax() if max_dd_idx in cummax.index else None
-
-        return {
-            'drawdown_pct': abs(max_dd_pct),
-            'drawdown_amount': abs(max_dd_amount),
-            'start_date': start_idx,
-            'end_date': max_dd_idx
-        }
+        # 返回副本，调用方修改结果不影响缓存
+        return dict(self._max_drawdown_dict)
 
     def calculate_volatility(self) -> float:
         """
@@ -192,11 +256,8 @@ class BacktestMetrics:
         if len(self.portfolio_values) < 2:
             return 0.0
 
-        # 计算日收益率
-        daily_returns = self.portfolio_values.pct_change().dropna()
-
         # 年化波动率 = 日波动率 * sqrt(252)
-        return daily_returns.std() * np.sqrt(252)
+        return self._daily_returns.std() * np.sqrt(252)
 
     def calculate_sharpe_ratio(self, risk_free_rate: float = 0.03) -> float:
         """
@@ -232,8 +293,7 @@ class BacktestMetrics:
         if len(self.portfolio_values) < 2:
             return 0.0
 
-        # 计算日收益率
-        daily_returns = self.portfolio_values.pct_change().dropna()
+        daily_returns = self._daily_returns
 
         # 只取负收益
         downside_returns = daily_returns[daily_returns < 0]
@@ -261,8 +321,8 @@ class BacktestMetrics:
         Returns:
             Calmar比率
         """
-        annual_return = self.calculate_annual_return()
-        max_dd = self.calculate_max_drawdown()
+        annual_return = self._annual_return
+        max_dd = self._max_drawdown_dict
 
         if max_dd['drawdown_pct'] == 0:
             return 0.0
@@ -278,12 +338,8 @@ class BacktestMetrics:
         Returns:
             总交易次数
         """
-        if self.trades.empty:
-            return 0
-
         # 只计算完整的买卖对
-        closed_trades = self.trades[self.trades.get('status', 'closed') == 'closed']
-        return len(closed_trades)
+        return len(self._closed_trades)
 
     def calculate_win_rate(self) -> float:
         """
@@ -292,16 +348,11 @@ class BacktestMetrics:
         Returns:
             胜率（0到1之间的小数）
         """
-        if self.trades.empty:
-            return 0.0
-
-        closed_trades = self.trades[self.trades.get('status', 'closed') == 'closed']
-        if len(closed_trades) == 0:
+        pnl = self._closed_pnl
+        if pnl.size == 0:
             return 0.0
 
-        winning_trades = len(closed_trades[closed_trades.get('pnl', 0) > 0])
-
-        return winning_trades / len(closed_trades)
+        return int(np.count_nonzero(self._win_mask)) / pnl.size
 
     def calculate_profit_loss_ratio(self) -> float:
         """
@@ -310,21 +361,15 @@ class BacktestMetrics:
         Returns:
             盈亏比，如果没有亏损交易返回inf，如果没有盈利交易返回0
         """
-        if self.trades.empty:
-            return 0.0
+        pnl = self._closed_pnl
+        winning_pnl = pnl[self._win_mask]
+        losing_pnl = pnl[self._loss_mask]
 
-        closed_trades = self.trades[self.trades.get('status', 'closed') == 'closed']
-        if len(closed_trades) == 0:
-            return 0.0
+        if losing_pnl.size == 0:
+            return float('inf') if winning_pnl.size > 0 else 0.0
 
-        winning_trades = closed_trades[closed_trades.get('pnl', 0) > 0]
-        losing_trades = closed_trades[closed_trades.get('pnl', 0) < 0]
-
-        if len(losing_trades) == 0:
-            return float('inf') if len(winning_trades) > 0 else 0.0
-
-        avg_win = winning_trades['pnl'].mean() if len(winning_trades) > 0 else 0
-        avg_loss = abs(losing_trades['pnl'].mean())
+        avg_win = winning_pnl.mean() if winning_pnl.size > 0 else 0
+        avg_loss = abs(losing_pnl.mean())
 
         if avg_loss == 0:
             return 0.0
@@ -341,17 +386,10 @@ class BacktestMetrics:
         if self.trades.empty or 'entry_date' not in self.trades.columns:
             return 0.0
 
-        closed_trades = self.trades[self.trades.get('status', 'closed') == 'closed']
-        if len(closed_trades) == 0:
+        if len(self._closed_trades) == 0:
             return 0.0
 
-        # 计算持仓天数
-        holding_days = (
-            pd.to_datetime(closed_trades['exit_date']) -
-            pd.to_datetime(closed_trades['entry_date'])
-        ).dt.days
-
-        return holding_days.mean()
+        return self._holding_days.mean()
 
     def calculate_max_consecutive_wins(self) -> int:
         """
@@ -371,6 +409,40 @@ class BacktestMetrics:
         """
         return self._calculate_max_consecutive('loss')
 
+    @cached_property
+    def _closed_trades(self) -> pd.DataFrame:
+        """已平仓交易（缓存，缺少status列时视为全部已平仓）"""
+        if self.trades.empty or 'status' not in self.trades.columns:
+            return self.trades
+        return self.trades[self.trades['status'] == 'closed']
+
+    @cached_property
+    def _closed_pnl(self) -> np.ndarray:
+        """已平仓交易的盈亏数组（缓存，胜率/盈亏比/连胜连亏统计共用）"""
+        closed_trades = self._closed_trades
+        if 'pnl' not in closed_trades.columns:
+            return np.zeros(len(closed_trades))
+        return closed_trades['pnl'].to_numpy(dtype=np.float64)
+
+    @cached_property
+    def _holding_days(self) -> pd.Series:
+        """已平仓交易的持仓天数（缓存，日期字符串只解析一次）"""
+        closed_trades = self._closed_trades
+        return (
+            pd.to_datetime(closed_trades['exit_date']) -
+            pd.to_datetime(closed_trades['entry_date'])
+        ).dt.days
+
+    @cached_property
+    def _win_mask(self) -> np.ndarray:
+        """已平仓交易是否盈利（缓存）"""
+        return self._closed_pnl > 0
+
+    @cached_property
+    def _loss_mask(self) -> np.ndarray:
+        """已平仓交易是否亏损（缓存）"""
+        return self._closed_pnl < 0
+
     def _calculate_max_consecutive(self, type: str) -> int:
         """
         计算最大连续次数
@@ -381,31 +453,25 @@ class BacktestMetrics:
         Returns:
             最大连续次数
         """
-        if self.trades.empty:
-            return 0
-
-        closed_trades = self.trades[self.trades.get('status', 'closed') == 'closed']
-        if len(closed_trades) == 0:
+        if self._closed_pnl.size == 0:
             return 0
 
-        # 判断盈亏
-        if type == 'win':
-            results = (closed_trades.get('pnl', 0) > 0).astype(int)
-        else:
-            results = (closed_trades.get('pnl', 0) < 0).astype(int)
+        if NUMBA_AVAILABLE:
+            from src.backtest._metrics_nb import max_consec_losses, max_consec_wins
+            counter = max_consec_wins if type == 'win' else max_consec_losses
+            return int(counter(self._closed_pnl))
 
-        # 计算连续次数
-        max_consecutive = 0
-        current_consecutive = 0
+        # 未安装numba时：判断盈亏后做游程编码
+        flags = self._win_mask if type == 'win' else self._loss_mask
 
-        for result in results:
-            if result == 1:
-                current_consecutive += 1
-                max_consecutive = max(max_consecutive, current_consecutive)
-            else:
-                current_consecutive = 0
+        # 游程编码：两端补0后差分，+1处为连续段起点，-1处为终点
+        edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        if starts.size == 0:
+            return 0
+        ends = np.flatnonzero(edges == -1)
 
-        return max_consecutive
+        return int((ends - starts).max())
 
     def calculate_total_fees(self) -> float:
         """
@@ -440,18 +506,18 @@ class BacktestMetrics:
         Returns:
             包含日期、资产价值、收益率、累计收益率的DataFrame
         """
-        df = pd.DataFrame({
-            'date': self.portfolio_values.index,
-            'value': self.portfolio_values.values
-        })
-
-        # 添加收益率
-        df['return'] = df['value'].pct_change()
+        values = self._values
 
-        # 添加累计收益率
-        df['cumulative_return'] = (df['value'] / self.initial_capital - 1)
+        # 收益率（首日为NaN）在共用的数组上计算，最后一次性构建DataFrame
+        returns = np.full(values.shape, np.nan)
+        returns[1:] = values[1:] / values[:-1] - 1
 
-        return df
+        return pd.DataFrame({
+            'date': self.portfolio_values.index,
+            'value': values,
+            'return': returns,
+            'cumulative_return': values / self.initial_capital - 1
+        })
 
     def generate_drawdown_curve_data(self) -> pd.DataFrame:
         """
@@ -460,16 +526,25 @@ class BacktestMetrics:
         Returns:
             包含日期和回撤的DataFrame
         """
-        cummax = self.portfolio_values.cummax()
-        drawdown = (self.portfolio_values - cummax) / cummax
-
         df = pd.DataFrame({
-            'date': drawdown.index,
-            'drawdown': drawdown.values
+            'date': self.portfolio_values.index,
+            'drawdown': self._drawdown
         })
 
         return df
 
+    def generate_report_frames(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        同时生成权益曲线与回撤曲线数据
+
+        两条曲线都基于缓存的资产价值数组及其累计最大值，
+        各中间数组只计算一次，报告需要两者时优先使用本方法。
+
+        Returns:
+            (权益曲线DataFrame, 回撤曲线DataFrame)
+        """
+        return self.generate_equity_curve_data(), self.generate_drawdown_curve_data()
+
     def format_summary(self) -> str:
         """
         格式化输出摘要
@@ -477,7 +552,7 @@ class BacktestMetrics:
         Returns:
             格式化的摘要字符串
         """
-        metrics = self.calculate_all_metrics()
+        metrics = self._summary_metrics
 
         summary = f"""
 ╔══════════════════════════════════════════════════════════════╗
@@ -0,0 +1,46 @@
+"""基于预提取数组的backtrader数据源"""
+import backtrader as bt
+from backtrader.utils import date2num
+
+
+class NumpyPandasData(bt.feeds.PandasData):
+    """
+    PandasData 的快速版本
+
+    start() 时把各列一次性转换为Python列表、把索引日期转换为backtrader
+    的浮点日期，_load() 中只按整数下标读取列表，不再逐行调用 DataFrame.iloc。
+    参数与 PandasData 相同，dataname 仍保留原始 DataFrame。
+    """
+
+    def start(self):
+        """准备数据：解析列映射并预先提取每列数据"""
+        super().start()
+
+        df = self.p.dataname
+        self._columns = []
+        for datafield in self.getlinealiases():
+            if datafield == 'datetime':
+                continue
+            colindex = self._colmapping[datafield]
+            if colindex is None:
+                continue  # 数据中缺失的字段
+            self._columns.append(
+                (getattr(self.lines, datafield), df.iloc[:, colindex].tolist())
+            )
+
+        coldtime = self._colmapping['datetime']
+        tstamps = df.index if coldtime is None else df.iloc[:, coldtime]
+        self._dtnums = [date2num(ts.to_pydatetime()) for ts in tstamps]
+        self._size = len(df)
+
+    def _load(self):
+        """加载下一根K线"""
+        self._idx += 1
+        idx = self._idx
+        if idx >= self._size:
+            return False
+
+        for line, values in self._columns:
+            line[0] = values[idx]
+        self.lines.datetime[0] = self._dtnums[idx]
+        return True
@@ -1,5 +1,7 @@
 """交易记录分析器 - 用于记录详细的交易信息"""
 import backtrader as bt
+import numpy as np
+import pandas as pd
 from typing import List, Dict, Any
 from src.core.logger import get_logger
 
@@ -20,11 +22,22 @@ class TradeRecorder(bt.Analyzer):
     用于后续的详细指标计算
     """
 
+    # backtrader日期数值是公历序数（0001-01-01为1），减去1970-01-01的序数即为Unix纪元天数
+    _EPOCH_ORDINAL = 719163
+
     def __init__(self):
         """初始化分析器"""
         super(TradeRecorder, self).__init__()
         self.trades = []
         self.open_trades = {}  # 跟踪未平仓的交易
+        # 已平仓交易按列保存原始数值，日期在get_analysis()中统一转换
+        self._dtopen = []
+        self._dtclose = []
+        self._price = []
+        self._barlen = []
+        self._pnl = []
+        self._commission = []
+        self._frame = None
 
     def notify_trade(self, trade):
         """
@@ -37,34 +50,76 @@ class TradeRecorder(bt.Analyzer):
             # 交易已关闭，记录完整信息
             # 注意: backtrader的trade对象在关闭时，很多信息已经不可用
             # 我们主要记录盈亏和手续费用于指标计算
+            # 这里只按列追加数值，不逐笔构造字典、做日期转换和格式化
+            self._dtopen.append(trade.dtopen)
+            self._dtclose.append(trade.dtclose)
+            self._price.append(trade.price)
+            self._barlen.append(trade.barlen)  # 持仓bar数量
+            self._pnl.append(trade.pnlcomm)  # 包含手续费的净盈亏
+            self._commission.append(trade.commission)
 
-            trade_info = {
-                'entry_date': bt.num2date(trade.dtopen).strftime('%Y-%m-%d'),
-                'exit_date': bt.num2date(trade.dtclose).strftime('%Y-%m-%d'),
-                'entry_price': trade.price,
-                'exit_price': 0,  # backtrader不直接提供，需要从价格历史计算
-                'size': trade.barlen,  # 持仓bar数量
-                'pnl': trade.pnlcomm,  # 包含手续费的净盈亏
-                'commission': trade.commission,
-                'status': 'closed'
-            }
+            # 日期只在DEBUG日志实际输出时才转换
+            logger.opt(lazy=True).debug(
+                "交易记录: {} -> {}, PnL: {:.2f}, 手续费: {:.2f}",
+                lambda: bt.num2date(trade.dtopen).date(),
+                lambda: bt.num2date(trade.dtclose).date(),
+                lambda: trade.pnlcomm,
+                lambda: trade.commission
+            )
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        按列一次性构建已平仓交易的DataFrame
 
-            self.trades.append(trade_info)
+        Returns:
+            交易记录DataFrame，列与交易记录字典的键相同，日期为'YYYY-MM-DD'字符串
+        """
+        if self._frame is None or len(self._frame) != len(self._pnl):
+            n = len(self._pnl)
+            self._frame = pd.DataFrame({
+                'entry_date': self._format_dates(self._dtopen),
+                'exit_date': self._format_dates(self._dtclose),
+                'entry_price': np.asarray(self._price, dtype=np.float64),
+                'exit_price': np.zeros(n, dtype=np.int64),  # backtrader不直接提供，需要从价格历史计算
+                'size': np.asarray(self._barlen, dtype=np.int64),  # 持仓bar数量
+                'pnl': np.asarray(self._pnl, dtype=np.float64),  # 包含手续费的净盈亏
+                'commission': np.asarray(self._commission, dtype=np.float64),
+                'status': ['closed'] * n
+            })
+        return self._frame
 
-            logger.debug(
-                f"交易记录: {trade_info['entry_date']} -> {trade_info['exit_date']}, "
-                f"PnL: {trade_info['pnl']:.2f}, "
-                f"手续费: {trade_info['commission']:.2f}"
-            )
+    @classmethod
+    def _format_dates(cls, nums) -> List[str]:
+        """
+        批量把backtrader日期数值转换为'YYYY-MM-DD'字符串
+
+        Args:
+            nums: backtrader日期数值序列
+
+        Returns:
+            日期字符串列表
+        """
+        days = np.floor(np.asarray(nums, dtype=np.float64)).astype(np.int64) - cls._EPOCH_ORDINAL
+        return np.datetime_as_string(days.astype('datetime64[D]')).tolist()
 
     def get_analysis(self) -> Dict[str, Any]:
         """
         获取分析结果
 
         Returns:
-            包含所有交易记录的字典
+            包含所有交易记录的字典：
+            {
+                'trades': 交易记录列表,
+                'trades_df': 同样内容的DataFrame（供指标计算直接使用）,
+                'total_trades': 交易次数
+            }
         """
+        trades_df = self.to_dataframe()
+        if len(self.trades) != len(trades_df):
+            self.trades = trades_df.to_dict('records')
+
         return {
             'trades': self.trades,
+            'trades_df': trades_df,
             'total_trades': len(self.trades)
         }
@@ -10,33 +10,55 @@ class ConfigManager:
     _instance = None
     _config: Dict[str, Any] = {}
 
+    # 未命中标记（配置值本身可能为None）
+    _MISSING = object()
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._load_config()
         return cls._instance
 
+    # 有libyaml时使用C实现的解析器，否则退回纯Python实现
+    YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    # 附加配置文件：配置键 -> 文件名
+    SECTION_FILES = {
+        'strategies': 'strategies.yaml',
+        'risk_rules': 'risk_rules.yaml',
+    }
+
     def _load_config(self) -> None:
         """加载所有配置文件"""
+        # 点号键查找结果的缓存，键为完整的点号路径
+        self._get_cache: Dict[str, Any] = {}
+
         config_dir = Path(__file__).parent.parent.parent / 'config'
 
         # 加载主配置
         config_file = config_dir / 'config.yaml'
         if config_file.exists():
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
+            self._config = self._read_yaml(config_file)
+
+        # 加载策略配置、风控规则
+        for key, filename in self.SECTION_FILES.items():
+            section_file = config_dir / filename
+            if section_file.exists():
+                self._config[key] = self._read_yaml(section_file)
+
+    @classmethod
+    def _read_yaml(cls, path: Path) -> Dict[str, Any]:
+        """
+        读取单个YAML文件
 
-        # 加载策略配置
-        strategies_file = config_dir / 'strategies.yaml'
-        if strategies_file.exists():
-            with open(strategies_file, 'r', encoding='utf-8') as f:
-                self._config['strategies'] = yaml.safe_load(f) or {}
+        Args:
+            path: 文件路径
 
-        # 加载风控规则
-        risk_rules_file = config_dir / 'risk_rules.yaml'
-        if risk_rules_file.exists():
-            with open(risk_rules_file, 'r', encoding='utf-8') as f:
-                self._config['risk_rules'] = yaml.safe_load(f) or {}
+        Returns:
+            解析结果，空文件返回空字典
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=cls.YAML_LOADER) or {}
 
     @property
     def config(self) -> Dict[str, Any]:
@@ -54,15 +76,18 @@ class ConfigManager:
         Returns:
             配置值
         """
-        keys = key.split('.')
-        value = self._config
+        value = self._get_cache.get(key, self._MISSING)
+        if value is not self._MISSING:
+            return value
 
-        for k in keys:
+        value = self._config
+        for k in key.split('.'):
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
                 return default
 
+        self._get_cache[key] = value
         return value
 
     def reload(self) -> None:
@@ -1,4 +1,5 @@
 """AKShare数据提供者"""
+import io
 import akshare as ak
 import pandas as pd
 from typing import Optional, Dict, Any, List
@@ -10,6 +11,12 @@ from src.utils.stock_code_helper import strip_market_suffix
 
 logger = get_logger(__name__)
 
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 
 class AKShareProvider:
     """AKShare数据提供者"""
@@ -46,6 +53,60 @@ class AKShareProvider:
             logger.error(f"Failed to fetch stock list: {e}")
             raise
 
+    def _get_cached_frame(self, cache_key: str) -> Optional[pd.DataFrame]:
+        """
+        读取缓存的DataFrame（兼容parquet字节与直接缓存的DataFrame）
+
+        Args:
+            cache_key: 缓存键
+
+        Returns:
+            DataFrame，未命中返回None
+        """
+        cached = self.cache.get(cache_key)
+        if isinstance(cached, bytes):
+            return pd.read_parquet(io.BytesIO(cached))
+        return cached
+
+    def _cache_frame(self, cache_key: str, df: pd.DataFrame, ttl: Optional[int]) -> None:
+        """
+        缓存DataFrame（安装pyarrow时以zstd压缩的parquet字节存储）
+
+        Args:
+            cache_key: 缓存键
+            df: 数据
+            ttl: 过期时间（秒）
+        """
+        value = df
+        if PARQUET_AVAILABLE:
+            try:
+                value = df.to_parquet(engine='pyarrow', compression='zstd')
+            except Exception as e:
+                # 含混合类型列等无法写为parquet时，直接缓存DataFrame
+                logger.debug("Parquet encoding failed for {}, caching DataFrame: {}", cache_key, e)
+        self.cache.set(cache_key, value, ttl=ttl)
+
+    def _get_spot_snapshot(self) -> pd.DataFrame:
+        """
+        获取全市场实时行情快照（按实时行情TTL缓存，多次查询共用）
+
+        Returns:
+            以股票代码为索引的行情DataFrame（保留'代码'列）
+        """
+        cache_key = 'spot_em_full'
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        logger.info("Fetching realtime market snapshot from akshare...")
+        df = ak.stock_zh_a_spot_em()
+        snapshot = df.set_index('代码', drop=False)
+        snapshot = snapshot[~snapshot.index.duplicated()]
+
+        self.cache.set(cache_key, snapshot, ttl=self.cache.get_ttl('realtime'))
+        return snapshot
+
     def get_realtime_quote(self, code: str) -> Dict[str, Any]:
         """
         获取实时行情
@@ -66,17 +127,17 @@ class AKShareProvider:
             return cached
 
         try:
-            logger.info(f"Fetching realtime quote for {code}...")
-            df = ak.stock_zh_a_spot_em()
+            # 逐只查询可能在循环中调用，只在DEBUG级别记录，参数延迟格式化
+            logger.debug("Fetching realtime quote for {}...", code)
+            snapshot = self._get_spot_snapshot()
 
             # 查找指定股票
-            stock_data = df[df['代码'] == code]
-            if stock_data.empty:
+            if code not in snapshot.index:
                 logger.warning(f"Stock {code} not found")
                 return {}
 
             # 转换为字典
-            quote = stock_data.iloc[0].to_dict()
+            quote = snapshot.loc[code].to_dict()
 
             # 缓存
             self.cache.set(cache_key, quote, ttl=ttl)
@@ -105,17 +166,15 @@ class AKShareProvider:
         try:
             logger.info(f"Fetching realtime quotes for {len(codes)} stocks...")
             # 一次性获取全市场数据
-            df = ak.stock_zh_a_spot_em()
+            snapshot = self._get_spot_snapshot()
+
+            # 筛选指定股票（按代码索引做一次哈希匹配，保持请求顺序）
+            requested = pd.Index(codes).unique()
+            in_snapshot = requested.isin(snapshot.index)
+            for code in requested[~in_snapshot]:
+                logger.warning(f"Stock {code} not found in realtime data")
 
-            # 筛选指定股票
-            result = {}
-            for code in codes:
-                stock_data = df[df['代码'] == code]
-                if not stock_data.empty:
-                    quote = stock_data.iloc[0].to_dict()
-                    result[code] = quote
-                else:
-                    logger.warning(f"Stock {code} not found in realtime data")
+            result = snapshot.loc[requested[in_snapshot]].to_dict('index')
 
             logger.info(f"Successfully fetched {len(result)} quotes")
             return result
@@ -155,7 +214,7 @@ class AKShareProvider:
 
         # 尝试从缓存获取
         ttl = self.cache.get_ttl('daily')
-        cached = self.cache.get(cache_key)
+        cached = self._get_cached_frame(cache_key)
         if cached is not None:
             return cached
 
@@ -169,7 +228,7 @@ class AKShareProvider:
             )
 
             # 缓存
-            self.cache.set(cache_key, df, ttl=ttl)
+            self._cache_frame(cache_key, df, ttl)
 
             logger.info(f"Fetched {len(df)} daily records for {code}")
             return df
@@ -192,7 +251,7 @@ class AKShareProvider:
 
         # 尝试从缓存获取
         ttl = self.cache.get_ttl('financial')
-        cached = self.cache.get(cache_key)
+        cached = self._get_cached_frame(cache_key)
         if cached is not None:
             return cached
 
@@ -201,7 +260,7 @@ class AKShareProvider:
             df = ak.stock_financial_analysis_indicator(symbol=code)
 
             # 缓存
-            self.cache.set(cache_key, df, ttl=ttl)
+            self._cache_frame(cache_key, df, ttl)
 
             logger.info(f"Fetched financial data for {code}")
             return df
@@ -224,7 +283,7 @@ class AKShareProvider:
 
         # 尝试从缓存获取
         ttl = self.cache.get_ttl('realtime')
-        cached = self.cache.get(cache_key)
+        cached = self._get_cached_frame(cache_key)
         if cached is not None:
             return cached
 
@@ -233,7 +292,7 @@ class AKShareProvider:
             df = ak.stock_individual_fund_flow(stock=code, market="sh" if code.startswith('6') else "sz")
 
             # 缓存
-            self.cache.set(cache_key, df, ttl=ttl)
+            self._cache_frame(cache_key, df, ttl)
 
             logger.info(f"Fetched money flow data for {code}")
             return df
@@ -0,0 +1,21 @@
+"""Numba JIT装饰器（可选依赖）
+
+安装了 numba 时使用 ``numba.njit`` 与 ``numba.prange``；未安装时退化为不做任何处理的装饰器
+和内置 ``range``，被装饰的函数以纯Python方式运行，行为一致。
+"""
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """numba.njit 的空实现，支持 @njit 与 @njit(cache=True) 两种写法"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
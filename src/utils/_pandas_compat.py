@@ -0,0 +1,32 @@
+"""pandas 版本兼容常量"""
+from typing import Iterable
+
+import pandas as pd
+
+# rename时不复制数据块：pandas>=3 默认写时复制（rename本身即惰性），pandas 2.x 需显式 copy=False
+RENAME_NO_COPY = {} if int(pd.__version__.split('.')[0]) >= 3 else {'copy': False}
+
+
+def ensure_column_major(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """
+    保证指定的数值列在内存中连续存放
+
+    由C顺序二维数组以 copy=False（或 pandas 2.x 默认）构造的DataFrame，
+    每一列在内存中跨步存放，逐列求和/均值会频繁失效缓存。只检查调用方实际读取的列
+    （不存在的列跳过），发现跨步存放时复制一次（DataFrame.copy 按列连续重排），
+    否则原样返回。
+
+    Args:
+        df: 输入DataFrame
+        columns: 需要检查的列名
+
+    Returns:
+        指定数值列连续存放的DataFrame
+    """
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = df[column].to_numpy()
+        if values.dtype.kind in 'fiu' and values.strides[0] != values.itemsize:
+            return df.copy()
+    return df
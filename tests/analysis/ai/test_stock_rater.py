@@ -2,8 +2,10 @@
 import pytest
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from unittest.mock import Mock, patch, MagicMock
-from src.analysis.ai.stock_rater import StockRater
+from src.analysis.ai.stock_rater import AnalysisBundle, StockRater
 
 
 class TestStockRater:
@@ -60,6 +62,22 @@ class TestStockRater:
         assert hasattr(rater, 'money_flow_analyzer')
         assert hasattr(rater, 'deepseek_client')
 
+    @patch('src.analysis.ai.stock_rater.TechnicalIndicators')
+    @patch('src.analysis.ai.stock_rater.FinancialMetrics')
+    @patch('src.analysis.ai.stock_rater.MoneyFlowAnalyzer')
+    @patch('src.analysis.ai.stock_rater.DeepSeekClient')
+    def test_components_shared_between_raters(
+        self, mock_deepseek, mock_money_flow, mock_financial, mock_technical
+    ):
+        """测试多个评级器共享分析器与DeepSeek客户端实例"""
+        first = StockRater()
+        second = StockRater()
+
+        assert first.deepseek_client is second.deepseek_client
+        assert first.technical_indicators is second.technical_indicators
+        assert mock_deepseek.call_count == 1
+        assert mock_technical.call_count == 1
+
     @patch('src.analysis.ai.stock_rater.TechnicalIndicators')
     @patch('src.analysis.ai.stock_rater.FinancialMetrics')
     @patch('src.analysis.ai.stock_rater.MoneyFlowAnalyzer')
@@ -835,3 +853,435 @@ class TestStockRater:
         # 测试None
         with pytest.raises(ValueError, match="Stock code must be a non-empty string"):
             rater.analyze_stock(None, sample_kline_df, sample_financial_df, sample_money_flow_df)
+
+    @patch('src.analysis.ai.stock_rater.TechnicalIndicators')
+    @patch('src.analysis.ai.stock_rater.FinancialMetrics')
+    @patch('src.analysis.ai.stock_rater.MoneyFlowAnalyzer')
+    @patch('src.analysis.ai.stock_rater.DeepSeekClient')
+    def test_analyze_stocks_batch_matches_single(
+        self,
+        mock_deepseek,
+        mock_money_flow,
+        mock_financial,
+        mock_technical,
+        sample_financial_df,
+        sample_money_flow_df
+    ):
+        """测试批量分析结果与逐只分析一致"""
+        mock_technical_instance = Mock()
+        mock_technical.return_value = mock_technical_instance
+        mock_technical_instance.calculate_all.side_effect = lambda df: df
+
+        mock_financial_instance = Mock()
+        mock_financial.return_value = mock_financial_instance
+        mock_financial_instance.get_overall_score.side_effect = [80.0, 30.0, 55.0, 80.0, 30.0, 55.0]
+
+        mock_money_flow_instance = Mock()
+        mock_money_flow.return_value = mock_money_flow_instance
+        mock_money_flow_instance.generate_summary.side_effect = [
+            {'signal': '买入', 'main_force': {'trend': '流入', 'strength': '强'}},
+            {'signal': '卖出', 'main_force': {'trend': '流出', 'strength': '中'}},
+            {'signal': '持有', 'main_force': {'trend': '流入', 'strength': '弱'}},
+        ] * 2
+
+        mock_deepseek.return_value = Mock()
+        mock_deepseek.return_value.analyze_stock.return_value = "分析结果"
+
+        np.random.seed(0)
+        stocks = {}
+        for code in ['600000', '300750', 'ST0001']:
+            n = 30
+            close = 10 + np.cumsum(np.random.randn(n) * 0.2)
+            kline_df = pd.DataFrame({
+                'close': close,
+                'volume': np.random.uniform(1e6, 5e6, n),
+                'MA5': close * np.random.uniform(0.95, 1.05, n),
+                'MA20': close * np.random.uniform(0.95, 1.05, n),
+                'MACD': np.random.randn(n),
+                'MACD_signal': np.random.randn(n),
+                'RSI': np.random.uniform(20, 90, n),
+                'K': np.random.uniform(0, 100, n),
+                'D': np.random.uniform(0, 100, n),
+                'BOLL_UPPER': close * 1.1,
+                'BOLL_MIDDLE': close,
+                'BOLL_LOWER': close * 0.9,
+                'VOL_MA5': np.random.uniform(1e6, 5e6, n),
+                'ATR': close * np.random.uniform(0.01, 0.06, n),
+            })
+            stocks[code] = (kline_df, sample_financial_df, sample_money_flow_df)
+
+        rater = StockRater()
+        batch_results = rater.analyze_stocks_batch(stocks)
+        single_results = {
+            code: rater.analyze_stock(code, *data) for code, data in stocks.items()
+        }
+
+        assert list(batch_results.keys()) == list(stocks.keys())
+        for code in stocks:
+            batch, single = batch_results[code], single_results[code]
+            assert batch['rating'] == single['rating']
+            assert batch['confidence'] == pytest.approx(single['confidence'])
+            assert batch['target_price'] == pytest.approx(single['target_price'])
+            assert batch['stop_loss'] == pytest.approx(single['stop_loss'])
+            assert batch['scores'] == pytest.approx(single['scores'])
+            assert batch['a_share_risks'] == single['a_share_risks']
+
+    @patch('src.analysis.ai.stock_rater.ProcessPoolExecutor', ThreadPoolExecutor)
+    @patch('src.analysis.ai.stock_rater.TechnicalIndicators')
+    @patch('src.analysis.ai.stock_rater.FinancialMetrics')
+    @patch('src.analysis.ai.stock_rater.MoneyFlowAnalyzer')
+    @patch('src.analysis.ai.stock_rater.DeepSeekClient')
+    def test_analyze_batch_pool(
+        self,
+        mock_deepseek,
+        mock_money_flow,
+        mock_financial,
+        mock_technical,
+        sample_kline_df,
+        sample_financial_df,
+        sample_money_flow_df
+    ):
+        """测试进程池批量分析（以线程池替代以便共享mock）"""
+        mock_technical.return_value.calculate_all.side_effect = lambda df: df
+        mock_financial.return_value.get_overall_score.return_value = 75.0
+        mock_money_flow.return_value.generate_summary.return_value = {
+            'signal': '买入',
+            'main_force': {'trend': '流入', 'strength': '强'}
+        }
+
+        tickers_data = {
+            '600000': (sample_kline_df, sample_financial_df, sample_money_flow_df),
+            '000001': (sample_kline_df, sample_financial_df, sample_money_flow_df),
+            'BAD': (sample_kline_df.iloc[:1], sample_financial_df, sample_money_flow_df),
+        }
+        results = StockRater.analyze_batch(tickers_data, max_workers=2)
+
+        # 无效数据的股票被跳过，其余正常返回
+        assert set(results.keys()) == {'600000', '000001'}
+        for result in results.values():
+            assert result['rating'] in ['buy', 'hold', 'sell']
+            assert '综合评分' in result['ai_insights']
+        # 默认不调用DeepSeek
+        mock_deepseek.return_value.analyze_stock.assert_not_called()
+
+    def test_analyze_stocks_batch_empty(self, rater):
+        """测试空批量输入"""
+        assert rater.analyze_stocks_batch({}) == {}
+
+    def test_dimension_analyses_run_in_pool(
+        self, rater, sample_kline_df, sample_financial_df, sample_money_flow_df
+    ):
+        """测试技术面/基本面/资金面在线程池中并行执行，异常正常抛出"""
+        import threading
+        thread_names = []
+
+        def record(result):
+            def inner(*args):
+                thread_names.append(threading.current_thread().name)
+                return result
+            return inner
+
+        rater._analyze_technical = record(70.0)
+        rater._analyze_fundamental = record(65.0)
+        rater._analyze_capital = record((60.0, '买入'))
+
+        result = rater.analyze_stock(
+            '000001', sample_kline_df, sample_financial_df, sample_money_flow_df,
+            include_ai_insights=False
+        )
+
+        assert result['scores']['technical'] == 70.0
+        assert result['scores']['capital'] == 60.0
+        assert len(thread_names) == 3
+        assert all(name.startswith('stock-rater') for name in thread_names)
+
+        rater._analyze_fundamental = Mock(side_effect=RuntimeError('boom'))
+        with pytest.raises(RuntimeError, match='boom'):
+            rater.analyze_stock(
+                '000001', sample_kline_df, sample_financial_df, sample_money_flow_df,
+                include_ai_insights=False
+            )
+
+    def test_ai_insights_timeout_falls_back(
+        self, rater, sample_kline_df, sample_financial_df, sample_money_flow_df
+    ):
+        """测试AI洞察超时时回退到本地默认洞察"""
+        import time
+
+        def slow_analyze(*args, **kwargs):
+            time.sleep(0.5)
+            return 'AI分析'
+
+        rater._analyze_technical = Mock(return_value=70.0)
+        rater._analyze_fundamental = Mock(return_value=65.0)
+        rater._analyze_capital = Mock(return_value=(60.0, '买入'))
+        rater.deepseek_client.analyze_stock = Mock(side_effect=slow_analyze)
+        rater.AI_INSIGHTS_TIMEOUT = 0.05
+
+        result = rater.analyze_stock(
+            '000001', sample_kline_df, sample_financial_df, sample_money_flow_df
+        )
+
+        assert result['ai_insights'] != 'AI分析'
+        assert '综合评分' in result['ai_insights']
+
+    def test_ai_insights_skipped_below_min_confidence(
+        self, rater, sample_kline_df, sample_financial_df, sample_money_flow_df
+    ):
+        """测试信心度低于阈值时跳过AI洞察"""
+        rater._analyze_technical = Mock(return_value=70.0)
+        rater._analyze_fundamental = Mock(return_value=65.0)
+        rater._analyze_capital = Mock(return_value=(60.0, '买入'))
+        rater.deepseek_client.analyze_stock = Mock(return_value='AI分析')
+
+        rater.ai_min_confidence = 11.0
+        result = rater.analyze_stock(
+            '000001', sample_kline_df, sample_financial_df, sample_money_flow_df
+        )
+        assert '综合评分' in result['ai_insights']
+        rater.deepseek_client.analyze_stock.assert_not_called()
+
+        rater.ai_min_confidence = 0.0
+        result = rater.analyze_stock(
+            '000001', sample_kline_df, sample_financial_df, sample_money_flow_df
+        )
+        assert result['ai_insights'] == 'AI分析'
+
+    def test_sentiment_batch(self, rater):
+        """测试批量情绪面评分与单只计算一致"""
+        signals = ['买入', '卖出', '观望', '买入']
+        scores = [60.0, 40.0, 50.0, 95.0]
+
+        batch = rater.sentiment_batch(signals, scores)
+
+        for signal, score, value in zip(signals, scores, batch):
+            assert value == pytest.approx(rater._analyze_sentiment(signal, score))
+        assert batch[3] == 100.0
+
+    def test_weighted_scores_batch(self, rater):
+        """测试批量加权分数与单只计算一致"""
+        scores = np.array([[80.0, 70.0, 60.0, 66.0], [30.0, 45.0, 20.0, 18.0]])
+        overall = rater.weighted_scores_batch(scores)
+
+        for row, value in zip(scores, overall):
+            assert value == pytest.approx(rater._calculate_weighted_score(*row))
+
+        with pytest.raises(ValueError):
+            rater.weighted_scores_batch(np.zeros((2, 3)))
+
+    def test_rating_lookup_boundaries(self, rater):
+        """测试评级查找表在阈值边界上的结果"""
+        assert rater._determine_rating(rater.RATING_BUY_THRESHOLD) == 'buy'
+        assert rater._determine_rating(rater.RATING_BUY_THRESHOLD - 0.01) == 'hold'
+        assert rater._determine_rating(rater.RATING_HOLD_THRESHOLD) == 'hold'
+        assert rater._determine_rating(rater.RATING_HOLD_THRESHOLD - 0.01) == 'sell'
+
+        assert rater._score_to_rating(rater.SCORE_EXCELLENT) == '优秀'
+        assert rater._score_to_rating(rater.SCORE_GOOD) == '良好'
+        assert rater._score_to_rating(rater.SCORE_FAIR) == '一般'
+        assert rater._score_to_rating(rater.SCORE_FAIR - 0.01) == '差'
+
+    def test_target_and_stop_loss_tables(self, rater):
+        """测试目标价/止损价系数表与分段公式一致"""
+        buy = rater._finalize_by_rating('buy', 80.0, 10.0, 80.0, 80.0, 80.0, '买入')
+        hold = rater._finalize_by_rating('hold', 55.0, 10.0, 55.0, 55.0, 55.0, '观望')
+        sell = rater._finalize_by_rating('sell', 35.0, 10.0, 35.0, 35.0, 35.0, '卖出')
+
+        assert buy[0] == pytest.approx(10.0 * (1 + 0.05 + 0.10 * 0.20))
+        assert hold[0] == pytest.approx(10.0 * 1.03)
+        assert sell[0] == pytest.approx(10.0 * (1 - 0.05 - 0.10 * 0.15))
+
+        assert buy[1] == pytest.approx(10.0 * (1 - 0.05 - 0.20 * 0.10))
+        assert hold[1] == pytest.approx(10.0 * 0.93)
+        assert sell[1] == pytest.approx(10.0 * 0.98)
+
+    def test_finalize_reasons_and_risks(self, rater):
+        """测试按评级生成的原因和风险"""
+        _, _, reasons, risks = rater._finalize_by_rating('buy', 72.0, 10.0, 80.0, 80.0, 80.0, '买入')
+        assert reasons == [
+            '技术面呈现强势上涨趋势', '基本面良好，财务指标健康',
+            '主力资金持续流入，市场情绪积极', '资金流向信号显示买入机会'
+        ]
+        assert risks == ['市场整体波动可能影响个股表现', '部分指标存在分歧，需密切关注', '政策和宏观环境变化风险']
+
+        _, _, reasons, risks = rater._finalize_by_rating('sell', 38.0, 10.0, 50.0, 50.0, 50.0, '观望')
+        assert reasons == ['综合分析建议当前操作']
+        assert risks[-1] == '政策和宏观环境变化风险'
+        assert len(risks) == 3
+
+    def test_nan_check_limited_to_recent_window(self, rater):
+        """测试NaN校验只检查最近窗口内的收盘价"""
+        close = np.linspace(10.0, 12.0, 60)
+        close[0] = np.nan
+        kline_df = pd.DataFrame({'close': close})
+        financial_df = pd.DataFrame({'roe': [15.5]})
+        money_flow_df = pd.DataFrame({'main_net_inflow': [1000000]})
+
+        # 早期NaN不影响评分窗口，不应报错
+        rater._validate_inputs("000001", kline_df, financial_df, money_flow_df)
+
+        close[-rater.KLINE_NAN_CHECK_WINDOW] = np.nan
+        with pytest.raises(ValueError, match="contains NaN values"):
+            rater._validate_inputs("000001", pd.DataFrame({'close': close}), financial_df, money_flow_df)
+
+    def test_board_prefix_risks(self, rater):
+        """测试ST/科创板/创业板代码前缀风险识别"""
+        st_risk = 'ST股票退市风险较高，投资需谨慎'
+        board_risk = '科创板/创业板涨跌幅限制为20%，波动较大'
+
+        assert st_risk in rater._assess_a_share_risks('*ST0001', 10.0, 10.0, 'hold')
+        assert st_risk in rater._assess_a_share_risks('S*ST0001', 10.0, 10.0, 'hold')
+        assert st_risk not in rater._assess_a_share_risks('600000', 10.0, 10.0, 'hold')
+        assert board_risk in rater._assess_a_share_risks('688001', 10.0, 10.0, 'hold')
+        assert board_risk in rater._assess_a_share_risks('300750', 10.0, 10.0, 'hold')
+        assert board_risk not in rater._assess_a_share_risks('000001', 10.0, 10.0, 'hold')
+
+    def test_ai_insights_cache(self, rater):
+        """测试AI洞察按分数区间缓存，避免重复调用DeepSeek"""
+        rater.deepseek_client.analyze_stock.return_value = "AI分析"
+        analysis_data = AnalysisBundle(
+            current_price=10.0,
+            technical_score=72.0,
+            fundamental_score=65.0,
+            capital_score=80.0,
+            capital_signal='买入',
+            sentiment_score=85.0,
+            overall_score=73.4,
+            rating='buy',
+            confidence=7.8
+        )
+
+        assert rater._generate_ai_insights('000001', analysis_data) == "AI分析"
+        # 同一分数区间内的轻微变化命中缓存
+        assert rater._generate_ai_insights('000001', replace(analysis_data, technical_score=74.0)) == "AI分析"
+        assert rater.deepseek_client.analyze_stock.call_count == 1
+
+        # 不同股票不共享缓存
+        rater._generate_ai_insights('600000', analysis_data)
+        assert rater.deepseek_client.analyze_stock.call_count == 2
+
+    def test_ai_insights_cache_eviction(self, rater):
+        """测试AI洞察缓存超出容量时淘汰最久未使用条目"""
+        rater.AI_INSIGHTS_CACHE_SIZE = 2
+        rater._put_cached_insights(('a',), 'A')
+        rater._put_cached_insights(('b',), 'B')
+        assert rater._get_cached_insights(('a',)) == 'A'
+        rater._put_cached_insights(('c',), 'C')
+
+        assert rater._get_cached_insights(('b',)) is None
+        assert rater._get_cached_insights(('a',)) == 'A'
+        assert rater._get_cached_insights(('c',)) == 'C'
+
+    def test_non_str_stock_code_rejected(self, rater, sample_kline_df, sample_financial_df, sample_money_flow_df):
+        """测试非字符串股票代码被拒绝"""
+        with pytest.raises(ValueError, match="Stock code must be a non-empty string"):
+            rater.analyze_stock(600000, sample_kline_df, sample_financial_df, sample_money_flow_df)
+
+    def test_standardize_columns_does_not_mutate_input(self, rater, sample_kline_df):
+        """测试列名标准化不修改输入，且英文列名时直接返回原对象"""
+        original_columns = list(sample_kline_df.columns)
+        standardized = rater._standardize_dataframe_columns(sample_kline_df, 'kline')
+
+        assert list(sample_kline_df.columns) == original_columns
+        assert 'close' in standardized.columns
+        assert rater._standardize_dataframe_columns(standardized, 'kline') is standardized
+
+    def test_technical_rules_skip_missing_indicators(self, rater):
+        """测试技术面规则表只对所需列齐全的指标评分"""
+        kline_df = pd.DataFrame({
+            'close': [10.0, 10.5],
+            'RSI': [50.0, 55.0],          # 健康区间 -> 100
+            'ATR': [0.8, 0.8],            # ATR/close≈7.6% -> 0
+            'BOLL_UPPER': [11.0, 11.0],   # 缺少BOLL_MIDDLE，不参与评分
+            'BOLL_LOWER': [9.0, 9.0],
+        })
+        rater.technical_indicators.calculate_all.side_effect = lambda df: df
+
+        assert rater._analyze_technical('000001', kline_df, kline_df['close'].to_numpy()) == pytest.approx(50.0)
+
+    def test_price_limit_risk(self, rater):
+        """测试涨跌幅风险只依赖最新两日收盘价"""
+        limit_risk = '涨跌幅较大，需警惕涨跌停板限制'
+
+        assert limit_risk in rater._assess_a_share_risks('600000', 11.0, 10.0, 'hold')
+        assert limit_risk in rater._assess_a_share_risks('600000', 9.0, 10.0, 'hold')
+        assert limit_risk not in rater._assess_a_share_risks('600000', 10.5, 10.0, 'hold')
+        # 前收盘价为0时不计算涨跌幅
+        assert limit_risk not in rater._assess_a_share_risks('600000', 10.0, 0.0, 'hold')
+
+    def test_indicator_cache_reuses_calculation(self, rater, sample_kline_df):
+        """测试相同K线重复分析时复用技术指标计算结果"""
+        rater.technical_indicators.calculate_all.side_effect = lambda df: df
+        kline_df = rater._standardize_dataframe_columns(sample_kline_df, 'kline')
+
+        first = rater._calculate_indicators('000001', kline_df)
+        second = rater._calculate_indicators('000001', kline_df.copy())
+        assert second is first
+        assert rater.technical_indicators.calculate_all.call_count == 1
+
+        # 新增一根K线或换股票后重新计算
+        extended = pd.concat([kline_df, kline_df.iloc[[-1]]], ignore_index=True)
+        rater._calculate_indicators('000001', extended)
+        rater._calculate_indicators('600000', kline_df)
+        assert rater.technical_indicators.calculate_all.call_count == 3
+
+    def test_score_technical_batch(self, rater):
+        """测试按行批量计算技术面分数与逐只计算一致"""
+        latest = pd.DataFrame({
+            'close': [10.5, 9.0, 12.0],
+            'MA5': [10.2, 9.5, 11.0],
+            'MA20': [10.0, 10.0, 11.5],
+            'MACD': [0.2, -0.1, 0.1],
+            'MACD_signal': [0.1, 0.0, 0.2],
+            'RSI': [55.0, 25.0, 75.0],
+            'K': [60.0, 20.0, 85.0],
+            'D': [50.0, 30.0, 80.0],
+            'BOLL_UPPER': [11.0, 10.5, 11.8],
+            'BOLL_MIDDLE': [10.6, 9.8, 11.0],
+            'BOLL_LOWER': [10.0, 9.1, 10.2],
+            'volume': [1.5e6, 0.8e6, 1.1e6],
+            'VOL_MA5': [1.0e6, 1.0e6, 1.0e6],
+            'ATR': [0.2, 0.4, 0.9],
+        }, index=['600000', '000001', '300750'])
+        rater.technical_indicators.calculate_all.side_effect = lambda df: df
+
+        scores = rater.score_technical_batch(latest)
+
+        assert list(scores.index) == list(latest.index)
+        for code in latest.index:
+            row = latest.loc[[code]]
+            expected = rater._analyze_technical(code, pd.concat([row, row]), row['close'].to_numpy())
+            assert scores[code] == pytest.approx(expected)
+
+    def test_technical_nan_indicator_excluded(self, rater):
+        """测试尚未形成（NaN）的指标不参与技术面评分"""
+        kline_df = pd.DataFrame({
+            'close': [10.0, 10.5],
+            'RSI': [50.0, 55.0],          # 健康区间 -> 100
+            'MA5': [np.nan, np.nan],      # 数据不足，MA尚未形成
+            'MA20': [np.nan, np.nan],
+        })
+        rater.technical_indicators.calculate_all.side_effect = lambda df: df
+
+        assert rater._analyze_technical('000001', kline_df, kline_df['close'].to_numpy()) == pytest.approx(100.0)
+
+    def test_simple_trend_fallback(self, rater):
+        """测试无技术指标时基于收盘价尾部的趋势兜底"""
+        rater.technical_indicators.calculate_all.side_effect = lambda df: df
+        rising = pd.DataFrame({'close': [10.0, 10.2, 10.4, 10.6, 11.0]})
+        falling = pd.DataFrame({'close': [10.0, 9.8, 9.6, 9.4, 9.0]})
+        short = pd.DataFrame({'close': [10.0, 11.0]})
+
+        assert rater._analyze_technical('A', rising, rising['close'].to_numpy()) == 75.0
+        assert rater._analyze_technical('B', falling, falling['close'].to_numpy()) == 30.0
+        assert rater._analyze_technical('C', short, short['close'].to_numpy()) == 50.0
+
+        tails = [
+            np.array([10.0, 10.2, 10.4, 10.6, 11.0]),
+            np.array([10.0, 10.0, 10.0, 10.0, 10.1]),
+            np.array([10.0, 10.0, 10.0, 10.0, 9.9]),
+            np.array([10.0, 9.8, 9.6, 9.4, 9.0]),
+            np.array([10.0, 11.0]),
+        ]
+        expected = [rater._simple_trend_score(tail) for tail in tails]
+        assert rater._simple_trend_score_batch(tails).tolist() == expected
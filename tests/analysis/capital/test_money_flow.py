@@ -2,7 +2,9 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.analysis.capital.money_flow import MoneyFlowAnalyzer
+from src.analysis.capital.money_flow import (
+    MoneyFlowAnalyzer, _money_flow_stats_kernel, _money_flow_stats_numpy, batch_generate_summary
+)
 
 
 class TestMoneyFlowAnalyzer:
@@ -146,3 +148,123 @@ class TestMoneyFlowAnalyzer:
         assert result['window_days'] == 3
         assert isinstance(result['continuous_inflow_days'], int)
         assert isinstance(result['continuous_outflow_days'], int)
+
+    def test_continuous_flow_streak(self, analyzer):
+        """测试连续流入/流出天数只统计最新一段同向天数"""
+        df = pd.DataFrame({
+            '主力净流入': [-100, 200, -50, 300, 400, 500],
+            '成交量': [1000] * 6
+        })
+        result = analyzer.analyze_money_flow_trend(df, window=6)
+        assert result['continuous_inflow_days'] == 3
+        assert result['continuous_outflow_days'] == 0
+        assert result['trend'] == '持续流入'
+
+        df['主力净流入'] = [100, 0, -10, -20, -30, -40]
+        result = analyzer.analyze_money_flow_trend(df, window=6)
+        assert result['continuous_inflow_days'] == 0
+        assert result['continuous_outflow_days'] == 4
+        assert result['trend'] == '持续流出'
+
+        df['主力净流入'] = [100, 200, 300, 400, 500, 0]
+        result = analyzer.analyze_money_flow_trend(df, window=6)
+        assert result['continuous_inflow_days'] == 0
+        assert result['continuous_outflow_days'] == 0
+
+        df['主力净流入'] = [10, 20, 30, 40, 50, 60]
+        result = analyzer.analyze_money_flow_trend(df, window=3)
+        assert result['continuous_inflow_days'] == 3
+
+    def test_summary_signal_matches_get_money_flow_signal(self, analyzer, sample_money_flow_data):
+        """测试摘要中的信号与单独计算的信号一致"""
+        summary = analyzer.generate_summary(sample_money_flow_data)
+        assert summary['signal'] == analyzer.get_money_flow_signal(sample_money_flow_data)
+
+        main_force = summary['main_force']
+        flow = sample_money_flow_data['主力净流入']
+        assert main_force['total_inflow'] == pytest.approx(flow[flow > 0].sum())
+        assert main_force['net_inflow'] == pytest.approx(flow.sum())
+
+    def test_analyze_main_force_integer_and_nan(self, analyzer):
+        """测试整数列与含NaN列的主力资金统计"""
+        df = pd.DataFrame({'主力净流入': [100, -40, 0, 60]})
+        result = analyzer.analyze_main_force(df)
+        assert result['total_inflow'] == 160.0
+        assert result['total_outflow'] == 40.0
+        assert result['net_inflow'] == 120.0
+        assert (result['inflow_days'], result['outflow_days']) == (2, 1)
+
+        df = pd.DataFrame({'主力净流入': [100.0, np.nan, -40.0]})
+        result = analyzer.analyze_main_force(df)
+        assert result['net_inflow'] == 60.0
+        assert (result['inflow_days'], result['outflow_days']) == (1, 1)
+
+    def test_money_flow_stats_kernel(self, analyzer, sample_money_flow_data):
+        """测试统计内核与各分析方法结果一致"""
+        flow = sample_money_flow_data['主力净流入'].to_numpy(dtype=np.float64)
+        stats = _money_flow_stats_kernel(flow, 5)
+
+        main_force = analyzer.analyze_main_force(sample_money_flow_data)
+        trend = analyzer.analyze_money_flow_trend(sample_money_flow_data, window=5)
+        assert stats[0] == pytest.approx(main_force['total_inflow'])
+        assert stats[1] == pytest.approx(main_force['total_outflow'])
+        assert stats[2] == pytest.approx(main_force['net_inflow'])
+        assert stats[3:5] == (main_force['inflow_days'], main_force['outflow_days'])
+        assert stats[5:7] == (trend['continuous_inflow_days'], trend['continuous_outflow_days'])
+        assert stats[7] == pytest.approx(trend['net_inflow_sum'])
+
+        stats = _money_flow_stats_kernel(np.array([5.0, -1.0, np.nan, 2.0, 3.0]), 3)
+        assert stats[5:] == (2, 0, 5.0)
+
+    @pytest.mark.parametrize('flow, window', [
+        ([5.0, -1.0, np.nan, 2.0, 3.0], 3),
+        ([5.0, -1.0, -2.0, -3.0], 5),
+        ([1.0, 2.0, 0.0], 2),
+        ([1.0, -2.0, 3.0], 0),
+        ([np.nan, np.nan], 2),
+    ])
+    def test_money_flow_stats_numpy_matches_kernel(self, flow, window):
+        """测试NumPy实现与统计内核结果一致"""
+        flow = np.array(flow)
+        assert _money_flow_stats_numpy(flow, window) == pytest.approx(_money_flow_stats_kernel(flow, window))
+
+    def test_analyze_volume_trend_skips_nan(self, analyzer):
+        """测试成交量均值忽略NaN"""
+        df = pd.DataFrame({
+            '成交量': [100.0, np.nan, 100.0, 100.0, 100.0, 100.0, 250.0],
+            '主力净流入': [1.0, 2.0, np.nan, 3.0, 4.0, 5.0, 6.0]
+        })
+        result = analyzer.analyze_volume_trend(df)
+        assert result['avg_volume'] == pytest.approx(df['成交量'].mean())
+        assert result['volume_ratio'] == pytest.approx(250.0 / df['成交量'].mean())
+        assert result['trend'] == '放量'
+        assert result['price_volume_match'] == '良好'
+
+    def test_batch_generate_summary(self, analyzer, sample_money_flow_data):
+        """测试批量生成摘要，失败的股票被跳过"""
+        dfs = {
+            '000001': sample_money_flow_data,
+            '600000': sample_money_flow_data.iloc[::-1].reset_index(drop=True),
+            '300750': pd.DataFrame()
+        }
+        results = batch_generate_summary(dfs, max_workers=2)
+
+        assert set(results) == {'000001', '600000'}
+        assert results['000001'] == analyzer.generate_summary(dfs['000001'])
+        assert results['600000'] == analyzer.generate_summary(dfs['600000'])
+
+    def test_batch_continuous_streaks(self, analyzer):
+        """测试批量连续天数与逐只计算一致"""
+        flows = np.array([
+            [-1.0, 2.0, 3.0, 4.0, 5.0],
+            [1.0, 2.0, -3.0, -4.0, -5.0],
+            [1.0, 2.0, 3.0, 4.0, 0.0],
+            [1.0, 2.0, np.nan, 4.0, 5.0],
+            [-1.0, -2.0, -3.0, -4.0, -5.0],
+        ])
+        inflow, outflow = MoneyFlowAnalyzer.batch_continuous_streaks(flows)
+
+        for i, row in enumerate(flows):
+            result = analyzer.analyze_money_flow_trend(pd.DataFrame({'主力净流入': row}), window=5)
+            assert inflow[i] == result['continuous_inflow_days']
+            assert outflow[i] == result['continuous_outflow_days']
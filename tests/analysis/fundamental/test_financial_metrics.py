@@ -1,6 +1,7 @@
 """财务指标分析测试"""
 import pytest
 import pandas as pd
+import numpy as np
 from src.analysis.fundamental.financial_metrics import FinancialMetrics
 
 
@@ -188,3 +189,52 @@ class TestFinancialMetrics:
         growth = metrics.analyze_growth(single_row_df)
         assert isinstance(growth, dict)
         assert growth['revenue_growth'] == 0 or 'revenue_growth' not in growth
+
+    def test_trailing_nan_values(self, metrics, sample_financial_data):
+        """测试末期缺失时取最近有效值，净利率取两列同时有效的最近一期"""
+        df = sample_financial_data.astype(float)
+        df.loc[2, ['净资产收益率', '营业收入']] = np.nan
+
+        profitability = metrics.analyze_profitability(df)
+        assert profitability['roe_latest'] == 16.2
+        assert profitability['roe_avg'] == pytest.approx((15.5 + 16.2) / 2)
+        assert profitability['net_margin_latest'] == 15.0
+
+        growth = metrics.analyze_growth(df)
+        assert growth['revenue_growth'] == 20.0
+        assert growth['profit_growth'] == 10.0
+
+        df['市盈率'] = np.nan
+        valuation = metrics.analyze_valuation(df)
+        assert valuation['pe_avg'] == 0
+        assert valuation['pe_latest'] == 0
+
+    def test_weighted_score(self, metrics, sample_financial_data):
+        """测试综合评分按评级加权计算，且摘要与单独计算结果一致"""
+        results = [{'rating': '优秀'}, {'rating': '良好'}, {'rating': '一般'}, {'rating': '未知'}]
+        assert metrics._weighted_score(*results) == round(90 * 0.30 + 75 * 0.30 + 55 * 0.25 + 50 * 0.15, 2)
+
+        summary = metrics.generate_summary(sample_financial_data)
+        assert summary['overall_score'] == metrics.get_overall_score(sample_financial_data)
+
+    def test_batch_rating_matches_scalar(self, metrics):
+        """测试批量评级与逐个评级结果一致"""
+        values = np.array([-10, 0, 4.99, 5, 15, 29.9, 30, 39.9, 40, 59, 60, 74.99, 75, 100, np.nan])
+
+        expected = [metrics._score_to_rating(v) for v in values]
+        assert metrics.score_to_rating_batch(values).tolist() == expected
+
+        expected = [metrics._rate_growth(v) for v in values]
+        assert metrics.rate_growth_batch(values).tolist() == expected
+
+    def test_overall_score_batch(self, metrics):
+        """测试批量综合评分与逐只计算一致"""
+        ratings = [
+            ('优秀', '良好', '一般', '差'),
+            ('差', '差', '优秀', '良好'),
+            ('良好', '良好', '良好', '良好'),
+        ]
+        dimension_scores = np.array([[metrics.RATING_SCORES[r] for r in row] for row in ratings])
+        expected = [metrics._weighted_score(*({'rating': r} for r in row)) for row in ratings]
+
+        np.testing.assert_allclose(metrics.overall_score_batch(dimension_scores), expected)
@@ -1,7 +1,9 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.analysis.technical.indicators import TechnicalIndicators
+from src.analysis.technical.indicators import (
+    TechnicalIndicators, TechnicalIndicatorsStream, _rolling_mean_std_kernel
+)
 
 
 class TestTechnicalIndicators:
@@ -76,3 +78,119 @@ class TestTechnicalIndicators:
         assert 'RSI' in result.columns
         assert 'K' in result.columns
         assert 'BOLL_UPPER' in result.columns
+
+    def test_matches_ta_reference(self, sample_df):
+        """测试与ta库的计算结果一致"""
+        ta = pytest.importorskip('ta')
+
+        result = TechnicalIndicators().calculate_all(sample_df)
+        close, high, low = sample_df['收盘'], sample_df['最高'], sample_df['最低']
+        macd = ta.trend.MACD(close, window_slow=26, window_fast=12, window_sign=9)
+        kdj = ta.momentum.StochasticOscillator(high, low, close, window=9, smooth_window=3)
+        boll = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+        expected = {
+            'MA20': ta.trend.SMAIndicator(close, window=20).sma_indicator(),
+            'MACD': macd.macd(),
+            'MACD_signal': macd.macd_signal(),
+            'MACD_hist': macd.macd_diff(),
+            'RSI': ta.momentum.RSIIndicator(close, window=14).rsi(),
+            'K': kdj.stoch(),
+            'D': kdj.stoch_signal(),
+            'BOLL_UPPER': boll.bollinger_hband(),
+            'BOLL_MIDDLE': boll.bollinger_mavg(),
+            'BOLL_LOWER': boll.bollinger_lband(),
+            'ATR': ta.volatility.AverageTrueRange(high, low, close, window=14).average_true_range(),
+        }
+        for column, series in expected.items():
+            np.testing.assert_allclose(result[column].to_numpy(), series.to_numpy(), rtol=1e-9, err_msg=column)
+
+    def test_calculate_atr_short_data(self, sample_df):
+        """测试数据不足ATR周期时结果为NaN"""
+        result = TechnicalIndicators().calculate_atr(sample_df.head(5), period=14)
+        assert result['ATR'].isna().all()
+
+    def test_calculate_all_does_not_mutate_input(self, sample_df):
+        """测试计算指标不修改调用方的DataFrame"""
+        original = sample_df.copy()
+        result = TechnicalIndicators().calculate_all(sample_df)
+
+        pd.testing.assert_frame_equal(sample_df, original)
+        assert 'close' in result.columns
+        assert 'MA5' not in sample_df.columns
+
+    def test_stream_matches_batch(self, sample_df):
+        """测试增量计算结果与批量计算一致"""
+        indicators = TechnicalIndicators()
+        batch = indicators.calculate_all(sample_df)
+        stream = indicators.create_stream()
+        assert isinstance(stream, TechnicalIndicatorsStream)
+
+        rows = [
+            stream.update(high, low, close, volume)
+            for high, low, close, volume in zip(
+                sample_df['最高'], sample_df['最低'], sample_df['收盘'], sample_df['成交量']
+            )
+        ]
+        streamed = pd.DataFrame(rows)
+
+        atr_period = indicators.config['ATR']
+        assert streamed['ATR'].iloc[:atr_period - 1].isna().all()
+        np.testing.assert_allclose(
+            streamed['ATR'].iloc[atr_period - 1:], batch['ATR'].iloc[atr_period - 1:]
+        )
+        for column in streamed.columns.drop('ATR'):
+            np.testing.assert_allclose(streamed[column], batch[column], rtol=1e-9, err_msg=column)
+
+        # 长序列、高股价、低波动：布林带宽度不应因增量累计而出现精度漂移
+        rng = np.random.default_rng(0)
+        close = 1800 + np.cumsum(rng.normal(0, 0.01, 20000))
+        batch = indicators.calculate_boll(pd.DataFrame({'收盘': close}))
+        stream = indicators.create_stream()
+        streamed = pd.DataFrame([stream.update(price, price, price, 1.0) for price in close])
+
+        n = stream.boll_n
+        np.testing.assert_allclose(
+            (streamed['BOLL_UPPER'] - streamed['BOLL_MIDDLE']).iloc[n - 1:],
+            (batch['BOLL_UPPER'] - batch['BOLL_MIDDLE']).iloc[n - 1:],
+            rtol=1e-5
+        )
+        np.testing.assert_allclose(streamed['BOLL_MIDDLE'].iloc[n - 1:], batch['BOLL_MIDDLE'].iloc[n - 1:], rtol=1e-12)
+
+    def test_calculate_boll_with_gaps(self, sample_df):
+        """测试布林带在含NaN的数据上与pandas滚动计算一致"""
+        sample_df.loc[[3, 40, 41], '收盘'] = np.nan
+        result = TechnicalIndicators().calculate_boll(sample_df, n=20, std=2)
+
+        rolling = sample_df['收盘'].rolling(20, min_periods=20)
+        middle = rolling.mean()
+        band = 2 * rolling.std(ddof=0)
+        np.testing.assert_allclose(result['BOLL_MIDDLE'], middle, rtol=1e-9)
+        np.testing.assert_allclose(result['BOLL_UPPER'], middle + band, rtol=1e-9)
+        np.testing.assert_allclose(result['BOLL_LOWER'], middle - band, rtol=1e-9)
+        assert result['BOLL_MIDDLE'].iloc[41:61].isna().all()
+        assert result['BOLL_MIDDLE'].iloc[61:].notna().all()
+
+    def test_calculate_ma_with_gaps(self, sample_df):
+        """测试均线在含NaN及数据不足时与pandas滚动均值一致"""
+        sample_df.loc[[10, 50], '收盘'] = np.nan
+        indicators = TechnicalIndicators()
+        result = indicators.calculate_ma(sample_df, periods=[5, 20, 150])
+
+        for period in (5, 20, 150):
+            expected = sample_df['收盘'].rolling(period, min_periods=period).mean()
+            np.testing.assert_allclose(result[f'MA{period}'], expected, rtol=1e-9)
+
+        result = indicators.calculate_volume_ma(sample_df, periods=[5, 10])
+        expected = sample_df['成交量'].rolling(10, min_periods=10).mean()
+        np.testing.assert_allclose(result['VOL_MA10'], expected, rtol=1e-9)
+
+    def test_rolling_mean_std_kernel(self, sample_df):
+        """测试滚动均值/标准差内核与pandas滚动计算一致（不论是否安装numba）"""
+        close = sample_df['收盘'].copy()
+        close.iloc[[3, 40, 41]] = np.nan
+
+        means, stds = _rolling_mean_std_kernel(close.to_numpy(dtype=np.float64), 20)
+
+        rolling = close.rolling(20, min_periods=20)
+        np.testing.assert_allclose(means, rolling.mean(), rtol=1e-9)
+        np.testing.assert_allclose(stds, rolling.std(ddof=0), rtol=1e-9)
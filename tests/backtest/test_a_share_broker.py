@@ -1,11 +1,12 @@
 """A股Broker测试"""
 import pytest
 import backtrader as bt
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from unittest.mock import Mock, MagicMock, patch
 
-from src.backtest.a_share_broker import AShareBroker
+from src.backtest.a_share_broker import AShareBroker, AShareCommissionInfo
 from src.core.constants import (
     MAIN_BOARD_LIMIT,
     STAR_MARKET_LIMIT,
@@ -244,6 +245,39 @@ class TestSellRestrictions:
             assert result is not None
 
 
+class TestPrecomputedLimitPrices:
+    """测试按收盘价序列预计算的涨跌停价"""
+
+    def test_limit_prices_indexed_by_bar(self):
+        """测试按当前bar序号取前一日的涨跌停价"""
+        broker = AShareBroker(stock_code='600000', close_array=[10.0, 20.0, 30.0])
+
+        owner = Mock()
+        data = MagicMock()
+        data.__len__.return_value = 2  # 当前为第2个bar，前一日收盘价为10元
+        data.close = [-1, 100.0]  # 预计算数组优先，不再读取data.close
+
+        assert broker._get_current_limit_price(data) == pytest.approx((11.0, 9.0))
+        assert broker.buy(owner, data, 100, price=11.0) is None
+        assert broker.sell(owner, data, 100, price=9.0) is None
+
+        data.__len__.return_value = 3
+        assert broker._get_current_limit_price(data) == pytest.approx((22.0, 18.0))
+        with patch.object(bt.brokers.BrokerBack, 'buy', return_value=Mock()) as mock_buy:
+            assert broker.buy(owner, data, 100, price=21.0) is not None
+            assert mock_buy.called
+
+    def test_first_bar_falls_back_to_data(self):
+        """测试第一个bar没有前一日数据时回退到data.close"""
+        broker = AShareBroker(stock_code='600000', close_array=[10.0, 20.0])
+
+        data = MagicMock()
+        data.__len__.return_value = 1
+        data.close = [-1, 50.0]
+
+        assert broker._get_current_limit_price(data) == pytest.approx((55.0, 45.0))
+
+
 class TestCommissionCalculation:
     """测试佣金和印花税计算"""
 
@@ -314,6 +348,18 @@ class TestCommissionCalculation:
         expected_commission = 650.0
         assert commission == expected_commission
 
+    def test_compute_fees_matches_getcommission(self, broker_setup):
+        """测试批量费用计算与逐笔_getcommission一致"""
+        broker = broker_setup
+
+        sizes = np.array([1000, 10000, -1000, -10000])
+        prices = np.array([10.0, 10.0, 10.0, 50.0])
+
+        fees = AShareBroker.compute_fees(sizes, prices)
+
+        expected = [broker._getcommission(s, p, False) for s, p in zip(sizes, prices)]
+        np.testing.assert_allclose(fees, expected)
+
 
 class TestIntegration:
     """集成测试"""
@@ -326,6 +372,19 @@ class TestIntegration:
         assert broker.limit_ratio == MAIN_BOARD_LIMIT
         assert isinstance(broker, bt.brokers.BrokerBack)
 
+    def test_broker_installs_commission_info(self):
+        """测试Broker安装A股费用规则，成交时由backtrader扣除"""
+        broker = AShareBroker(stock_code='600000', commission_rate=0.0005, stamp_tax_rate=0.002)
+        data = bt.feeds.PandasData(dataname=pd.DataFrame(
+            {'close': [10.0]}, index=pd.DatetimeIndex(['2024-01-02'])
+        ))
+
+        comminfo = broker.getcommissioninfo(data)
+
+        assert isinstance(comminfo, AShareCommissionInfo)
+        assert comminfo.getcommission(10000, 10.0) == pytest.approx(50.0)
+        assert comminfo.getcommission(-10000, 10.0) == pytest.approx(250.0)
+
     def test_broker_with_cerebro(self):
         """测试Broker与Cerebro集成"""
         cerebro = bt.Cerebro()
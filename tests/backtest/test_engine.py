@@ -1,9 +1,11 @@
 """回测引擎测试"""
 import unittest
+import backtrader as bt
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from src.backtest.engine import BacktestEngine
+from src.backtest.numpy_feed import NumpyPandasData
 from src.strategy.base_strategy import BaseStrategy
 from src.strategy.short_term.momentum import MomentumStrategy
 from src.core.constants import SignalType, DEFAULT_CAPITAL, COMMISSION_RATE, STAMP_TAX_RATE
@@ -307,6 +309,200 @@ class TestBacktestEngine(unittest.TestCase):
                 data=empty_df
             )
 
+    def test_11_max_holding_days_exit(self):
+        """测试11: 超过最大持仓天数（自然日）后卖出，且遵守T+1"""
+        class BuyOnceStrategy(BaseStrategy):
+            def __init__(self):
+                self.strategy_name = 'test_strategy'
+                self.params = {
+                    'stop_loss': 0.08,
+                    'take_profit': 0.15,
+                    'max_holding_days': 3
+                }
+
+            def generate_signals(self, df):
+                df = df.copy()
+                df['signal'] = SignalType.HOLD.value
+                df.iloc[5, df.columns.get_loc('signal')] = SignalType.BUY.value
+                return df
+
+        # 价格不变，止损止盈均不会触发
+        data = self.sample_data.copy()
+        data[['open', 'high', 'low', 'close']] = 10.0
+
+        results = self.engine.run_backtest(
+            strategy_class=BuyOnceStrategy,
+            data=data,
+            stock_code='600000'
+        )
+
+        # 1月6日发出买入信号，次日成交；1月10日持仓超过3天发出卖出，次日成交
+        self.assertEqual(len(results['trades']), 1)
+        self.assertEqual(results['trades'][0]['entry_date'], '2024-01-07')
+        self.assertEqual(results['trades'][0]['exit_date'], '2024-01-11')
+        self.assertGreater(len(results['metrics']), 0)
+
+    def test_12_fast_mode_matches_backtrader(self):
+        """测试12: fast_mode与backtrader回测的交易和资金结果一致"""
+        class RandomSignalStrategy(BaseStrategy):
+            def __init__(self):
+                self.strategy_name = 'test_strategy'
+                self.params = {
+                    'stop_loss': 0.03,
+                    'take_profit': 0.05,
+                    'max_holding_days': 4
+                }
+
+            def generate_signals(self, df):
+                df = df.copy()
+                rng = np.random.default_rng(1)
+                df['signal'] = rng.choice(
+                    [SignalType.BUY.value, SignalType.SELL.value,
+                     SignalType.HOLD.value, SignalType.HOLD.value],
+                    len(df)
+                )
+                return df
+
+        results = self.engine.run_backtest(RandomSignalStrategy, self.sample_data, stock_code='600000')
+        fast = self.engine.run_backtest(
+            RandomSignalStrategy, self.sample_data, stock_code='600000', fast_mode=True
+        )
+
+        self.assertGreater(results['total_trades'], 0)
+        self.assertAlmostEqual(fast['final_value'], results['final_value'], places=6)
+        self.assertEqual(fast['total_trades'], results['total_trades'])
+        self.assertAlmostEqual(fast['win_rate'], results['win_rate'])
+        self.assertAlmostEqual(fast['max_drawdown'], results['max_drawdown'])
+        self.assertEqual(
+            [(t['entry_date'], t['exit_date'], t['size']) for t in fast['trades']],
+            [(t['entry_date'], t['exit_date'], t['size']) for t in results['trades']]
+        )
+
+        # 两种路径都扣除佣金与印花税，且每笔费用与净盈亏一致
+        commissions = [t['commission'] for t in results['trades']]
+        self.assertTrue(all(c > 0 for c in commissions))
+        np.testing.assert_allclose([t['commission'] for t in fast['trades']], commissions)
+        np.testing.assert_allclose([t['pnl'] for t in fast['trades']], [t['pnl'] for t in results['trades']])
+
+    def test_13_numpy_feed_matches_pandas_feed(self):
+        """测试13: 预提取数组的数据源与PandasData逐bar加载的数据一致"""
+        df = self.engine._prepare_frame(self.sample_data, None, None)
+        columns = dict(datetime=None, open='open', high='high', low='low',
+                       close='close', volume='volume', openinterest=-1)
+
+        def load_bars(feed_class):
+            bars = []
+
+            class Recorder(bt.Strategy):
+                def next(self):
+                    bars.append((self.data.datetime[0], self.data.open[0],
+                                 self.data.high[0], self.data.low[0],
+                                 self.data.close[0], self.data.volume[0]))
+
+            cerebro = bt.Cerebro()
+            cerebro.adddata(feed_class(dataname=df, **columns))
+            cerebro.addstrategy(Recorder)
+            cerebro.run()
+            return bars
+
+        self.assertEqual(load_bars(NumpyPandasData), load_bars(bt.feeds.PandasData))
+
+    def test_14_prepare_frame_date_filter_bounds(self):
+        """测试14: 日期过滤包含首尾日期，乱序数据与有序数据结果一致"""
+        df = self.engine._prepare_frame(self.sample_data, '2024-01-10', '2024-02-28')
+        self.assertEqual(df.index[0], pd.Timestamp('2024-01-10'))
+        self.assertEqual(df.index[-1], pd.Timestamp('2024-02-28'))
+        self.assertEqual(len(df), 50)
+
+        shuffled = self.sample_data.sample(frac=1, random_state=0)
+        df_shuffled = self.engine._prepare_frame(shuffled, '2024-01-10', '2024-02-28')
+        pd.testing.assert_frame_equal(df_shuffled.sort_index(), df)
+
+    def test_15_strategy_instantiated_once(self):
+        """测试15: 一次回测只实例化一次策略"""
+        class CountingStrategy(BaseStrategy):
+            instances = 0
+
+            def __init__(self):
+                CountingStrategy.instances += 1
+                self.strategy_name = 'test_strategy'
+                self.params = {'stop_loss': 0.08}
+
+            def generate_signals(self, df):
+                df = df.copy()
+                df['signal'] = SignalType.HOLD.value
+                return df
+
+        self.engine.run_backtest(CountingStrategy, self.sample_data)
+        self.assertEqual(CountingStrategy.instances, 1)
+
+        self.engine.run_backtest(CountingStrategy, self.sample_data, fast_mode=True)
+        self.assertEqual(CountingStrategy.instances, 2)
+
+    def test_16_prepare_frame_cache(self):
+        """测试16: 同一数据与日期范围复用标准化结果，清空缓存后重新计算"""
+        first = self.engine._prepare_frame(self.sample_data, '2024-01-10', None)
+        self.assertIs(self.engine._prepare_frame(self.sample_data, '2024-01-10', None), first)
+
+        # 日期范围或数据对象不同都不会命中
+        self.assertIsNot(self.engine._prepare_frame(self.sample_data, '2024-01-11', None), first)
+        self.assertIsNot(self.engine._prepare_frame(self.sample_data.copy(), '2024-01-10', None), first)
+
+        self.engine.clear_frame_cache()
+        again = self.engine._prepare_frame(self.sample_data, '2024-01-10', None)
+        self.assertIsNot(again, first)
+        pd.testing.assert_frame_equal(again, first)
+
+    def test_17_backtest_grid_matches_single_runs(self):
+        """测试17: 网格回测每组参数的结果与单次fast_mode回测一致"""
+        def make_strategy(overrides=None):
+            class SeededSignalStrategy(BaseStrategy):
+                generate_calls = 0
+
+                def __init__(self):
+                    self.strategy_name = 'test_strategy'
+                    self.params = {'seed': 1, 'stop_loss': 0.03,
+                                   'take_profit': 0.05, 'max_holding_days': 4}
+                    self.params.update(overrides or {})
+
+                def generate_signals(self, df):
+                    SeededSignalStrategy.generate_calls += 1
+                    df = df.copy()
+                    rng = np.random.default_rng(self.get_param('seed'))
+                    df['signal'] = rng.choice(
+                        [SignalType.BUY.value, SignalType.SELL.value,
+                         SignalType.HOLD.value, SignalType.HOLD.value],
+                        len(df)
+                    )
+                    return df
+
+            return SeededSignalStrategy
+
+        param_grid = {'seed': [1, 2], 'stop_loss': [0.03, 0.1], 'max_holding_days': [4, 20]}
+        grid_strategy = make_strategy()
+        grid = self.engine.run_backtest_grid(grid_strategy, self.sample_data, param_grid)
+
+        self.assertEqual(len(grid), 8)
+        # 只有风控参数不同的组合共用信号
+        self.assertEqual(grid_strategy.generate_calls, 2)
+
+        for row in grid.to_dict('records'):
+            overrides = {name: row[name] for name in param_grid}
+            single = self.engine.run_backtest(
+                make_strategy(overrides), self.sample_data, fast_mode=True
+            )
+            self.assertAlmostEqual(row['final_value'], single['final_value'], places=6)
+            self.assertAlmostEqual(row['max_drawdown'], single['max_drawdown'])
+            self.assertEqual(row['total_trades'], single['total_trades'])
+            self.assertAlmostEqual(row['win_rate'], single['win_rate'])
+
+    def test_18_backtest_grid_empty_grid(self):
+        """测试18: 空参数网格抛出ValueError"""
+        with self.assertRaises(ValueError):
+            self.engine.run_backtest_grid(MomentumStrategy, self.sample_data, {})
+        with self.assertRaises(ValueError):
+            self.engine.run_backtest_grid(MomentumStrategy, self.sample_data, {'stop_loss': []})
+
 
 class TestBacktestEngineIntegration(unittest.TestCase):
     """回测引擎集成测试"""
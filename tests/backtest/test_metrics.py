@@ -543,6 +543,124 @@ class TestBacktestMetrics(unittest.TestCase):
         # 盈亏比应该是0（没有盈利）
         self.assertEqual(metrics.calculate_profit_loss_ratio(), 0.0)
 
+    def test_27_cached_intermediates(self):
+        """测试27: 日收益率与最大回撤只计算一次，返回的回撤字典不影响缓存"""
+        metrics = BacktestMetrics(
+            portfolio_values=self.portfolio_values,
+            trades=self.trades,
+            initial_capital=self.initial_capital
+        )
+
+        metrics.calculate_all_metrics()
+        self.assertIs(metrics._daily_returns, metrics._daily_returns)
+
+        max_dd = metrics.calculate_max_drawdown()
+        max_dd['drawdown_pct'] = -1
+        self.assertGreaterEqual(metrics.calculate_max_drawdown()['drawdown_pct'], 0)
+
+        # 缓存结果与直接计算一致
+        daily_returns = self.portfolio_values.pct_change().dropna()
+        self.assertAlmostEqual(metrics.calculate_volatility(), daily_returns.std() * np.sqrt(252))
+        cummax = self.portfolio_values.cummax()
+        self.assertAlmostEqual(
+            metrics.calculate_max_drawdown()['drawdown_pct'],
+            abs(((self.portfolio_values - cummax) / cummax).min())
+        )
+
+    def test_28_max_consecutive_runs(self):
+        """测试28: 连胜/连亏统计覆盖首尾连续段、平局和未平仓交易"""
+        pnls = [100, 50, 0, -10, -20, -30, 40, 60, 70, 80, -5]
+        trades = [{'pnl': pnl, 'status': 'closed'} for pnl in pnls]
+        trades.append({'pnl': -1, 'status': 'open'})
+
+        metrics = BacktestMetrics(
+            portfolio_values=self.portfolio_values,
+            trades=trades,
+            initial_capital=self.initial_capital
+        )
+
+        self.assertEqual(metrics.calculate_max_consecutive_wins(), 4)
+        self.assertEqual(metrics.calculate_max_consecutive_losses(), 3)
+
+    def test_29_max_drawdown_matches_pandas(self):
+        """测试29: 最大回撤的幅度、金额和峰谷日期与pandas逐步计算一致"""
+        dates = pd.date_range(start='2024-01-01', periods=8, freq='D')
+        # 峰值120出现两次，应取第一次
+        values = pd.Series([100, 120, 110, 120, 90, 95, 130, 125], index=dates, dtype=float)
+
+        metrics = BacktestMetrics(values, [], 100)
+        result = metrics.calculate_max_drawdown()
+
+        cummax = values.cummax()
+        drawdown = (values - cummax) / cummax
+        end = drawdown.idxmin()
+        self.assertAlmostEqual(result['drawdown_pct'], abs(drawdown.min()))
+        self.assertAlmostEqual(result['drawdown_amount'], 30.0)
+        self.assertEqual(result['end_date'], end)
+        self.assertEqual(result['start_date'], cummax[:end].idxmax())
+        self.assertEqual(result['start_date'], dates[1])
+
+        curve = metrics.generate_drawdown_curve_data()
+        np.testing.assert_allclose(curve['drawdown'].to_numpy(), drawdown.to_numpy())
+
+    def test_30_trades_without_status_column(self):
+        """测试30: 交易记录缺少status列时全部按已平仓统计"""
+        trades = [{'pnl': 100}, {'pnl': -50}, {'pnl': 30}]
+        metrics = BacktestMetrics(self.portfolio_values, trades, self.initial_capital)
+
+        self.assertEqual(metrics.calculate_total_trades(), 3)
+        self.assertAlmostEqual(metrics.calculate_win_rate(), 2 / 3)
+        self.assertAlmostEqual(metrics.calculate_profit_loss_ratio(), 65 / 50)
+
+    def test_31_summary_metrics(self):
+        """测试31: 摘要指标不含序列数据，与全部指标中的标量一致"""
+        metrics = BacktestMetrics(self.portfolio_values, self.trades, self.initial_capital)
+
+        summary = metrics.summary_metrics()
+        all_metrics = metrics.calculate_all_metrics()
+
+        self.assertNotIn('monthly_returns', summary)
+        self.assertEqual(set(summary) | {'monthly_returns'}, set(all_metrics))
+        for key, value in summary.items():
+            self.assertEqual(value, all_metrics[key])
+
+    def test_32_max_consecutive_loops(self):
+        """测试32: 连胜/连亏计数循环与游程编码结果一致"""
+        from src.backtest._metrics_nb import max_consec_losses, max_consec_wins
+
+        pnl = np.array([10.0, 20.0, 0.0, -5.0, -3.0, -1.0, 8.0, 9.0, 7.0, 6.0, -2.0])
+        self.assertEqual(max_consec_wins(pnl), 4)
+        self.assertEqual(max_consec_losses(pnl), 3)
+        self.assertEqual(max_consec_wins(np.array([-1.0, 0.0])), 0)
+        self.assertEqual(max_consec_losses(np.array([], dtype=np.float64)), 0)
+
+        trades = [{'pnl': value, 'status': 'closed'} for value in pnl]
+        metrics = BacktestMetrics(self.portfolio_values, trades, self.initial_capital)
+        self.assertEqual(metrics.calculate_max_consecutive_wins(), 4)
+        self.assertEqual(metrics.calculate_max_consecutive_losses(), 3)
+
+    def test_33_generate_report_frames(self):
+        """测试33: 合并生成的报告曲线与单独生成的结果一致"""
+        metrics = BacktestMetrics(self.portfolio_values, self.trades, self.initial_capital)
+
+        equity_curve, drawdown_curve = metrics.generate_report_frames()
+
+        pd.testing.assert_frame_equal(equity_curve, metrics.generate_equity_curve_data())
+        pd.testing.assert_frame_equal(drawdown_curve, metrics.generate_drawdown_curve_data())
+
+    def test_34_monthly_returns_with_gap_month(self):
+        """测试34: 整月无数据时月度收益率与按月重采样的结果一致"""
+        dates = pd.to_datetime(['2024-01-15', '2024-01-31', '2024-03-15', '2024-03-29', '2024-04-30'])
+        values = pd.Series([100000.0, 110000.0, 120000.0, 130000.0, 125000.0], index=dates)
+        metrics = BacktestMetrics(values, [], self.initial_capital)
+
+        monthly_returns = metrics.calculate_monthly_returns()
+
+        expected = values.resample('ME').last().pct_change().dropna()
+        pd.testing.assert_series_equal(monthly_returns, expected)
+        self.assertEqual(list(monthly_returns.index), [pd.Timestamp('2024-04-30')])
+        self.assertEqual(monthly_returns.index.freqstr, 'ME')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,27 @@
+"""交易记录分析器测试"""
+import unittest
+from datetime import datetime
+
+import backtrader as bt
+
+from src.backtest.trade_recorder import TradeRecorder
+
+
+class TestTradeRecorder(unittest.TestCase):
+    """交易记录分析器测试类"""
+
+    def test_format_dates_matches_num2date(self):
+        """批量日期转换与bt.num2date逐个转换结果一致"""
+        moments = [
+            datetime(2024, 1, 2),
+            datetime(2024, 2, 29, 15, 0),
+            datetime(1969, 12, 31, 23, 59),
+        ]
+        nums = [bt.date2num(moment) for moment in moments]
+
+        expected = [bt.num2date(num).strftime('%Y-%m-%d') for num in nums]
+        self.assertEqual(TradeRecorder._format_dates(nums), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
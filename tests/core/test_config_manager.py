@@ -41,3 +41,14 @@ class TestConfigManager:
         ai_config = config.get('ai')
         assert isinstance(ai_config, dict)
         assert ai_config['provider'] == 'deepseek'
+
+    def test_get_cached_lookup(self):
+        """测试重复查找命中缓存，未命中的键仍返回各自的默认值"""
+        config = ConfigManager()
+        first = config.get('data.cache.ttl')
+        assert config.get('data.cache.ttl') is first
+        assert config.get('data.cache.missing', default=1) == 1
+        assert config.get('data.cache.missing', default=2) == 2
+
+        config.reload()
+        assert config.get('data.cache.ttl.realtime') == 60
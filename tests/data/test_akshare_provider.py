@@ -1,6 +1,7 @@
 import pytest
 import pandas as pd
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from src.data.akshare_provider import AKShareProvider
 
 
@@ -48,3 +49,43 @@ class TestAKShareProvider:
         quote2 = provider.get_realtime_quote('600519')
 
         assert quote1 == quote2
+
+    def test_realtime_quotes_share_snapshot(self):
+        """测试单只与批量实时行情共用一次全市场快照"""
+        spot = pd.DataFrame({
+            '代码': ['600519', '000001', '600000'],
+            '名称': ['贵州茅台', '平安银行', '浦发银行'],
+            '最新价': [1500.0, 10.5, 7.8],
+        })
+        provider = AKShareProvider()
+        store = {}
+
+        with patch.object(provider.cache, 'get', side_effect=lambda key: store.get(key)), \
+                patch.object(provider.cache, 'set', side_effect=lambda key, value, ttl=None: store.update({key: value})), \
+                patch('src.data.akshare_provider.ak.stock_zh_a_spot_em', return_value=spot) as spot_em:
+            quote = provider.get_realtime_quote('600519.SH')
+            quotes = provider.get_realtime_quotes(['600000', '999999', '000001'])
+
+        assert quote == spot.iloc[0].to_dict()
+        assert list(quotes) == ['600000', '000001']
+        assert quotes['000001'] == spot.iloc[1].to_dict()
+        spot_em.assert_called_once()
+
+    def test_cached_frame_round_trip(self):
+        """测试K线等DataFrame缓存写入后读回内容一致"""
+        df = pd.DataFrame({
+            '日期': pd.date_range('2024-01-02', periods=3).date,
+            '开盘': [10.0, 10.5, 10.2],
+            '成交量': [1000, 1200, 900],
+        })
+        provider = AKShareProvider()
+        store = {}
+
+        with patch.object(provider.cache, 'get', side_effect=lambda key: store.get(key)), \
+                patch.object(provider.cache, 'set', side_effect=lambda key, value, ttl=None: store.update({key: value})):
+            provider._cache_frame('daily_kline:test', df, ttl=60)
+            cached = provider._get_cached_frame('daily_kline:test')
+            missing = provider._get_cached_frame('missing')
+
+        pd.testing.assert_frame_equal(cached, df)
+        assert missing is None
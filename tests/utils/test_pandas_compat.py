@@ -0,0 +1,35 @@
+"""Tests for pandas compatibility helpers."""
+import numpy as np
+import pandas as pd
+
+from src.utils._pandas_compat import ensure_column_major
+
+
+class TestEnsureColumnMajor:
+    """ensure_column_major 测试类"""
+
+    def test_strided_columns_are_made_contiguous(self):
+        """测试跨步存放的数值列被重排为连续存放"""
+        values = np.random.rand(100, 4)
+        df = pd.DataFrame(values, columns=list('abcd'), copy=False)
+        df['date'] = pd.date_range('2024-01-01', periods=100)
+
+        result = ensure_column_major(df, ['a', 'b', 'c', 'd', 'date'])
+
+        for column in 'abcd':
+            array = result[column].to_numpy()
+            assert array.strides[0] == array.itemsize
+        pd.testing.assert_frame_equal(result, df)
+
+    def test_contiguous_frame_returned_as_is(self):
+        """测试已连续存放的DataFrame原样返回"""
+        df = pd.DataFrame({'a': np.arange(10.0), 'b': np.arange(10), 'name': list('abcdefghij')})
+        assert ensure_column_major(df, ['a', 'b', 'name']) is df
+
+    def test_only_listed_columns_are_checked(self):
+        """测试只检查指定列，未列出或不存在的列不触发复制"""
+        df = pd.DataFrame(np.random.rand(100, 4), columns=list('abcd'), copy=False)
+        df['e'] = np.arange(100.0)
+
+        assert ensure_column_major(df, ['e', 'missing']) is df
+        assert ensure_column_major(df, ['e', 'a']) is not df